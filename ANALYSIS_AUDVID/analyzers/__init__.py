@@ -4,8 +4,10 @@ Analyzers Package
 Modules for trigger detection using various AI models.
 """
 
-from .fast_filter import FastFilter
+from .fast_filter import FastFilter, ScoreMatrix
 from .deep_analyzer import DeepAnalyzer
 from .audio_analyzer import AudioAnalyzer
+from .pre_filter import PreFilter
+from .yolo_detector import YoloDetector
 
-__all__ = ['FastFilter', 'DeepAnalyzer', 'AudioAnalyzer']
+__all__ = ['FastFilter', 'ScoreMatrix', 'DeepAnalyzer', 'AudioAnalyzer', 'PreFilter', 'YoloDetector']
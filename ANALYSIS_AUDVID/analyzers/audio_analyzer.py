@@ -6,8 +6,9 @@ audio classification to detect audio triggers like emetophobia sounds.
 """
 
 import time
+from io import BytesIO
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import Dict, List, Optional, Tuple, Union
 import logging
 
 try:
@@ -25,6 +26,8 @@ import yaml
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from trigger_categories import TRIGGER_CATEGORIES, DetectionType, get_all_audio_prompts
+from analyzers.prompt_ensemble import build_category_prototypes, ensemble_threshold, ENSEMBLE_MODES
+from capture_manifest import CaptureManifest, content_hash, parse_filename_timestamp
 
 
 logger = logging.getLogger(__name__)
@@ -56,6 +59,13 @@ class AudioAnalyzer:
         self.default_threshold = analysis_config.get('clip_threshold', 0.25)
         self.category_thresholds = self.config.get('trigger_thresholds', {})
         
+        # Optional prompt ensembling (shared with FastFilter)
+        self.ensemble_mode = analysis_config.get('prompt_ensemble', 'off') or 'off'
+        if self.ensemble_mode not in ENSEMBLE_MODES:
+            self.ensemble_mode = 'off'
+        self.prototypes_per_category = analysis_config.get('prototypes_per_category', 2)
+        self.ensemble_offset = analysis_config.get('prompt_ensemble_offset', 0.0)
+        
         # Load CLAP model
         logger.info(f"Loading CLAP model on {self.device}...")
         self.model_name = "laion/clap-htsat-unfused"
@@ -113,20 +123,38 @@ class AudioAnalyzer:
             inputs = self.processor(text=self.all_prompts, return_tensors="pt", padding=True)
             inputs = {k: v.to(self.device) for k, v in inputs.items()}
             self.text_embeddings = self.model.get_text_features(**inputs)
+        
+        # Trigger rows scored per clip (category of each row)
+        trigger_embeddings = self.text_embeddings[:len(self.audio_prompts)]
+        self.score_categories = [self.prompt_to_category[p] for p in self.audio_prompts]
+        
+        if self.ensemble_mode != 'off' and self.audio_prompts:
+            category_names = list(dict.fromkeys(self.score_categories))
+            prompt_category_ids = [category_names.index(c) for c in self.score_categories]
+            trigger_embeddings, row_ids = build_category_prototypes(
+                trigger_embeddings,
+                prompt_category_ids,
+                mode=self.ensemble_mode,
+                prototypes_per_category=self.prototypes_per_category
+            )
+            self.score_categories = [category_names[i] for i in row_ids]
+        
+        self.score_embeddings = trigger_embeddings
     
-    def load_audio(self, audio_path: Union[str, Path], target_sr: int = 48000) -> np.ndarray:
+    def load_audio(self, audio_path: Union[str, Path, BytesIO], target_sr: int = 48000) -> np.ndarray:
         """
         Load and preprocess audio file.
         
         Args:
-            audio_path: Path to audio file (WAV, MP3, etc.)
+            audio_path: Path to audio file (WAV, MP3, etc.) or its bytes already read
             target_sr: Target sample rate
         
         Returns:
             Audio waveform as numpy array
         """
         # Load audio file
-        waveform, sr = librosa.load(str(audio_path), sr=target_sr, mono=True)
+        source = audio_path if isinstance(audio_path, BytesIO) else str(audio_path)
+        waveform, sr = librosa.load(source, sr=target_sr, mono=True)
         return waveform
     
     def analyze_audio(
@@ -162,30 +190,32 @@ class AudioAnalyzer:
             
             audio_embedding = self.model.get_audio_features(**inputs)
         
-        # Compute similarity with all prompts
+        # Compute similarity with trigger prompts (or category prototypes)
         similarities = torch.nn.functional.cosine_similarity(
             audio_embedding.unsqueeze(1),
-            self.text_embeddings.unsqueeze(0),
+            self.score_embeddings.unsqueeze(0),
             dim=-1
-        )[0]
+        )[0].tolist()
         
-        # Aggregate scores by category (only for trigger prompts, not safe ones)
+        # Aggregate scores by category (max over rows)
         category_scores: Dict[str, float] = {}
         
-        for idx, prompt in enumerate(self.audio_prompts):
-            if idx < len(self.audio_prompts):  # Only trigger prompts
-                category_name = self.prompt_to_category[prompt]
-                score = similarities[idx].item()
-                
-                if category_name not in category_scores:
-                    category_scores[category_name] = score
-                else:
-                    category_scores[category_name] = max(category_scores[category_name], score)
+        for category_name, score in zip(self.score_categories, similarities):
+            if category_name not in category_scores:
+                category_scores[category_name] = score
+            else:
+                category_scores[category_name] = max(category_scores[category_name], score)
         
         return category_scores
     
     def get_threshold(self, category_name: str) -> float:
-        """Get the threshold for a specific category"""
+        """Effective threshold for a category (lowered by the ensemble offset)"""
+        return ensemble_threshold(
+            self.configured_threshold(category_name), self.ensemble_mode, self.ensemble_offset
+        )
+    
+    def configured_threshold(self, category_name: str) -> float:
+        """Threshold as configured (max-over-prompts scale)"""
         if category_name in self.category_thresholds:
             return self.category_thresholds[category_name]
         
@@ -196,7 +226,7 @@ class AudioAnalyzer:
     
     def is_trigger_detected(self, scores: Dict[str, float]) -> tuple[bool, List[str]]:
         """
-        Determine if any audio trigger exceeds its threshold.
+        Determine if any audio trigger exceeds its effective threshold.
         
         Args:
             scores: Dict of category scores
@@ -236,6 +266,66 @@ class AudioAnalyzer:
                 results.append({})
         
         return results
+    
+    def analyze_directory(
+        self,
+        audio_dir: Union[str, Path]
+    ) -> List[Tuple[float, Path, Dict[str, float]]]:
+        """
+        Analyze every captured audio chunk of a directory, in timestamp order.
+        
+        Chunks come from the capture manifest when there is one (exact
+        timestamps; chunks whose size or hash do not match their entry are
+        skipped, the hash checked on the bytes read for decoding), else from
+        a directory scan with timestamps parsed from the file names.
+        
+        Args:
+            audio_dir: Audio capture directory
+        
+        Returns:
+            List of (timestamp in seconds, path, category scores)
+        """
+        audio_dir = Path(audio_dir)
+        manifest = CaptureManifest(audio_dir)
+        if manifest.refresh():
+            entries = manifest.entries(verify=True)
+            if len(entries) < len(manifest):
+                logger.warning(
+                    f"Skipping {len(manifest) - len(entries)} audio chunks that do not match the capture manifest"
+                )
+            chunks = [(entry.timestamp, audio_dir / entry.file, entry.hash) for entry in entries]
+        else:
+            chunks = sorted((parse_filename_timestamp(path.name), path, '') for path in audio_dir.glob('*.wav'))
+        
+        results = []
+        for timestamp, path, expected_hash in chunks:
+            scores = self.analyze_chunk(path, expected_hash)
+            if scores is not None:
+                results.append((timestamp, path, scores))
+        
+        return results
+    
+    def analyze_chunk(self, path: Path, expected_hash: str = '') -> Optional[Dict[str, float]]:
+        """
+        Analyze one captured audio chunk, checking its manifest hash on the bytes decoded.
+        
+        Args:
+            path: Audio chunk file
+            expected_hash: Content hash from the capture manifest ('' = unchecked)
+        
+        Returns:
+            Category scores ({} if the chunk could not be analyzed), None if it
+            does not match its manifest entry
+        """
+        try:
+            data = Path(path).read_bytes()
+            if expected_hash and content_hash(data) != expected_hash:
+                logger.warning(f"Skipping {Path(path).name}: does not match its capture manifest entry")
+                return None
+            return self.analyze_audio(self.load_audio(BytesIO(data)))
+        except Exception as e:
+            logger.error(f"Failed to analyze {path}: {e}")
+            return {}
 
 
 def main():
@@ -243,13 +333,24 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Test CLAP audio analyzer")
-    parser.add_argument('audio', help='Path to audio file')
+    parser.add_argument('audio', help='Path to audio file (or audio capture directory)')
     parser.add_argument('--config', default='config.yaml', help='Config file')
     args = parser.parse_args()
     
     logging.basicConfig(level=logging.INFO)
     
     analyzer = AudioAnalyzer(config_path=args.config)
+    
+    if Path(args.audio).is_dir():
+        chunks = analyzer.analyze_directory(args.audio)
+        print(f"\n🎵 Audio Analysis Results ({len(chunks)} chunks):")
+        print("-" * 40)
+        for timestamp, path, chunk_scores in chunks:
+            is_detected, categories = analyzer.is_trigger_detected(chunk_scores)
+            if is_detected:
+                print(f"⚠️  {timestamp:8.2f}s {path.name}: {', '.join(categories)}")
+        return
+    
     scores = analyzer.analyze_audio(args.audio)
     
     print("\n🎵 Audio Analysis Results:")
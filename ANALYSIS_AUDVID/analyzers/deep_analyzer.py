@@ -5,10 +5,15 @@ Uses Moondream or similar vision-language models via Ollama API
 for deep confirmation of suspicious frames.
 """
 
-import base64
+import asyncio
+import json
+import re
+import threading
 import time
+from collections import deque
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Optional, Dict, Union
+from typing import TYPE_CHECKING, Optional, Dict, List, Tuple, Union
 import logging
 
 try:
@@ -22,10 +27,37 @@ import yaml
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from trigger_categories import TRIGGER_CATEGORIES
+from analyzers.verdict_cache import VerdictCache
+from analyzers.verdict_index import VerdictIndex
+from analyzers.payload_cache import PayloadCache, encode_image
+from analyzers.vlm_health import CircuitBreaker, CircuitOpenError, LatencyTracker, backoff_delay
+
+if TYPE_CHECKING:
+    from analyzers.vlm_client import AsyncVLMClient  # Imported lazily (needs aiohttp)
 
 
 logger = logging.getLogger(__name__)
 
+# Requests whose reported model load exceeds this count as cold starts
+COLD_LOAD_SECONDS = 0.5
+
+# Recent steady-state times to first streamed token (baseline for cold detection)
+FIRST_TOKEN_WINDOW = 50
+
+# Request shapes with their own latency history: early-stopped yes/no streams,
+# full free-text answers, and JSON (multi-category / multi-frame) answers
+REQUEST_SHAPES = ('stream', 'text', 'json')
+
+# A leading yes/no followed by a word boundary decides a free-text answer
+_EARLY_VERDICT = re.compile(r'^\W*(yes|no)\W', re.IGNORECASE)
+
+
+def _completed(value) -> Future:
+    """Already-resolved future (for answers that need no request)"""
+    future = Future()
+    future.set_result(value)
+    return future
+
 
 class DeepAnalyzer:
     """
@@ -51,6 +83,72 @@ class DeepAnalyzer:
         self.timeout = analysis_config.get('vlm_timeout', 30)
         self.threshold = analysis_config.get('vlm_threshold', 0.6)
         
+        # Adaptive timeouts, retries and circuit breaker for the backend
+        self.adaptive_timeout = analysis_config.get('vlm_adaptive_timeout', True)
+        self.latency: Dict[str, LatencyTracker] = {
+            shape: LatencyTracker(
+                min_timeout=min(analysis_config.get('vlm_min_timeout', 5), self.timeout),
+                max_timeout=self.timeout,
+                multiplier=analysis_config.get('vlm_timeout_multiplier', 3.0)
+            )
+            for shape in REQUEST_SHAPES
+        }
+        self.retries = max(0, analysis_config.get('vlm_retries', 1))
+        self.retry_backoff = analysis_config.get('vlm_retry_backoff', 0.5)
+        self.breaker = CircuitBreaker(
+            failure_threshold=analysis_config.get('vlm_breaker_failures', 5),
+            probe_interval=analysis_config.get('vlm_breaker_probe_interval', 30)
+        )
+        self.retried = 0
+        self.server_requests = 0  # Generate calls that reached the backend (not cache hits)
+        
+        # Stream yes/no answers and stop generating once the verdict is clear
+        self.stream = analysis_config.get('vlm_stream', True)
+        self.early_stops = 0
+        
+        # Model residency: preloaded at job start, kept loaded during the job
+        self.keep_alive = analysis_config.get('vlm_keep_alive', '30m')
+        self.keep_alive_idle = analysis_config.get('vlm_keep_alive_idle', '5m')
+        self.load_timeout = analysis_config.get('vlm_load_timeout', 120)
+        self.load_seconds: Optional[float] = None
+        self.cold_latencies: List[float] = []
+        self.steady_latencies: List[float] = []
+        self.cold_first_token = analysis_config.get('vlm_cold_first_token', 5.0)
+        self.first_tokens = deque(maxlen=FIRST_TOKEN_WINDOW)
+        
+        # Async client (started on first submit)
+        self.concurrency = analysis_config.get('vlm_concurrency', 4)
+        self._client = None
+        
+        # Ask about every suspicious category of a frame in one request
+        self.multi_category = analysis_config.get('vlm_multi_category', True)
+        
+        # Pack several frames per category into one request (1 = off)
+        self.frame_batch_size = max(1, analysis_config.get('vlm_frame_batch_size', 1))
+        self.frame_batch_mode = analysis_config.get('vlm_frame_batch_mode', 'images')
+        self.frame_batch_fallbacks = 0
+        
+        # Encoded frames, prepared once per frame in a thread pool
+        self.payloads = PayloadCache(
+            workers=analysis_config.get('vlm_prep_workers', 2),
+            max_entries=analysis_config.get('vlm_payload_cache_size', 16)
+        )
+        
+        # In-run reuse of verdicts for near-duplicate frames (0 = off)
+        reuse_distance = analysis_config.get('vlm_reuse_distance', 0.05)
+        self.verdict_index: Optional[VerdictIndex] = (
+            VerdictIndex(max_distance=reuse_distance) if reuse_distance > 0 else None
+        )
+        
+        # Persistent verdict cache (shared across runs and worker processes)
+        self.cache: Optional[VerdictCache] = None
+        if analysis_config.get('vlm_cache', True):
+            cache_path = self.config.get('paths', {}).get('vlm_cache', './vlm_cache.sqlite')
+            self.cache = VerdictCache(
+                Path(cache_path),
+                max_entries=analysis_config.get('vlm_cache_max_entries', 100_000)
+            )
+        
         # Test connection
         self._test_connection()
         
@@ -94,175 +192,919 @@ class DeepAnalyzer:
             logger.warning(f"Ollama connection test failed: {e}")
     
     def _image_to_base64(self, image: Union[str, Path, Image.Image, np.ndarray]) -> str:
-        """Convert image to base64 string for Ollama API"""
-        # Convert to PIL Image if needed
-        if isinstance(image, (str, Path)):
-            img = Image.open(image)
-        elif isinstance(image, np.ndarray):
-            img = Image.fromarray(image)
-        else:
-            img = image
-        
-        # Convert to RGB if necessary
-        if img.mode != 'RGB':
-            img = img.convert('RGB')
+        """Convert image to base64 string for Ollama API (uncached)"""
+        return encode_image(image)
+    
+    def _build_prompt(self, trigger_category: str, custom_prompt: Optional[str] = None) -> str:
+        """Prompt text for a category (custom prompt wins)"""
+        category = TRIGGER_CATEGORIES.get(trigger_category)
         
-        # Resize if too large (Moondream has limits)
-        max_size = 1024
-        if max(img.size) > max_size:
-            ratio = max_size / max(img.size)
-            new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
-            img = img.resize(new_size, Image.Resampling.LANCZOS)
+        if custom_prompt:
+            return custom_prompt
+        elif category:
+            return category.vlm_prompt_template.format(trigger=trigger_category)
+        return f"Does this image contain {trigger_category}? Answer YES or NO."
+    
+    def _build_payload(
+        self,
+        prompt: str,
+        images_b64: List[str],
+        json_format: bool = False,
+        num_predict: int = 50
+    ) -> Dict[str, any]:
+        """Ollama /api/generate request body"""
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "images": images_b64,
+            "stream": False,
+            "keep_alive": self.keep_alive,
+            "options": {
+                "temperature": 0.1,  # Low temperature for consistent yes/no
+                "num_predict": num_predict  # Short response
+            }
+        }
+        if json_format:
+            payload["format"] = "json"
+        return payload
+    
+    def _build_multi_prompt(self, trigger_categories: List[str]) -> str:
+        """One prompt asking about several categories, answered as JSON"""
+        lines = ['Answer each question about this image with "yes" or "no".', 'Questions:']
+        for name in trigger_categories:
+            question = self._build_prompt(name).replace('Answer YES or NO.', '').strip()
+            lines.append(f'- "{name}": {question}')
+        lines.append(
+            'Respond only with a JSON object whose keys are the quoted names above '
+            'and whose values are "yes" or "no".'
+        )
+        return "\n".join(lines)
+    
+    def _build_frames_prompt(self, trigger_category: str, num_frames: int) -> str:
+        """One prompt asking the same question about several numbered frames"""
+        question = self._build_prompt(trigger_category).replace('Answer YES or NO.', '').strip()
+        if self.frame_batch_mode == 'contact_sheet':
+            intro = (
+                f"This image is a grid of {num_frames} numbered panels "
+                "(left to right, top to bottom), each a separate video frame."
+            )
+        else:
+            intro = f"You are shown {num_frames} video frames, numbered 1 to {num_frames} in order."
+        keys = ", ".join(f'"{n}"' for n in range(1, num_frames + 1))
+        return (
+            f"{intro}\nFor each frame: {question}\n"
+            f"Respond only with a JSON object with keys {keys} and values \"yes\" or \"no\"."
+        )
+    
+    def _contact_sheet(self, images: List[Union[str, Path, Image.Image, np.ndarray]]) -> Image.Image:
+        """Tile frames into one numbered grid image (max 1024px wide)"""
+        from PIL import ImageDraw
         
-        # Convert to bytes
-        from io import BytesIO
-        buffer = BytesIO()
-        img.save(buffer, format='JPEG', quality=85)
-        buffer.seek(0)
+        cols = int(np.ceil(np.sqrt(len(images))))
+        rows = int(np.ceil(len(images) / cols))
+        cell_w = 1024 // cols
+        cell_h = cell_w * 9 // 16
         
-        return base64.b64encode(buffer.read()).decode('utf-8')
+        sheet = Image.new('RGB', (cell_w * cols, cell_h * rows))
+        draw = ImageDraw.Draw(sheet)
+        for n, image in enumerate(images):
+            if isinstance(image, (str, Path)):
+                image = Image.open(image)
+            elif isinstance(image, np.ndarray):
+                image = Image.fromarray(image)
+            tile = image.convert('RGB').resize((cell_w, cell_h), Image.Resampling.BILINEAR)
+            x, y = (n % cols) * cell_w, (n // cols) * cell_h
+            sheet.paste(tile, (x, y))
+            draw.rectangle([x, y, x + 28, y + 22], fill=(0, 0, 0))
+            draw.text((x + 6, y + 4), str(n + 1), fill=(255, 255, 0))
+        return sheet
     
-    def analyze_trigger(
+    def _frames_payload(
         self,
-        image: Union[str, Path, Image.Image, np.ndarray],
-        trigger_category: str,
-        custom_prompt: Optional[str] = None
+        images: List[Union[str, Path, Image.Image, np.ndarray]],
+        trigger_category: str
     ) -> Dict[str, any]:
+        """Request body packing several frames for one category"""
+        if self.frame_batch_mode == 'contact_sheet':
+            images_b64 = [self._image_to_base64(self._contact_sheet(images))]
+        else:
+            images_b64 = [self.payloads.encode(image) for image in images]
+        return self._build_payload(
+            self._build_frames_prompt(trigger_category, len(images)),
+            images_b64,
+            json_format=True,
+            num_predict=8 * len(images) + 8
+        )
+    
+    def _parse_frames_response(self, raw_response: str, num_frames: int) -> Optional[List[Tuple[bool, float]]]:
         """
-        Confirm a specific trigger in an image using VLM.
-        
-        Args:
-            image: Image to analyze
-            trigger_category: Category name from TRIGGER_CATEGORIES
-            custom_prompt: Optional custom prompt (overrides default)
+        Parse a JSON per-frame answer.
         
         Returns:
-            Dict with 'confirmed' (bool), 'confidence' (float), 'raw_response' (str)
+            [(confirmed, confidence)] in frame order, or None if any frame
+            is missing or unclear
         """
-        # Get category info
-        category = TRIGGER_CATEGORIES.get(trigger_category)
+        keys = [str(n) for n in range(1, num_frames + 1)]
+        verdicts = self._parse_multi_response(raw_response, keys)
+        if verdicts is None:
+            return None
+        return [verdicts[k] for k in keys]
+    
+    def _parse_response(self, raw_response: str) -> Tuple[bool, float]:
+        """
+        Parse a free-text VLM answer into (confirmed, confidence).
         
-        if custom_prompt:
-            prompt = custom_prompt
-        elif category:
-            prompt = category.vlm_prompt_template.format(trigger=trigger_category)
-        else:
-            prompt = f"Does this image contain {trigger_category}? Answer YES or NO."
+        Looks for yes/no patterns; hedged answers fail safe to confirmed.
+        """
+        # Strong yes indicators
+        if any(x in raw_response for x in ['yes', 'correct', 'affirmative', 'indeed', 'certainly']):
+            # Boost confidence for emphatic responses
+            if any(x in raw_response for x in ['definitely', 'clearly', 'obviously']):
+                return True, 0.95
+            return True, 0.85
         
-        # Convert image to base64
-        image_b64 = self._image_to_base64(image)
+        # Strong no indicators
+        if any(x in raw_response for x in ['no', 'not', 'negative', 'cannot see', 'don\'t see']):
+            return False, 0.85
         
-        # Build request
-        payload = {
-            "model": self.model_name,
-            "prompt": prompt,
-            "images": [image_b64],
-            "stream": False,
-            "options": {
-                "temperature": 0.1,  # Low temperature for consistent yes/no
-                "num_predict": 50    # Short response
+        # Uncertain responses
+        # Check for hedging language
+        if any(x in raw_response for x in ['possibly', 'maybe', 'might', 'unclear', 'hard to tell']):
+            # Default to safe (trigger detected) but with low confidence
+            return True, 0.5
+        
+        # Can't parse, assume negative but log
+        logger.warning(f"Unparseable VLM response: {raw_response[:100]}")
+        return False, 0.3
+    
+    def _parse_multi_response(
+        self,
+        raw_response: str,
+        trigger_categories: List[str]
+    ) -> Optional[Dict[str, Tuple[bool, float]]]:
+        """
+        Parse a JSON multi-category answer.
+        
+        Returns:
+            {category: (confirmed, confidence)}, or None if any category
+            is missing or its value is not a clear yes/no/maybe
+        """
+        try:
+            answer = json.loads(raw_response)
+        except (ValueError, TypeError):
+            return None
+        if not isinstance(answer, dict):
+            return None
+        
+        answer = {str(k).strip().lower(): str(v).strip().lower() for k, v in answer.items()}
+        verdicts = {}
+        for name in trigger_categories:
+            value = answer.get(name.lower())
+            if value in ('yes', 'true', 'y'):
+                verdicts[name] = (True, 0.85)
+            elif value in ('no', 'false', 'n'):
+                verdicts[name] = (False, 0.85)
+            elif value in ('maybe', 'possibly', 'unsure', 'unclear'):
+                verdicts[name] = (True, 0.5)  # Fail safe on hedging
+            else:
+                return None
+        return verdicts
+    
+    def _make_result(self, raw_response: str, elapsed: float, trigger_category: str) -> Dict[str, any]:
+        """Result dict for a successful VLM response"""
+        confirmed, confidence = self._parse_response(raw_response)
+        return {
+            'confirmed': confirmed,
+            'confidence': confidence,
+            'raw_response': raw_response,
+            'elapsed_seconds': elapsed,
+            'category': trigger_category
+        }
+    
+    def _make_multi_results(
+        self,
+        raw_response: str,
+        elapsed: float,
+        trigger_categories: List[str]
+    ) -> Optional[Dict[str, Dict]]:
+        """Per-category result dicts from one JSON answer (None if unparseable)"""
+        verdicts = self._parse_multi_response(raw_response, trigger_categories)
+        if verdicts is None:
+            logger.debug(f"Multi-category answer not parseable, falling back: {raw_response[:100]}")
+            return None
+        return {
+            name: {
+                'confirmed': confirmed,
+                'confidence': confidence,
+                'raw_response': raw_response,
+                'elapsed_seconds': elapsed / len(trigger_categories),
+                'category': name
             }
+            for name, (confirmed, confidence) in verdicts.items()
+        }
+    
+    def _fail_safe_result(self, raw_response: str, elapsed: float, trigger_category: str) -> Dict[str, any]:
+        """Result dict when the VLM could not answer"""
+        return {
+            'confirmed': True,  # Fail safe - assume trigger present
+            'confidence': 0.0,
+            'raw_response': raw_response,
+            'elapsed_seconds': elapsed,
+            'category': trigger_category
         }
+    
+    def _circuit_open_result(self, trigger_category: str) -> Dict[str, any]:
+        """Fail-safe result returned without waiting while the backend is down"""
+        return self._fail_safe_result('CIRCUIT OPEN', 0.0, trigger_category)
+    
+    def _streams(self, payload: Dict[str, any]) -> bool:
+        """Free-text (yes/no) requests are streamed; JSON answers are not"""
+        return self.stream and 'format' not in payload
+    
+    @staticmethod
+    def _early_verdict(text: str) -> bool:
+        """True once a streamed answer starts with a complete YES or NO"""
+        return _EARLY_VERDICT.match(text) is not None
+    
+    def _post_stream(self, payload: Dict[str, any], timeout: float) -> Tuple[str, Dict[str, any]]:
+        """
+        Streaming generate call that stops reading at the first clear yes/no.
+        
+        Closing the response drops the connection, which makes Ollama abort
+        the rest of the generation.
+        
+        Returns:
+            (answer text, timing) where timing has 'first_token' (seconds to
+            the first chunk) and 'load_duration' when the server reported it
+            (final chunk only, so not after an early stop)
+        """
+        text = ''
+        timing = {}
+        start_time = time.time()
+        with requests.post(
+            self.ollama_url,
+            json={**payload, 'stream': True},
+            timeout=timeout,
+            stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except ValueError as e:
+                    raise requests.exceptions.RequestException(f"Malformed stream chunk: {e}")
+                timing.setdefault('first_token', time.time() - start_time)
+                if 'load_duration' in chunk:
+                    timing['load_duration'] = chunk['load_duration']
+                text += chunk.get('response', '')
+                if chunk.get('done'):
+                    break
+                if self._early_verdict(text):
+                    self.early_stops += 1
+                    break
+        return text.strip(), timing
+    
+    def _is_cold(self, data: Dict[str, any]) -> bool:
+        """
+        Whether a request had to wait for a model load.
+        
+        Ollama's load_duration decides when the response carried it. Streams
+        stopped early never see it (it is in the final chunk), so their time
+        to first token is compared with the steady-state baseline: a cold
+        start delays it by about the model load time (measured by preload(),
+        else `vlm_cold_first_token`).
+        """
+        if 'load_duration' in data:
+            load_seconds = data['load_duration'] / 1e9
+            if load_seconds > COLD_LOAD_SECONDS:
+                logger.info(f"VLM cold start: model loaded in {load_seconds:.1f}s")
+                return True
+            return False
         
+        first_token = data.get('first_token')
+        if first_token is None:
+            return False
+        baseline = float(np.median(self.first_tokens)) if self.first_tokens else 0.0
+        load_seconds = self.load_seconds or self.cold_first_token
+        if first_token > baseline + max(COLD_LOAD_SECONDS, load_seconds / 2):
+            logger.info(f"VLM cold start: first token after {first_token:.1f}s")
+            return True
+        return False
+    
+    def _request_shape(self, payload: Dict[str, any]) -> str:
+        """Latency class of a request (see REQUEST_SHAPES)"""
+        if self._streams(payload):
+            return 'stream'
+        return 'json' if 'format' in payload else 'text'
+    
+    def _record_latency(self, data: Dict[str, any], elapsed: float, payload: Dict[str, any]):
+        """
+        File a successful request as cold (the model had to be loaded) or
+        steady-state. Only steady-state latencies drive the adaptive timeout.
+        
+        Args:
+            data: Ollama response, or the timing of a streamed request
+            elapsed: Request seconds
+            payload: The request (its shape and image count)
+        """
+        if self._is_cold(data):
+            self.cold_latencies.append(elapsed)
+            return
+        if 'first_token' in data:
+            self.first_tokens.append(data['first_token'])
+        self.steady_latencies.append(elapsed)
+        self.latency[self._request_shape(payload)].record(elapsed, len(payload.get('images', [])))
+    
+    def preload(self) -> Optional[float]:
+        """
+        Load the model into Ollama and pin it for `vlm_keep_alive`.
+        
+        Returns:
+            Model load seconds, or None if the load request failed
+        """
+        start_time = time.time()
         try:
-            start_time = time.time()
-            
             response = requests.post(
                 self.ollama_url,
-                json=payload,
-                timeout=self.timeout
+                json={'model': self.model_name, 'keep_alive': self.keep_alive},
+                timeout=self.load_timeout
             )
             response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"VLM preload failed: {e}")
+            return None
+        
+        reported = response.json().get('load_duration', 0) / 1e9
+        self.load_seconds = reported or time.time() - start_time
+        logger.info(f"VLM {self.model_name} loaded in {self.load_seconds:.1f}s (keep_alive {self.keep_alive})")
+        return self.load_seconds
+    
+    def preload_async(self) -> Future:
+        """Start preload() in a background thread (e.g. while CLIP loads)"""
+        future = Future()
+        
+        def load():
+            future.set_result(self.preload())
+        
+        threading.Thread(target=load, name='vlm-preload', daemon=True).start()
+        return future
+    
+    def release_model(self):
+        """Hand the model back to Ollama's idle lifetime (`vlm_keep_alive_idle`)"""
+        try:
+            requests.post(
+                self.ollama_url,
+                json={'model': self.model_name, 'keep_alive': self.keep_alive_idle},
+                timeout=5
+            )
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"VLM keep_alive reset failed: {e}")
+    
+    def reset(self):
+        """
+        Per-media state: forget the previous media's verdicts for reuse and
+        clear run statistics. Adaptive timeouts, the breaker state and the
+        persistent verdict cache carry over (same backend).
+        """
+        if self.verdict_index is not None:
+            self.verdict_index.reset()
+        if self.cache is not None:
+            self.cache.reset_stats()
+        self.breaker.reset_stats()
+        self.retried = 0
+        self.server_requests = 0
+        self.early_stops = 0
+        self.frame_batch_fallbacks = 0
+        self.cold_latencies = []
+        self.steady_latencies = []
+        self.payloads.prepared = 0
+        self.payloads.reused = 0
+    
+    def latency_summary(self) -> Dict[str, any]:
+        """Cold-start vs steady-state latency for the analysis summary"""
+        steady = np.asarray(self.steady_latencies)
+        return {
+            'load_seconds': self.load_seconds,
+            'cold_starts': len(self.cold_latencies),
+            'cold_mean': float(np.mean(self.cold_latencies)) if self.cold_latencies else None,
+            'steady_calls': len(steady),
+            'steady_mean': float(steady.mean()) if len(steady) else None,
+            'steady_p95': float(np.percentile(steady, 95)) if len(steady) else None
+        }
+    
+    def _request_timeout(self, payload: Dict[str, any]) -> float:
+        """Per-request timeout (adaptive to requests of the same shape unless disabled)"""
+        if not self.adaptive_timeout:
+            return self.timeout
+        return self.latency[self._request_shape(payload)].timeout(len(payload.get('images', [])))
+    
+    def _generate(self, payload: Dict[str, any]) -> Tuple[str, float]:
+        """
+        Blocking generate call (served from the verdict cache when possible).
+        
+        Failed requests are retried with jittered backoff while the circuit
+        breaker allows it.
+        
+        Returns:
+            (response text, elapsed seconds)
+        
+        Raises:
+            requests.exceptions.RequestException (CircuitOpenError when the
+            breaker refuses the request)
+        """
+        cache_key = self.cache.make_key(payload) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached[0], 0.0
+        
+        self.server_requests += 1
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("VLM circuit open")
             
-            elapsed = time.time() - start_time
-            
-            result = response.json()
-            raw_response = result.get('response', '').strip().lower()
-            
-            # Parse response - look for yes/no patterns
-            confirmed = False
-            confidence = 0.0
-            
-            # Strong yes indicators
-            if any(x in raw_response for x in ['yes', 'correct', 'affirmative', 'indeed', 'certainly']):
-                confirmed = True
-                confidence = 0.85
-                
-                # Boost confidence for emphatic responses
-                if any(x in raw_response for x in ['definitely', 'clearly', 'obviously']):
-                    confidence = 0.95
+            start_time = time.time()
+            try:
+                if self._streams(payload):
+                    raw_response, data = self._post_stream(payload, self._request_timeout(payload))
+                else:
+                    response = requests.post(
+                        self.ollama_url,
+                        json=payload,
+                        timeout=self._request_timeout(payload)
+                    )
+                    response.raise_for_status()
+                    data = response.json()
+                    raw_response = data.get('response', '').strip()
+            except requests.exceptions.RequestException:
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                time.sleep(backoff_delay(attempt, self.retry_backoff))
+                continue
             
-            # Strong no indicators
-            elif any(x in raw_response for x in ['no', 'not', 'negative', 'cannot see', 'don\'t see']):
-                confirmed = False
-                confidence = 0.85
+            elapsed = time.time() - start_time
+            self.breaker.record_success()
+            self._record_latency(data, elapsed, payload)
+            break
+        
+        if cache_key:
+            self.cache.put(cache_key, raw_response, elapsed)
+        return raw_response, elapsed
+    
+    async def _generate_async(self, payload: Dict[str, any]) -> Tuple[str, float]:
+        """
+        Non-blocking generate call on the client loop (same retry and
+        breaker policy as _generate).
+        
+        Raises:
+            asyncio.TimeoutError, aiohttp.ClientError, CircuitOpenError
+        """
+        cache_key = self.cache.make_key(payload) if self.cache else None
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached[0], 0.0
+        
+        self.server_requests += 1
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("VLM circuit open")
             
-            # Uncertain responses
-            else:
-                # Check for hedging language
-                if any(x in raw_response for x in ['possibly', 'maybe', 'might', 'unclear', 'hard to tell']):
-                    # Default to safe (trigger detected) but with low confidence
-                    confirmed = True
-                    confidence = 0.5
+            start_time = time.time()
+            try:
+                if self._streams(payload):
+                    raw_response, early, data = await self.client.post_stream(
+                        self.ollama_url, {**payload, 'stream': True},
+                        self._request_timeout(payload), self._early_verdict
+                    )
+                    raw_response = raw_response.strip()
+                    self.early_stops += early
                 else:
-                    # Can't parse, assume negative but log
-                    logger.warning(f"Unparseable VLM response: {raw_response[:100]}")
-                    confirmed = False
-                    confidence = 0.3
+                    data = await self.client.post_json(
+                        self.ollama_url, payload, self._request_timeout(payload)
+                    )
+                    raw_response = data.get('response', '').strip()
+            except Exception:
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                self.retried += 1
+                await asyncio.sleep(backoff_delay(attempt, self.retry_backoff))
+                continue
             
-            return {
-                'confirmed': confirmed,
-                'confidence': confidence,
-                'raw_response': raw_response,
-                'elapsed_seconds': elapsed,
-                'category': trigger_category
-            }
+            elapsed = time.time() - start_time
+            self.breaker.record_success()
+            self._record_latency(data, elapsed, payload)
+            break
+        
+        if cache_key:
+            self.cache.put(cache_key, raw_response, elapsed)
+        return raw_response, elapsed
+    
+    def _analyze_b64(
+        self,
+        image_b64: str,
+        trigger_category: str,
+        custom_prompt: Optional[str] = None
+    ) -> Dict[str, any]:
+        """Blocking single-category confirmation of an encoded image"""
+        payload = self._build_payload(self._build_prompt(trigger_category, custom_prompt), [image_b64])
+        start_time = time.time()
+        
+        try:
+            raw_response, elapsed = self._generate(payload)
+            return self._make_result(raw_response.lower(), elapsed, trigger_category)
         
         except requests.exceptions.Timeout:
-            logger.error(f"VLM timeout after {self.timeout}s")
-            return {
-                'confirmed': True,  # Fail safe - assume trigger present
-                'confidence': 0.0,
-                'raw_response': 'TIMEOUT',
-                'elapsed_seconds': self.timeout,
-                'category': trigger_category
-            }
+            logger.error("VLM timeout")
+            return self._fail_safe_result('TIMEOUT', time.time() - start_time, trigger_category)
+        
+        except CircuitOpenError:
+            return self._circuit_open_result(trigger_category)
         
         except requests.exceptions.RequestException as e:
             logger.error(f"VLM request failed: {e}")
-            return {
-                'confirmed': True,  # Fail safe
-                'confidence': 0.0,
-                'raw_response': f'ERROR: {e}',
-                'elapsed_seconds': 0,
-                'category': trigger_category
-            }
+            return self._fail_safe_result(f'ERROR: {e}', 0, trigger_category)
+    
+    def analyze_trigger(
+        self,
+        image: Union[str, Path, Image.Image, np.ndarray],
+        trigger_category: str,
+        custom_prompt: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Confirm a specific trigger in an image using VLM.
+        
+        Args:
+            image: Image to analyze
+            trigger_category: Category name from TRIGGER_CATEGORIES
+            custom_prompt: Optional custom prompt (overrides default)
+        
+        Returns:
+            Dict with 'confirmed' (bool), 'confidence' (float), 'raw_response' (str)
+        """
+        return self._analyze_b64(self.payloads.encode(image), trigger_category, custom_prompt)
+    
+    def _reuse_lookup(self, trigger_category: str, embedding: Optional[np.ndarray]) -> Optional[Dict]:
+        """Verdict of a near-duplicate judged frame, if reuse applies"""
+        if self.verdict_index is None or embedding is None:
+            return None
+        category = TRIGGER_CATEGORIES.get(trigger_category)
+        if category is not None and not category.verdict_reuse:
+            return None
+        return self.verdict_index.lookup(trigger_category, embedding)
+    
+    def _reuse_remember(self, trigger_category: str, embedding: Optional[np.ndarray], result: Dict):
+        """Index a real VLM verdict (not reused, not fail-safe) for later reuse"""
+        if self.verdict_index is None or embedding is None or result.get('reused'):
+            return
+        if result.get('confidence', 0.0) <= 0.0:
+            return
+        category = TRIGGER_CATEGORIES.get(trigger_category)
+        if category is not None and not category.verdict_reuse:
+            return
+        self.verdict_index.add(trigger_category, embedding, result)
+    
+    def _split_reusable(
+        self,
+        trigger_categories: List[str],
+        embedding: Optional[np.ndarray]
+    ) -> Tuple[Dict[str, Dict], List[str]]:
+        """Split categories into (reused results, categories still to ask)"""
+        reused, remaining = {}, []
+        for category in trigger_categories:
+            result = self._reuse_lookup(category, embedding)
+            if result is not None:
+                reused[category] = result
+            else:
+                remaining.append(category)
+        return reused, remaining
     
     def analyze_multiple_triggers(
         self,
         image: Union[str, Path, Image.Image, np.ndarray],
-        trigger_categories: list
+        trigger_categories: list,
+        embedding: Optional[np.ndarray] = None
     ) -> Dict[str, Dict]:
         """
         Check multiple trigger categories for a single image.
         
+        Asks about every category in one request with a JSON answer; falls
+        back to one request per category only if that answer can't be parsed.
+        
         Args:
             image: Image to analyze
             trigger_categories: List of category names to check
+            embedding: CLIP embedding of the image, enables verdict reuse
+                for near-duplicate frames
         
         Returns:
             Dict mapping category names to their analysis results
         """
+        reused, remaining = self._split_reusable(list(trigger_categories), embedding)
+        if not remaining:
+            return reused
+        
         # Convert image once
-        image_b64 = self._image_to_base64(image)
+        image_b64 = self.payloads.encode(image)
+        results = self._analyze_multiple_b64(image_b64, remaining)
         
-        results = {}
-        for category in trigger_categories:
-            result = self.analyze_trigger(image, category)
-            results[category] = result
+        for category, result in results.items():
+            self._reuse_remember(category, embedding, result)
+        return {**reused, **results}
+    
+    def _analyze_multiple_b64(self, image_b64: str, trigger_categories: List[str]) -> Dict[str, Dict]:
+        """Blocking multi-category confirmation of an encoded image"""
+        if self.multi_category and len(trigger_categories) > 1:
+            payload = self._build_payload(
+                self._build_multi_prompt(trigger_categories),
+                [image_b64],
+                json_format=True,
+                num_predict=16 * len(trigger_categories)
+            )
+            try:
+                raw_response, elapsed = self._generate(payload)
+                results = self._make_multi_results(raw_response, elapsed, trigger_categories)
+                if results is not None:
+                    return results
+            except CircuitOpenError:
+                return {category: self._circuit_open_result(category) for category in trigger_categories}
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Multi-category VLM request failed, falling back: {e}")
+        
+        return {
+            category: self._analyze_b64(image_b64, category)
+            for category in trigger_categories
+        }
+    
+    def _make_frames_results(
+        self,
+        raw_response: str,
+        elapsed: float,
+        trigger_category: str,
+        num_frames: int
+    ) -> Optional[List[Dict]]:
+        """Per-frame result dicts from one JSON answer (None if unparseable)"""
+        verdicts = self._parse_frames_response(raw_response, num_frames)
+        if verdicts is None:
+            self.frame_batch_fallbacks += 1
+            logger.debug(f"Multi-frame answer not parseable, falling back: {raw_response[:100]}")
+            return None
+        return [
+            {
+                'confirmed': confirmed,
+                'confidence': confidence,
+                'raw_response': raw_response,
+                'elapsed_seconds': elapsed / num_frames,
+                'category': trigger_category
+            }
+            for confirmed, confidence in verdicts
+        ]
+    
+    def analyze_frames_batch(
+        self,
+        images: List[Union[str, Path, Image.Image, np.ndarray]],
+        trigger_category: str,
+        embeddings: Optional[np.ndarray] = None
+    ) -> List[Dict]:
+        """
+        Check one category on several frames with a single request.
+        
+        Frames are sent as separate images or as one contact sheet
+        (`vlm_frame_batch_mode`); falls back to one request per frame if the
+        answer can't be mapped back to every frame.
+        
+        Args:
+            images: Frames to analyze
+            trigger_category: Category name from TRIGGER_CATEGORIES
+            embeddings: (frames, dim) CLIP embeddings, enables verdict reuse
         
+        Returns:
+            List of analysis results, one per frame
+        """
+        results: List[Optional[Dict]] = [
+            self._reuse_lookup(trigger_category, embeddings[n] if embeddings is not None else None)
+            for n in range(len(images))
+        ]
+        todo = [n for n, result in enumerate(results) if result is None]
+        if not todo:
+            return results
+        
+        todo_images = [images[n] for n in todo]
+        answers = None
+        if len(todo_images) > 1:
+            try:
+                raw_response, elapsed = self._generate(self._frames_payload(todo_images, trigger_category))
+                answers = self._make_frames_results(raw_response, elapsed, trigger_category, len(todo_images))
+            except CircuitOpenError:
+                answers = [self._circuit_open_result(trigger_category) for _ in todo_images]
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Multi-frame VLM request failed, falling back: {e}")
+        if answers is None:
+            answers = [self.analyze_trigger(image, trigger_category) for image in todo_images]
+        
+        for n, result in zip(todo, answers):
+            results[n] = result
+            self._reuse_remember(trigger_category, embeddings[n] if embeddings is not None else None, result)
         return results
     
+    @property
+    def client(self) -> 'AsyncVLMClient':
+        """Lazy-start the async client (background loop + pooled session)"""
+        if self._client is None:
+            from analyzers.vlm_client import AsyncVLMClient
+            self._client = AsyncVLMClient(concurrency=self.concurrency)
+        return self._client
+    
+    async def analyze_trigger_async(
+        self,
+        image_b64: str,
+        trigger_category: str,
+        custom_prompt: Optional[str] = None
+    ) -> Dict[str, any]:
+        """
+        Coroutine version of analyze_trigger, run on the client loop.
+        
+        Takes an already-encoded image so encoding stays off the loop.
+        """
+        payload = self._build_payload(self._build_prompt(trigger_category, custom_prompt), [image_b64])
+        start_time = time.time()
+        
+        try:
+            raw_response, elapsed = await self._generate_async(payload)
+            return self._make_result(raw_response.lower(), elapsed, trigger_category)
+        
+        except asyncio.TimeoutError:
+            logger.error("VLM timeout")
+            return self._fail_safe_result('TIMEOUT', time.time() - start_time, trigger_category)
+        
+        except CircuitOpenError:
+            return self._circuit_open_result(trigger_category)
+        
+        except Exception as e:
+            logger.error(f"VLM request failed: {e}")
+            return self._fail_safe_result(f'ERROR: {e}', time.time() - start_time, trigger_category)
+    
+    async def analyze_multiple_async(
+        self,
+        image_b64: str,
+        trigger_categories: List[str]
+    ) -> Dict[str, Dict]:
+        """Coroutine version of analyze_multiple_triggers"""
+        if self.multi_category and len(trigger_categories) > 1:
+            payload = self._build_payload(
+                self._build_multi_prompt(trigger_categories),
+                [image_b64],
+                json_format=True,
+                num_predict=16 * len(trigger_categories)
+            )
+            try:
+                raw_response, elapsed = await self._generate_async(payload)
+                results = self._make_multi_results(raw_response, elapsed, trigger_categories)
+                if results is not None:
+                    return results
+            except CircuitOpenError:
+                return {category: self._circuit_open_result(category) for category in trigger_categories}
+            except Exception as e:
+                logger.warning(f"Multi-category VLM request failed, falling back: {e}")
+        
+        answers = await asyncio.gather(*[
+            self.analyze_trigger_async(image_b64, category) for category in trigger_categories
+        ])
+        return dict(zip(trigger_categories, answers))
+    
+    async def analyze_frames_async(self, payload: Dict[str, any], images_b64: List[str],
+                                   trigger_category: str) -> List[Dict]:
+        """Coroutine version of analyze_frames_batch (payload prepared by caller)"""
+        if len(images_b64) > 1:
+            try:
+                raw_response, elapsed = await self._generate_async(payload)
+                results = self._make_frames_results(raw_response, elapsed, trigger_category, len(images_b64))
+                if results is not None:
+                    return results
+            except CircuitOpenError:
+                return [self._circuit_open_result(trigger_category) for _ in images_b64]
+            except Exception as e:
+                logger.warning(f"Multi-frame VLM request failed, falling back: {e}")
+        
+        return list(await asyncio.gather(*[
+            self.analyze_trigger_async(image_b64, trigger_category) for image_b64 in images_b64
+        ]))
+    
+    def submit_frames(
+        self,
+        images: List[Union[str, Path, Image.Image, np.ndarray]],
+        trigger_category: str,
+        embeddings: Optional[np.ndarray] = None
+    ) -> Future:
+        """
+        Submit a multi-frame confirmation for one category without waiting.
+        
+        Returns:
+            concurrent.futures.Future resolving to a list of result dicts
+        """
+        results: List[Optional[Dict]] = [
+            self._reuse_lookup(trigger_category, embeddings[n] if embeddings is not None else None)
+            for n in range(len(images))
+        ]
+        todo = [n for n, result in enumerate(results) if result is None]
+        if not todo:
+            return _completed(results)
+        
+        todo_images = [images[n] for n in todo]
+        prepared = [self.payloads.acquire(image) for image in todo_images]
+        sheet_payload = None
+        if self.frame_batch_mode == 'contact_sheet' and len(todo_images) > 1:
+            sheet_payload = self._frames_payload(todo_images, trigger_category)
+        
+        async def confirm() -> List[Dict]:
+            try:
+                images_b64 = list(await asyncio.gather(*[asyncio.wrap_future(f) for f in prepared]))
+                payload = sheet_payload or self._build_payload(
+                    self._build_frames_prompt(trigger_category, len(todo_images)),
+                    images_b64,
+                    json_format=True,
+                    num_predict=8 * len(todo_images) + 8
+                )
+                answers = await self.analyze_frames_async(payload, images_b64, trigger_category)
+            finally:
+                for image in todo_images:
+                    self.payloads.release(image)
+            for n, result in zip(todo, answers):
+                results[n] = result
+                self._reuse_remember(
+                    trigger_category, embeddings[n] if embeddings is not None else None, result
+                )
+            return results
+        
+        return self.client.run(confirm())
+    
+    def submit_trigger(
+        self,
+        image: Union[str, Path, Image.Image, np.ndarray],
+        trigger_category: str,
+        custom_prompt: Optional[str] = None
+    ) -> Future:
+        """
+        Submit a confirmation without waiting for it.
+        
+        At most `vlm_concurrency` requests run at once; the rest queue in
+        the client loop.
+        
+        Returns:
+            concurrent.futures.Future resolving to the analyze_trigger dict
+        """
+        prepared = self.payloads.acquire(image)
+        
+        async def confirm() -> Dict[str, any]:
+            try:
+                image_b64 = await asyncio.wrap_future(prepared)
+                return await self.analyze_trigger_async(image_b64, trigger_category, custom_prompt)
+            finally:
+                self.payloads.release(image)
+        
+        return self.client.run(confirm())
+    
+    def submit_multiple(
+        self,
+        image: Union[str, Path, Image.Image, np.ndarray],
+        trigger_categories: List[str],
+        embedding: Optional[np.ndarray] = None
+    ) -> Future:
+        """
+        Submit a multi-category confirmation without waiting for it.
+        
+        Returns:
+            concurrent.futures.Future resolving to {category: result dict}
+        """
+        reused, remaining = self._split_reusable(list(trigger_categories), embedding)
+        if not remaining:
+            return _completed(reused)
+        
+        prepared = self.payloads.acquire(image)
+        
+        async def confirm() -> Dict[str, Dict]:
+            try:
+                image_b64 = await asyncio.wrap_future(prepared)
+                results = await self.analyze_multiple_async(image_b64, remaining)
+            finally:
+                self.payloads.release(image)
+            for category, result in results.items():
+                self._reuse_remember(category, embedding, result)
+            return {**reused, **results}
+        
+        return self.client.run(confirm())
+    
+    def close(self):
+        """Shut down the async client if it was started"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+    
     def is_ollama_available(self) -> bool:
         """Check if Ollama service is running"""
         try:
@@ -6,6 +6,7 @@ Acts as the first stage in the cascade - fast filtering before deep analysis.
 """
 
 import os
+from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Union
 import logging
@@ -21,12 +22,55 @@ except ImportError as e:
 import yaml
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
-from trigger_categories import TRIGGER_CATEGORIES, TriggerCategory, DetectionType
+from trigger_categories import TRIGGER_CATEGORIES, TriggerCategory, DetectionType, get_yolo_class_ids
+from analyzers.prompt_ensemble import build_category_prototypes, ensemble_threshold, ENSEMBLE_MODES
 
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class ScoreMatrix:
+    """
+    Columnar CLIP scores for a batch of frames.
+    
+    `scores[i, c]` is the max prompt similarity of frame i for
+    category `categories[c]`.
+    """
+    scores: np.ndarray          # (frames, categories) float32
+    categories: List[str]
+    embeddings: Optional[np.ndarray] = None  # (frames, dim) normalized CLIP embeddings
+    
+    def __len__(self) -> int:
+        return self.scores.shape[0]
+    
+    def column(self, category_name: str) -> np.ndarray:
+        """Scores of every frame for one category"""
+        return self.scores[:, self.categories.index(category_name)]
+    
+    def row(self, frame_idx: int) -> Dict[str, float]:
+        """Dict view of one frame (backward-compatible format)"""
+        return dict(zip(self.categories, self.scores[frame_idx].tolist()))
+    
+    def to_dicts(self) -> List[Dict[str, float]]:
+        """Dict view of every frame (backward-compatible format)"""
+        values = self.scores.tolist()
+        return [dict(zip(self.categories, frame_scores)) for frame_scores in values]
+    
+    def suspicious_mask(self, thresholds: np.ndarray) -> np.ndarray:
+        """
+        Boolean (frames, categories) mask of scores at or above threshold.
+        
+        Args:
+            thresholds: (categories,) threshold vector
+        """
+        return self.scores >= thresholds[None, :]
+    
+    def suspicious_categories(self, mask: np.ndarray, frame_idx: int) -> List[str]:
+        """Category names set in one row of a suspicious mask"""
+        return [self.categories[c] for c in np.flatnonzero(mask[frame_idx])]
+
+
 class FastFilter:
     """
     CLIP-based fast filter for initial trigger screening.
@@ -53,10 +97,22 @@ class FastFilter:
         
         self.batch_size = analysis_config.get('batch_size', 8)
         self.default_threshold = analysis_config.get('clip_threshold', 0.25)
+        self.yolo_confidence = analysis_config.get('yolo_confidence', 0.50)
         
         # Load per-category thresholds
         self.category_thresholds = self.config.get('trigger_thresholds', {})
         
+        # YOLO categories without class IDs fall back to CLIP
+        self.yolo_class_ids = get_yolo_class_ids(self.config)
+        
+        # Optional prompt ensembling (score against category centroids/prototypes)
+        self.ensemble_mode = analysis_config.get('prompt_ensemble', 'off') or 'off'
+        if self.ensemble_mode not in ENSEMBLE_MODES:
+            logger.warning(f"Unknown prompt_ensemble '{self.ensemble_mode}', using 'off'")
+            self.ensemble_mode = 'off'
+        self.prototypes_per_category = analysis_config.get('prototypes_per_category', 2)
+        self.ensemble_offset = analysis_config.get('prompt_ensemble_offset', 0.0)
+        
         # Load CLIP model
         logger.info(f"Loading CLIP model on {self.device}...")
         self.model = SentenceTransformer('clip-ViT-B-32', device=self.device)
@@ -64,7 +120,10 @@ class FastFilter:
         # Pre-compute text embeddings for all triggers
         self._prepare_embeddings()
         
-        logger.info(f"FastFilter ready: {len(self.text_prompts)} prompts indexed")
+        logger.info(
+            f"FastFilter ready: {len(self.text_prompts)} prompts indexed, "
+            f"{len(self.text_embeddings)} scored per frame (ensemble={self.ensemble_mode})"
+        )
     
     def _load_config(self, config_path: str) -> dict:
         """Load configuration from YAML file"""
@@ -87,21 +146,49 @@ class FastFilter:
         """Pre-compute text embeddings for all trigger prompts"""
         self.text_prompts: List[str] = []
         self.prompt_to_category: Dict[str, str] = {}
+        self.categories: List[str] = []
+        prompt_category_ids: List[int] = []
         
         # Collect all visual prompts from categories that use CLIP
         for category_name, category in TRIGGER_CATEGORIES.items():
-            if category.detection_type in [DetectionType.CLIP, DetectionType.FUSION, DetectionType.VLM]:
+            if self.uses_clip(category_name):
+                if not category.visual_prompts:
+                    continue
+                self.categories.append(category_name)
                 for prompt in category.visual_prompts:
                     self.text_prompts.append(prompt)
                     self.prompt_to_category[prompt] = category_name
+                    prompt_category_ids.append(len(self.categories) - 1)
         
         # Encode all text prompts
         logger.info(f"Encoding {len(self.text_prompts)} text prompts...")
-        self.text_embeddings = self.model.encode(
+        self.prompt_embeddings = self.model.encode(
             self.text_prompts,
             convert_to_tensor=True,
             show_progress_bar=False
         )
+        self.prompt_category_ids = prompt_category_ids
+        
+        # Rows actually scored per frame: every prompt, or one/few per category
+        if self.ensemble_mode == 'off':
+            self.text_embeddings = self.prompt_embeddings
+            row_category_ids = prompt_category_ids
+        else:
+            self.text_embeddings, row_category_ids = build_category_prototypes(
+                self.prompt_embeddings,
+                prompt_category_ids,
+                mode=self.ensemble_mode,
+                prototypes_per_category=self.prototypes_per_category
+            )
+        
+        # Row -> category column index, used for the scatter-max
+        self.prompt_category_index = torch.tensor(
+            row_category_ids, dtype=torch.long, device=self.text_embeddings.device
+        )
+        
+        self.threshold_vector = np.array(
+            [self.get_threshold(name) for name in self.categories], dtype=np.float32
+        )
         
         # Also add neutral/safe prompts for baseline comparison
         self.safe_prompts = ["neutral scene", "normal movie scene", "safe content"]
@@ -111,9 +198,29 @@ class FastFilter:
             show_progress_bar=False
         )
     
+    def uses_clip(self, category_name: str) -> bool:
+        """Whether CLIP scores this category (YOLO categories only as fallback)"""
+        category = TRIGGER_CATEGORIES[category_name]
+        if category.detection_type == DetectionType.YOLO:
+            return category_name not in self.yolo_class_ids
+        return category.detection_type in [DetectionType.CLIP, DetectionType.FUSION, DetectionType.VLM]
+    
     def get_threshold(self, category_name: str) -> float:
-        """Get the threshold for a specific category"""
-        # First check config overrides
+        """Effective threshold for a category (lowered by the ensemble offset for CLIP scores)"""
+        # Categories YOLO serves use detection confidences, not CLIP similarities
+        if category_name in self.yolo_class_ids:
+            return self.configured_threshold(category_name)
+        return ensemble_threshold(
+            self.configured_threshold(category_name), self.ensemble_mode, self.ensemble_offset
+        )
+    
+    def configured_threshold(self, category_name: str) -> float:
+        """Threshold as configured (max-over-prompts CLIP scale, or YOLO confidence)"""
+        # Categories YOLO serves use detection confidences, not CLIP similarities
+        if category_name in self.yolo_class_ids:
+            return self.category_thresholds.get(category_name, self.yolo_confidence)
+        
+        # First check config overrides (also YOLO categories on the CLIP fallback)
         if category_name in self.category_thresholds:
             return self.category_thresholds[category_name]
         
@@ -134,39 +241,11 @@ class FastFilter:
         Returns:
             Dict mapping category names to their highest similarity scores
         """
-        # Convert to PIL Image if needed
-        if isinstance(image, (str, Path)):
-            image = Image.open(image).convert('RGB')
-        elif isinstance(image, np.ndarray):
-            image = Image.fromarray(image)
-        
-        # Get image embedding
-        img_embedding = self.model.encode(
-            image,
-            convert_to_tensor=True,
-            show_progress_bar=False
-        )
-        
-        # Compute similarity with all trigger prompts
-        similarities = util.cos_sim(img_embedding, self.text_embeddings)[0]
-        
-        # Aggregate scores by category (take max per category)
-        category_scores: Dict[str, float] = {}
-        
-        for idx, prompt in enumerate(self.text_prompts):
-            category_name = self.prompt_to_category[prompt]
-            score = similarities[idx].item()
-            
-            if category_name not in category_scores:
-                category_scores[category_name] = score
-            else:
-                category_scores[category_name] = max(category_scores[category_name], score)
-        
-        return category_scores
+        return self.score_batch([image]).row(0)
     
     def is_suspicious(self, scores: Dict[str, float]) -> Tuple[bool, List[str]]:
         """
-        Determine if any category exceeds its threshold.
+        Determine if any category exceeds its effective threshold (same as suspicious_mask).
         
         Args:
             scores: Dict of category scores from analyze_image
@@ -183,54 +262,95 @@ class FastFilter:
         
         return len(suspicious_categories) > 0, suspicious_categories
     
-    def analyze_batch(self, images: List[Union[str, Path, Image.Image]]) -> List[Dict[str, float]]:
+    def _to_pil(self, image: Union[str, Path, Image.Image, np.ndarray]) -> Image.Image:
+        """Convert a path or array to an RGB PIL Image"""
+        if isinstance(image, (str, Path)):
+            return Image.open(image).convert('RGB')
+        if isinstance(image, np.ndarray):
+            return Image.fromarray(image)
+        return image
+    
+    def _category_scores(
+        self,
+        similarities: torch.Tensor,
+        category_index: Optional[torch.Tensor] = None
+    ) -> np.ndarray:
         """
-        Analyze a batch of images efficiently.
+        Reduce (frames, prompts) similarities to (frames, categories).
+        
+        One scatter-max over the prompt->category index, then a single
+        device->host copy for the whole batch.
+        """
+        if category_index is None:
+            category_index = self.prompt_category_index
+        num_frames = similarities.shape[0]
+        index = category_index.unsqueeze(0).expand(num_frames, -1)
+        category_scores = torch.full(
+            (num_frames, len(self.categories)),
+            float('-inf'),
+            dtype=similarities.dtype,
+            device=similarities.device
+        )
+        category_scores = category_scores.scatter_reduce(1, index, similarities, reduce='amax')
+        return category_scores.float().cpu().numpy()
+    
+    def score_batch(self, images: List[Union[str, Path, Image.Image, np.ndarray]]) -> ScoreMatrix:
+        """
+        Score a batch of images into a frames x categories matrix.
         
         Args:
-            images: List of image paths or PIL Images
+            images: List of image paths, PIL Images or numpy arrays
         
         Returns:
-            List of category score dicts (one per image)
+            ScoreMatrix with one row per image
         """
-        # Convert all to PIL Images
-        pil_images = []
-        for img in images:
-            if isinstance(img, (str, Path)):
-                pil_images.append(Image.open(img).convert('RGB'))
-            elif isinstance(img, np.ndarray):
-                pil_images.append(Image.fromarray(img))
-            else:
-                pil_images.append(img)
-        
-        # Batch encode images
+        return self.score_embeddings(self.encode_images(images))
+    
+    def encode_images(self, images: List[Union[str, Path, Image.Image, np.ndarray]]) -> torch.Tensor:
+        """Batch encode images to a (frames, dim) CLIP embedding tensor"""
+        pil_images = [self._to_pil(img) for img in images]
+        
         img_embeddings = self.model.encode(
             pil_images,
             batch_size=self.batch_size,
             convert_to_tensor=True,
             show_progress_bar=False
         )
-        
-        # Compute similarities for all images
+        if img_embeddings.dim() == 1:
+            img_embeddings = img_embeddings.unsqueeze(0)
+        return img_embeddings
+    
+    def score_embeddings(self, img_embeddings: torch.Tensor) -> ScoreMatrix:
+        """Score precomputed image embeddings against the active text rows"""
         all_similarities = util.cos_sim(img_embeddings, self.text_embeddings)
         
-        # Convert to category scores for each image
-        results = []
-        for img_idx in range(len(images)):
-            category_scores: Dict[str, float] = {}
-            
-            for prompt_idx, prompt in enumerate(self.text_prompts):
-                category_name = self.prompt_to_category[prompt]
-                score = all_similarities[img_idx][prompt_idx].item()
-                
-                if category_name not in category_scores:
-                    category_scores[category_name] = score
-                else:
-                    category_scores[category_name] = max(category_scores[category_name], score)
-            
-            results.append(category_scores)
+        return ScoreMatrix(
+            scores=self._category_scores(all_similarities),
+            categories=self.categories,
+            embeddings=torch.nn.functional.normalize(img_embeddings.float(), dim=-1).cpu().numpy()
+        )
+    
+    def suspicious_mask(self, matrix: ScoreMatrix) -> np.ndarray:
+        """Boolean (frames, categories) mask using per-category thresholds"""
+        return matrix.suspicious_mask(self.threshold_vector)
+    
+    def margin(self, category_name: str, score: float) -> float:
+        """How far a score lies above the category's effective threshold"""
+        return float(score) - float(self.threshold_vector[self.categories.index(category_name)])
+    
+    def analyze_batch(self, images: List[Union[str, Path, Image.Image]]) -> List[Dict[str, float]]:
+        """
+        Analyze a batch of images efficiently.
+        
+        Thin dict view over score_batch(), kept for backward compatibility.
+        
+        Args:
+            images: List of image paths or PIL Images
         
-        return results
+        Returns:
+            List of category score dicts (one per image)
+        """
+        return self.score_batch(images).to_dicts()
     
     def filter_images(self, image_paths: List[Path]) -> List[Tuple[Path, List[str]]]:
         """
@@ -247,12 +367,13 @@ class FastFilter:
         # Process in batches
         for i in range(0, len(image_paths), self.batch_size):
             batch_paths = image_paths[i:i + self.batch_size]
-            batch_scores = self.analyze_batch(batch_paths)
+            matrix = self.score_batch(batch_paths)
+            mask = self.suspicious_mask(matrix)
             
-            for path, scores in zip(batch_paths, batch_scores):
-                is_sus, categories = self.is_suspicious(scores)
-                if is_sus:
-                    suspicious_results.append((path, categories))
+            for row_idx in np.flatnonzero(mask.any(axis=1)):
+                suspicious_results.append(
+                    (batch_paths[row_idx], matrix.suspicious_categories(mask, row_idx))
+                )
         
         return suspicious_results
 
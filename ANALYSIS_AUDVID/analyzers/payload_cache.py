@@ -0,0 +1,186 @@
+"""
+VLM Payload Cache Module
+
+Prepares VLM-ready images (RGB, downscaled, JPEG, base64) once per frame
+in a small thread pool. A frame that is suspicious for several categories
+or sent in several requests is encoded only once; entries stay cached
+while any confirmation still uses them and are evicted least recently
+used beyond `max_entries`.
+
+Only the base64 string is kept: decoded frames are tracked by weak
+reference, so the cache never keeps a full frame alive once its
+encoding is done.
+"""
+
+import base64
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy pillow")
+
+
+logger = logging.getLogger(__name__)
+
+
+def encode_image(
+    image: Union[str, Path, Image.Image, np.ndarray],
+    max_size: int = 1024,
+    quality: int = 85
+) -> str:
+    """
+    Convert an image to the base64 JPEG the Ollama API expects.
+
+    Files are decoded at reduced scale where the format allows it (JPEG
+    draft mode); already-decoded images are used as-is. Downscaling uses
+    bilinear resampling with a box pre-reduction, which is much cheaper
+    than LANCZOS and indistinguishable at VLM input sizes.
+    """
+    if isinstance(image, (str, Path)):
+        with Image.open(image) as src:
+            src.draft('RGB', (max_size, max_size))
+            img = src.convert('RGB')
+    elif isinstance(image, np.ndarray):
+        img = Image.fromarray(image)
+    else:
+        img = image
+
+    if img.mode != 'RGB':
+        img = img.convert('RGB')
+
+    # Resize if too large (Moondream has limits)
+    if max(img.size) > max_size:
+        ratio = max_size / max(img.size)
+        new_size = (int(img.size[0] * ratio), int(img.size[1] * ratio))
+        img = img.resize(new_size, Image.Resampling.BILINEAR, reducing_gap=2.0)
+
+    buffer = BytesIO()
+    img.save(buffer, format='JPEG', quality=quality)
+    return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+@dataclass
+class _Entry:
+    future: Future
+    source: Optional[Callable[[], Any]] = None  # Weak reference for id()-keyed images
+    refs: int = 0
+
+    def alive(self) -> bool:
+        """False once a decoded source image is gone (its id() may be reused)"""
+        return self.source is None or self.source() is not None
+
+
+class PayloadCache:
+    """
+    Reference-counted, bounded cache of encoded frames.
+
+    Frames are keyed by path, or by object identity for decoded images
+    (the loader hands the same object to every stage).
+
+    Usage:
+        future = cache.acquire(image)   # encoding starts in the pool
+        ...
+        image_b64 = future.result()
+        cache.release(image)            # evictable once unreferenced
+    """
+
+    def __init__(self, workers: int = 2, max_entries: int = 16, max_size: int = 1024, quality: int = 85):
+        """
+        Args:
+            workers: Encoder threads
+            max_entries: Unreferenced entries kept for reuse
+            max_size: Longest side of the encoded image (pixels)
+            quality: JPEG quality
+        """
+        self.max_entries = max(1, max_entries)
+        self.max_size = max_size
+        self.quality = quality
+
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='vlm-payload')
+        self._entries: 'OrderedDict[Any, _Entry]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Run statistics
+        self.prepared = 0
+        self.reused = 0
+
+    @staticmethod
+    def _key(image: Any) -> Any:
+        return str(image) if isinstance(image, (str, Path)) else id(image)
+
+    def acquire(self, image: Union[str, Path, Image.Image, np.ndarray]) -> Future:
+        """
+        Get (or start preparing) the encoded frame and hold a reference.
+
+        Returns:
+            concurrent.futures.Future resolving to the base64 string
+        """
+        key = self._key(image)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._matches(entry, image):
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                entry.refs += 1
+                self._entries.move_to_end(key)
+                self.reused += 1
+                return entry.future
+
+            future = self._pool.submit(encode_image, image, self.max_size, self.quality)
+            self._entries[key] = _Entry(future, self._source(image), refs=1)
+            self.prepared += 1
+            self._trim()
+        return future
+
+    def release(self, image: Union[str, Path, Image.Image, np.ndarray]):
+        """Drop a reference taken by acquire()"""
+        with self._lock:
+            entry = self._entries.get(self._key(image))
+            if entry is not None and self._matches(entry, image):
+                entry.refs = max(0, entry.refs - 1)
+            self._trim()
+
+    def encode(self, image: Union[str, Path, Image.Image, np.ndarray]) -> str:
+        """Blocking acquire + release"""
+        future = self.acquire(image)
+        try:
+            return future.result()
+        finally:
+            self.release(image)
+
+    @staticmethod
+    def _source(image: Any) -> Optional[Callable[[], Any]]:
+        """Weak reference to a decoded image; None for paths (keyed by value)"""
+        if isinstance(image, (str, Path)):
+            return None
+        try:
+            return weakref.ref(image)
+        except TypeError:
+            # Not weak-referenceable: pin it so its id() stays unique
+            return lambda: image
+
+    @staticmethod
+    def _matches(entry: _Entry, image: Any) -> bool:
+        return entry.source is None or entry.source() is image
+
+    def _trim(self):
+        """Evict entries of collected images, then least recently used unreferenced ones beyond max_entries (lock held)"""
+        for key in [k for k, entry in self._entries.items() if not entry.alive()]:
+            del self._entries[key]
+
+        excess = len(self._entries) - self.max_entries
+        if excess <= 0:
+            return
+        for key in [k for k, entry in self._entries.items() if entry.refs == 0][:excess]:
+            del self._entries[key]
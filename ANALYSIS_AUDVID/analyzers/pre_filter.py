@@ -0,0 +1,391 @@
+"""
+Pre-Filter Module (stage 0)
+
+Cheap early-exit classifier that runs before CLIP. Computes color and
+texture statistics on a tiny thumbnail of each frame and marks obviously
+safe frames (black frames, title cards, flat dark dialogue shots) so they
+skip the ViT-B/32 encoder entirely.
+
+Two modes:
+- Calibrated: logistic probe fitted against CLIP verdicts, with an exit
+  threshold chosen to meet a recall target per TriggerCategory. Recall is
+  reported on held-out frames, and calibration is refused unless every
+  category has enough positives to pick a threshold from.
+- Uncalibrated: conservative rules that only exit near-black/flat frames.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy pillow")
+
+import yaml
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from trigger_categories import TRIGGER_CATEGORIES
+from capture_manifest import CaptureManifest
+
+
+logger = logging.getLogger(__name__)
+
+
+FEATURE_NAMES = [
+    'luma_mean', 'luma_std', 'luma_p95', 'dark_fraction',
+    'sat_mean', 'sat_std', 'colorfulness', 'red_fraction',
+    'skin_fraction', 'edge_density', 'gradient_mean'
+]
+
+
+class PreFilter:
+    """
+    Stage-0 early-exit filter ahead of FastFilter.
+
+    Only ever answers "certainly safe" or "ask CLIP" - it never marks a
+    frame as triggering.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        """
+        Initialize the pre-filter.
+
+        Args:
+            config_path: Path to configuration YAML
+        """
+        self.config = self._load_config(config_path)
+
+        analysis_config = self.config.get('analysis', {})
+        self.enabled = analysis_config.get('prefilter', False)
+        self.model_path = Path(analysis_config.get('prefilter_model', './prefilter_calibration.json'))
+        self.target_recall = analysis_config.get('prefilter_target_recall', 0.99)
+        self.min_positives = analysis_config.get('prefilter_min_positives', 20)
+        self.holdout = analysis_config.get('prefilter_holdout', 0.3)
+
+        self.thumbnail_size = (32, 32)
+
+        # Calibrated probe (None = rule-based mode)
+        self.calibration: Optional[Dict] = None
+        if self.model_path.exists():
+            self.load(self.model_path)
+
+        # Run statistics
+        self.frames_seen = 0
+        self.frames_exited = 0
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from YAML file"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+
+    @property
+    def is_calibrated(self) -> bool:
+        return self.calibration is not None
+
+    @property
+    def exit_rate(self) -> float:
+        return self.frames_exited / max(1, self.frames_seen)
+
+    def reset(self):
+        """Clear run statistics (next media)"""
+        self.frames_seen = 0
+        self.frames_exited = 0
+
+    def _thumbnail(self, image: Union[str, Path, Image.Image, np.ndarray]) -> np.ndarray:
+        """Decode to a (H, W, 3) uint8 thumbnail"""
+        if isinstance(image, np.ndarray):
+            image = Image.fromarray(image)
+
+        if isinstance(image, (str, Path)):
+            with Image.open(image) as img:
+                img.draft('RGB', (self.thumbnail_size[0] * 4, self.thumbnail_size[1] * 4))
+                return np.asarray(img.convert('RGB').resize(self.thumbnail_size, Image.Resampling.BILINEAR))
+
+        return np.asarray(image.convert('RGB').resize(self.thumbnail_size, Image.Resampling.BILINEAR))
+
+    def features(self, images: Sequence[Union[str, Path, Image.Image, np.ndarray]]) -> np.ndarray:
+        """
+        Compute color/texture statistics for a batch of frames.
+
+        Returns:
+            (frames, len(FEATURE_NAMES)) float32 array
+        """
+        thumbs = np.stack([self._thumbnail(img) for img in images]).astype(np.float32) / 255.0
+        n = len(thumbs)
+        r, g, b = thumbs[..., 0], thumbs[..., 1], thumbs[..., 2]
+
+        luma = (0.299 * r + 0.587 * g + 0.114 * b).reshape(n, -1)
+        cmax = thumbs.max(axis=-1)
+        cmin = thumbs.min(axis=-1)
+        sat = np.where(cmax > 0, (cmax - cmin) / np.maximum(cmax, 1e-6), 0.0).reshape(n, -1)
+
+        # Hasler-Suesstrunk colorfulness
+        rg = (r - g).reshape(n, -1)
+        yb = (0.5 * (r + g) - b).reshape(n, -1)
+        colorfulness = np.sqrt(rg.std(axis=1) ** 2 + yb.std(axis=1) ** 2) + \
+            0.3 * np.sqrt(rg.mean(axis=1) ** 2 + yb.mean(axis=1) ** 2)
+
+        red = ((r > 0.35) & (r > 1.6 * g) & (r > 1.6 * b)).reshape(n, -1)
+        skin = ((r > 0.37) & (g > 0.16) & (b > 0.08) & (r > g) & (r > b) &
+                ((r - g) > 0.06)).reshape(n, -1)
+
+        gray = luma.reshape(n, *self.thumbnail_size[::-1])
+        grad = np.abs(np.diff(gray, axis=2))[:, :-1, :] + np.abs(np.diff(gray, axis=1))[:, :, :-1]
+        grad = grad.reshape(n, -1)
+
+        return np.stack([
+            luma.mean(axis=1),
+            luma.std(axis=1),
+            np.percentile(luma, 95, axis=1),
+            (luma < 0.08).mean(axis=1),
+            sat.mean(axis=1),
+            sat.std(axis=1),
+            colorfulness,
+            red.mean(axis=1),
+            skin.mean(axis=1),
+            (grad > 0.12).mean(axis=1),
+            grad.mean(axis=1),
+        ], axis=1).astype(np.float32)
+
+    def suspicion_scores(self, features: np.ndarray) -> np.ndarray:
+        """Probe output in [0, 1]; low means safe (calibrated mode only)"""
+        cal = self.calibration
+        x = (features - np.asarray(cal['mean'])) / np.asarray(cal['std'])
+        logits = x @ np.asarray(cal['weights']) + cal['bias']
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def _rule_safe(self, features: np.ndarray) -> np.ndarray:
+        """Uncalibrated rules: near-black frames or flat, colorless cards"""
+        f = {name: features[:, i] for i, name in enumerate(FEATURE_NAMES)}
+        black = (f['luma_p95'] < 0.10) & (f['luma_mean'] < 0.05)
+        flat = (f['luma_std'] < 0.03) & (f['sat_mean'] < 0.08) & (f['edge_density'] < 0.01)
+        return black | flat
+
+    def safe_mask(self, images: Sequence[Union[str, Path, Image.Image, np.ndarray]]) -> np.ndarray:
+        """
+        Decide which frames can skip CLIP.
+
+        Returns:
+            (frames,) bool array, True = confidently safe
+        """
+        if not images:
+            return np.zeros(0, dtype=bool)
+
+        features = self.features(images)
+        if self.is_calibrated:
+            mask = self.suspicion_scores(features) < self.calibration['safe_threshold']
+        else:
+            mask = self._rule_safe(features)
+
+        self.frames_seen += len(mask)
+        self.frames_exited += int(mask.sum())
+        return mask
+
+    def calibrate(
+        self,
+        features: np.ndarray,
+        labels: np.ndarray,
+        categories: List[str],
+        target_recall: Optional[float] = None,
+        epochs: int = 500,
+        lr: float = 0.5
+    ) -> Dict:
+        """
+        Fit the logistic probe and pick an exit threshold.
+
+        Frames are split into a fitting set and a held-out set (in blocks
+        of consecutive frames, which are near-duplicates). The threshold is
+        the highest one at which every category keeps at least
+        `target_recall` of its fitting positives (100% for safety-critical
+        categories); the saved recall and exit rate are measured on the
+        held-out frames.
+
+        Args:
+            features: (frames, features) from features()
+            labels: (frames, categories) bool suspicious mask from FastFilter
+            categories: Category name per label column
+            target_recall: Required per-category recall (defaults to config)
+
+        Returns:
+            Calibration dict (also kept on self and savable with save())
+
+        Raises:
+            ValueError: A category has fewer than `min_positives` fitting
+                positives, or none held out (its threshold would be unfounded)
+        """
+        target_recall = target_recall if target_recall is not None else self.target_recall
+
+        block = 32
+        blocks = np.arange(len(labels)) // block
+        n_blocks = int(blocks.max()) + 1 if len(labels) else 0
+        held_blocks = np.random.default_rng(0).permutation(n_blocks)[:max(1, round(n_blocks * self.holdout))]
+        held = np.isin(blocks, held_blocks)
+
+        scarce = [
+            f"{name} ({int(labels[~held, c].sum())} fitting, {int(labels[held, c].sum())} held out)"
+            for c, name in enumerate(categories)
+            if labels[~held, c].sum() < self.min_positives or not labels[held, c].any()
+        ]
+        if scarce:
+            raise ValueError(
+                f"Not enough CLIP-suspicious frames to calibrate (need {self.min_positives} fitting "
+                f"positives and some held out per category): {', '.join(scarce)}"
+            )
+
+        features, held_features = features[~held], features[held]
+        labels, held_labels = labels[~held], labels[held]
+        y = labels.any(axis=1).astype(np.float32)
+
+        mean = features.mean(axis=0)
+        std = features.std(axis=0) + 1e-6
+        x = (features - mean) / std
+
+        # Class-balanced logistic regression by gradient descent
+        pos_weight = (len(y) - y.sum()) / max(y.sum(), 1.0)
+        sample_weight = np.where(y > 0, pos_weight, 1.0)
+        w = np.zeros(x.shape[1], dtype=np.float64)
+        bias = 0.0
+        for _ in range(epochs):
+            p = 1.0 / (1.0 + np.exp(-(x @ w + bias)))
+            err = (p - y) * sample_weight
+            w -= lr * (x.T @ err) / len(y)
+            bias -= lr * err.mean()
+
+        scores = 1.0 / (1.0 + np.exp(-(x @ w + bias)))
+
+        # Highest threshold that still meets each category's recall target
+        safe_threshold = 1.0
+        for c, name in enumerate(categories):
+            cat_scores = scores[labels[:, c]]
+            category = TRIGGER_CATEGORIES.get(name)
+            required = 1.0 if category and category.safety_critical else target_recall
+            limit = np.quantile(cat_scores, 1.0 - required) if required < 1.0 else cat_scores.min()
+            safe_threshold = min(safe_threshold, float(limit))
+
+        # Recall and exit rate on frames the threshold was not fitted on
+        held_scores = 1.0 / (1.0 + np.exp(-(((held_features - mean) / std) @ w + bias)))
+        exits = held_scores < safe_threshold
+        recall = {
+            name: float((held_labels[:, c] & ~exits).sum() / held_labels[:, c].sum())
+            for c, name in enumerate(categories)
+        }
+
+        self.calibration = {
+            'feature_names': FEATURE_NAMES,
+            'mean': mean.tolist(),
+            'std': std.tolist(),
+            'weights': w.tolist(),
+            'bias': float(bias),
+            'safe_threshold': safe_threshold,
+            'target_recall': target_recall,
+            'category_recall': recall,
+            'exit_rate': float(exits.mean()),
+            'frames': int(len(y)),
+            'held_out_frames': int(len(held_labels))
+        }
+        return self.calibration
+
+    def save(self, path: Optional[Path] = None):
+        """Save calibration to JSON"""
+        with open(path or self.model_path, 'w') as f:
+            json.dump(self.calibration, f, indent=2)
+
+    def load(self, path: Path):
+        """Load calibration from JSON"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if data.get('feature_names') != FEATURE_NAMES:
+            logger.warning(f"Pre-filter calibration {path} uses different features, ignoring it")
+            return
+        if 'held_out_frames' not in data:
+            logger.warning(f"Pre-filter calibration {path} was not validated on held-out frames, ignoring it")
+            return
+        self.calibration = data
+        logger.info(
+            f"Pre-filter calibrated: threshold={data['safe_threshold']:.3f}, "
+            f"calibration exit rate={data['exit_rate']:.1%}"
+        )
+
+    def summary(self) -> Dict:
+        """Run statistics for the analysis summary"""
+        return {
+            'mode': 'calibrated' if self.is_calibrated else 'rules',
+            'frames_seen': self.frames_seen,
+            'frames_exited': self.frames_exited,
+            'exit_rate': self.exit_rate,
+            'category_recall': (self.calibration or {}).get('category_recall', {})
+        }
+
+
+def main():
+    """CLI entry point: calibrate against CLIP verdicts or report calibration"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Stage-0 pre-filter calibration")
+    parser.add_argument('command', choices=['calibrate', 'report'])
+    parser.add_argument('--input', type=Path, default=Path('./raw_screenshots'), help='Frame directory')
+    parser.add_argument('--output', type=Path, help='Calibration JSON (defaults to config)')
+    parser.add_argument('--target-recall', type=float, help='Required per-category recall')
+    parser.add_argument('--config', default='config.yaml', help='Config file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    pre_filter = PreFilter(config_path=args.config)
+
+    if args.command == 'calibrate':
+        from analyzers.fast_filter import FastFilter
+
+        manifest = CaptureManifest(args.input)
+        if manifest.refresh():
+            frames = [args.input / entry.file for entry in manifest.entries(verify=True)]
+        else:
+            frames = sorted(list(args.input.glob("*.jpg")) + list(args.input.glob("*.png")))
+        if not frames:
+            print(f"No frames found in {args.input}")
+            return
+
+        fast_filter = FastFilter(config_path=args.config)
+        features, labels = [], []
+        for i in range(0, len(frames), fast_filter.batch_size):
+            batch = [str(f) for f in frames[i:i + fast_filter.batch_size]]
+            features.append(pre_filter.features(batch))
+            labels.append(fast_filter.suspicious_mask(fast_filter.score_batch(batch)))
+
+        try:
+            pre_filter.calibrate(
+                np.concatenate(features),
+                np.concatenate(labels),
+                fast_filter.categories,
+                target_recall=args.target_recall
+            )
+        except ValueError as e:
+            print(f"Calibration refused, pre-filter stays rule-based: {e}")
+            return
+        pre_filter.save(args.output)
+        print(f"Saved calibration to {args.output or pre_filter.model_path}")
+
+    if not pre_filter.is_calibrated:
+        print("No calibration found - pre-filter runs in rule-based mode")
+        return
+
+    cal = pre_filter.calibration
+    print("\n🧮 Pre-Filter Calibration:")
+    print("-" * 40)
+    print(f"Frames: {cal['frames']} fitted, {cal.get('held_out_frames', 0)} held out")
+    print(f"Exit threshold: {cal['safe_threshold']:.3f}")
+    print(f"Exit rate (held out): {cal['exit_rate']:.1%}")
+    print(f"Target recall: {cal['target_recall']:.1%}")
+    for name, recall in cal['category_recall'].items():
+        print(f"  {name}: {recall:.1%} held-out recall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Prompt Ensemble Module
+
+Collapses the per-prompt text embeddings of each trigger category into a
+normalized centroid (or a few prototypes), so per-frame scoring becomes a
+single embedding-vs-category matmul instead of embedding-vs-every-prompt.
+"""
+
+from typing import List, Tuple
+import logging
+
+try:
+    import torch
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install torch")
+
+
+logger = logging.getLogger(__name__)
+
+
+# Supported values for analysis.prompt_ensemble
+ENSEMBLE_MODES = ('off', 'centroid', 'prototypes')
+
+
+def ensemble_threshold(threshold: float, mode: str, offset: float) -> float:
+    """
+    Effective similarity threshold for a scoring mode.
+
+    Centroid/prototype scores run lower than max-over-prompts scores, by
+    about `offset` (see benchmarks/prompt_ensemble_bench.py).
+    """
+    return threshold - offset if mode != 'off' else threshold
+
+
+def _normalize(x: torch.Tensor) -> torch.Tensor:
+    return torch.nn.functional.normalize(x.float(), dim=-1)
+
+
+def _spherical_kmeans(embeddings: torch.Tensor, k: int, iterations: int = 10) -> torch.Tensor:
+    """
+    Cluster unit vectors into k normalized prototypes.
+
+    Deterministic farthest-point initialization so results do not change
+    between runs.
+    """
+    centers = [embeddings[0]]
+    for _ in range(1, k):
+        sims = torch.stack([embeddings @ c for c in centers]).max(dim=0).values
+        centers.append(embeddings[int(torch.argmin(sims))])
+    centers = torch.stack(centers)
+
+    for _ in range(iterations):
+        assignment = (embeddings @ centers.T).argmax(dim=1)
+        for c in range(k):
+            members = embeddings[assignment == c]
+            if len(members):
+                centers[c] = _normalize(members.mean(dim=0))
+
+    return centers
+
+
+def build_category_prototypes(
+    prompt_embeddings: torch.Tensor,
+    prompt_category_ids: List[int],
+    mode: str = 'centroid',
+    prototypes_per_category: int = 2
+) -> Tuple[torch.Tensor, List[int]]:
+    """
+    Reduce prompt embeddings to per-category prototype embeddings.
+
+    Args:
+        prompt_embeddings: (prompts, dim) text embeddings
+        prompt_category_ids: Category column index of each prompt
+        mode: 'centroid' (one vector per category) or 'prototypes'
+        prototypes_per_category: Max prototypes per category in 'prototypes' mode
+
+    Returns:
+        Tuple of ((rows, dim) normalized embeddings, category index per row)
+    """
+    if mode not in ('centroid', 'prototypes'):
+        raise ValueError(f"Unknown prompt ensemble mode: {mode}")
+
+    embeddings = _normalize(prompt_embeddings)
+    ids = torch.tensor(prompt_category_ids, device=embeddings.device)
+
+    rows: List[torch.Tensor] = []
+    row_category_ids: List[int] = []
+
+    for category_id in sorted(set(prompt_category_ids)):
+        members = embeddings[ids == category_id]
+
+        if mode == 'centroid' or len(members) <= 1:
+            protos = _normalize(members.mean(dim=0, keepdim=True))
+        else:
+            protos = _spherical_kmeans(members, min(prototypes_per_category, len(members)))
+
+        rows.append(protos)
+        row_category_ids.extend([category_id] * len(protos))
+
+    prototypes = torch.cat(rows).to(prompt_embeddings.dtype)
+    logger.info(
+        f"Prompt ensemble ({mode}): {len(prompt_category_ids)} prompts → "
+        f"{len(row_category_ids)} category embeddings"
+    )
+    return prototypes, row_category_ids
@@ -0,0 +1,171 @@
+"""
+Verdict Cache Module
+
+Disk-backed cache of VLM answers keyed by image content hash, model
+name, prompt text and generation options. Backed by SQLite in WAL mode
+so several worker processes can share one cache file safely; size is
+bounded with least-recently-used eviction.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+class VerdictCache:
+    """
+    Persistent LRU cache of raw VLM responses.
+
+    One SQLite connection per thread; cross-process safety comes from
+    SQLite's own locking (WAL + busy timeout).
+    """
+
+    def __init__(self, path: Path, max_entries: int = 100_000):
+        """
+        Args:
+            path: SQLite file (created if missing)
+            max_entries: Entries kept before LRU eviction
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._puts_since_evict = 0
+
+        # Run statistics
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+        with self._connection() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, "
+                "elapsed REAL NOT NULL, last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON verdicts(last_access)")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Per-thread connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.path), timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Cache key for an Ollama generate payload.
+
+        Images are reduced to their content hashes so the key is small
+        and independent of base64 formatting.
+        """
+        key_data = {
+            'model': payload.get('model'),
+            'prompt': payload.get('prompt'),
+            'options': payload.get('options', {}),
+            'format': payload.get('format'),
+            'images': [
+                hashlib.sha256(image.encode('ascii')).hexdigest()
+                for image in payload.get('images', [])
+            ]
+        }
+        encoded = json.dumps(key_data, sort_keys=True).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a cached response.
+
+        Returns:
+            (response text, original elapsed seconds) or None
+        """
+        try:
+            with self._connection() as conn:
+                row = conn.execute(
+                    "SELECT response, elapsed FROM verdicts WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE verdicts SET last_access = ? WHERE key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Verdict cache read failed: {e}")
+            row = None
+
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.time_saved += row[1]
+        return row[0], row[1]
+
+    def put(self, key: str, response: str, elapsed: float):
+        """Store a response, evicting least recently used entries if needed"""
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO verdicts (key, response, elapsed, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, elapsed, time.time())
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Verdict cache write failed: {e}")
+            return
+
+        with self._lock:
+            self._puts_since_evict += 1
+            should_evict = self._puts_since_evict >= 100
+            if should_evict:
+                self._puts_since_evict = 0
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        """Trim the cache to max_entries by last access time"""
+        try:
+            with self._connection() as conn:
+                count = conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    conn.execute(
+                        "DELETE FROM verdicts WHERE key IN ("
+                        "SELECT key FROM verdicts ORDER BY last_access ASC LIMIT ?)",
+                        (excess,)
+                    )
+                    logger.debug(f"Verdict cache evicted {excess} entries")
+        except sqlite3.Error as e:
+            logger.warning(f"Verdict cache eviction failed: {e}")
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / max(1, self.hits + self.misses)
+
+    def reset_stats(self):
+        """Clear run statistics (next media); cached verdicts are kept"""
+        self.hits = 0
+        self.misses = 0
+        self.time_saved = 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Run statistics for the analysis summary"""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hit_rate,
+            'time_saved': self.time_saved
+        }
@@ -0,0 +1,106 @@
+"""
+Verdict Index Module
+
+In-run index of CLIP embeddings of frames the VLM has already judged,
+per category. A new suspicious frame whose embedding lies within a small
+cosine distance of a judged frame reuses that verdict instead of paying
+another VLM round trip.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional
+import logging
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy")
+
+
+logger = logging.getLogger(__name__)
+
+
+class VerdictIndex:
+    """
+    Per-category nearest-neighbour lookup over judged frame embeddings.
+
+    Only the most recent `max_per_category` judgements are kept: near
+    duplicates are almost always neighbouring frames of the same scene.
+    """
+
+    def __init__(self, max_distance: float = 0.05, max_per_category: int = 512):
+        """
+        Args:
+            max_distance: Cosine distance (1 - cosine similarity) for reuse
+            max_per_category: Judged frames remembered per category
+        """
+        self.max_distance = max_distance
+        self.max_per_category = max_per_category
+
+        self._embeddings: Dict[str, np.ndarray] = {}
+        self._results: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        # Run statistics
+        self.lookups = 0
+        self.reused = 0
+
+    @staticmethod
+    def _normalize(embedding: np.ndarray) -> np.ndarray:
+        embedding = np.asarray(embedding, dtype=np.float32).ravel()
+        return embedding / max(float(np.linalg.norm(embedding)), 1e-12)
+
+    def lookup(self, category: str, embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Find the verdict of the closest judged frame within max_distance.
+
+        Returns:
+            Copy of the stored result marked 'reused', or None
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            self.lookups += 1
+            stored = self._embeddings.get(category)
+            if stored is None or len(stored) == 0:
+                return None
+
+            similarities = stored @ query
+            best = int(np.argmax(similarities))
+            if 1.0 - float(similarities[best]) > self.max_distance:
+                return None
+
+            self.reused += 1
+            result = dict(self._results[category][best])
+
+        result['reused'] = True
+        result['elapsed_seconds'] = 0.0
+        return result
+
+    def add(self, category: str, embedding: np.ndarray, result: Dict[str, Any]):
+        """Remember a VLM verdict for a frame embedding"""
+        vector = self._normalize(embedding)[None, :]
+        with self._lock:
+            if category in self._embeddings:
+                self._embeddings[category] = np.concatenate(
+                    (self._embeddings[category], vector)
+                )[-self.max_per_category:]
+                self._results[category] = (self._results[category] + [result])[-self.max_per_category:]
+            else:
+                self._embeddings[category] = vector
+                self._results[category] = [result]
+
+    def reset(self):
+        """Forget every judged frame and clear run statistics (next media)"""
+        with self._lock:
+            self._embeddings = {}
+            self._results = {}
+            self.lookups = 0
+            self.reused = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Run statistics for the analysis summary"""
+        return {
+            'lookups': self.lookups,
+            'reused': self.reused,
+            'reuse_rate': self.reused / max(1, self.lookups)
+        }
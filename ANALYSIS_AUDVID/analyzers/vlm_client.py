@@ -0,0 +1,142 @@
+"""
+Async VLM Client Module
+
+Bounded-concurrency HTTP client for the Ollama API. Runs its own asyncio
+event loop in a background thread with one connection-pooled aiohttp
+session, so synchronous callers (the analysis loop) can submit requests
+and keep working while responses are in flight.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple
+import logging
+
+try:
+    import aiohttp
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install aiohttp")
+
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncVLMClient:
+    """
+    Background event loop + shared aiohttp session.
+
+    At most `concurrency` requests are in flight at once; further
+    submissions wait on a semaphore inside the loop, not in the caller.
+    """
+
+    def __init__(self, concurrency: int = 4):
+        """
+        Args:
+            concurrency: Max simultaneous requests to the VLM server
+        """
+        self.concurrency = max(1, concurrency)
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name='vlm-client', daemon=True)
+        self._thread.start()
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.run(self._open()).result()
+
+    async def _open(self):
+        """Create loop-bound resources (must run inside the loop)"""
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        self._session = aiohttp.ClientSession(connector=connector)
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        return self._session
+
+    def run(self, coro: Coroutine) -> Future:
+        """Schedule a coroutine on the client loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def post_json(self, url: str, payload: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """
+        POST a JSON payload and return the decoded JSON response.
+
+        Raises:
+            asyncio.TimeoutError: Request exceeded `timeout` seconds
+            aiohttp.ClientError: Connection or HTTP error
+        """
+        async with self._semaphore:
+            async with self._session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                response.raise_for_status()
+                return await response.json(content_type=None)
+
+    async def post_stream(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        timeout: float,
+        stop: Callable[[str], bool]
+    ) -> Tuple[str, bool, Dict[str, Any]]:
+        """
+        POST a streaming generate request and accumulate its text.
+
+        Reading stops as soon as `stop(text)` is true; the connection is
+        then dropped so the server aborts the rest of the generation.
+
+        Returns:
+            (accumulated text, stopped early, timing) where timing has
+            'first_token' (seconds to the first chunk) and 'load_duration'
+            when the server reported it (final chunk only)
+
+        Raises:
+            asyncio.TimeoutError: Request exceeded `timeout` seconds
+            aiohttp.ClientError: Connection or HTTP error
+        """
+        text = ''
+        timing: Dict[str, Any] = {}
+        async with self._semaphore:
+            start_time = time.time()
+            async with self._session.post(
+                url,
+                json=payload,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                response.raise_for_status()
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    timing.setdefault('first_token', time.time() - start_time)
+                    if 'load_duration' in chunk:
+                        timing['load_duration'] = chunk['load_duration']
+                    text += chunk.get('response', '')
+                    if chunk.get('done'):
+                        return text, False, timing
+                    if stop(text):
+                        response.close()
+                        return text, True, timing
+        return text, False, timing
+
+    def close(self):
+        """Close the session and stop the loop"""
+        if not self.loop.is_running():
+            return
+
+        async def _close():
+            await self._session.close()
+
+        try:
+            self.run(_close()).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"VLM client close: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
@@ -0,0 +1,160 @@
+"""
+VLM Backend Health Module
+
+Latency tracking for adaptive per-request timeouts and a circuit breaker
+for the Ollama backend. When the backend keeps failing the breaker opens
+and requests fail immediately (callers fall back to their fail-safe
+verdicts) instead of each waiting out the full timeout; after
+`probe_interval` seconds one request is let through to test recovery.
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+import logging
+
+try:
+    import numpy as np
+    import requests
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy requests")
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of sending a request while the breaker is open"""
+
+
+class LatencyTracker:
+    """
+    Rolling per-image latency of successful requests.
+
+    The timeout is a multiple of the recent p95, scaled by the number of
+    images in the request and clamped to [min_timeout, max_timeout]. Until
+    enough samples exist (e.g. while the model is still loading) the full
+    max_timeout applies.
+    """
+
+    def __init__(
+        self,
+        min_timeout: float = 5.0,
+        max_timeout: float = 30.0,
+        multiplier: float = 3.0,
+        window: int = 50,
+        min_samples: int = 10
+    ):
+        """
+        Args:
+            min_timeout: Lower bound for adaptive timeouts (seconds)
+            max_timeout: Upper bound, also used before min_samples (seconds)
+            multiplier: Timeout = multiplier * p95 latency
+            window: Number of recent requests tracked
+            min_samples: Successful requests needed before adapting
+        """
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.multiplier = multiplier
+        self.min_samples = min_samples
+
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, elapsed: float, n_images: int = 1):
+        """Record the latency of a successful request"""
+        with self._lock:
+            self._samples.append(elapsed / max(1, n_images))
+
+    def timeout(self, n_images: int = 1) -> float:
+        """Timeout for a request carrying `n_images` images"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return self.max_timeout
+            p95 = float(np.percentile(np.asarray(self._samples), 95))
+        return float(np.clip(self.multiplier * p95 * max(1, n_images), self.min_timeout, self.max_timeout))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed    - requests flow normally
+    open      - requests are refused until probe_interval has passed
+    half_open - one probe request is in flight; its outcome closes or
+                re-opens the breaker
+    """
+
+    def __init__(self, failure_threshold: int = 5, probe_interval: float = 30.0):
+        """
+        Args:
+            failure_threshold: Consecutive failures that trip the breaker (0 = never)
+            probe_interval: Seconds between recovery probes while open
+        """
+        self.failure_threshold = failure_threshold
+        self.probe_interval = probe_interval
+
+        self.state = 'closed'
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+        # Run statistics
+        self.trips = 0
+        self.refused = 0
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open' and time.time() - self._opened_at >= self.probe_interval:
+                self.state = 'half_open'
+                logger.info("VLM circuit half-open: probing backend")
+                return True
+            self.refused += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != 'closed':
+                logger.info("VLM backend recovered: circuit closed")
+            self.state = 'closed'
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == 'half_open' or (
+                self.state == 'closed' and self.failure_threshold
+                and self._failures >= self.failure_threshold
+            ):
+                if self.state == 'closed':
+                    self.trips += 1
+                    logger.warning(
+                        f"VLM circuit open after {self._failures} consecutive failures; "
+                        f"using CLIP-only verdicts, probing every {self.probe_interval}s"
+                    )
+                self.state = 'open'
+                self._opened_at = time.time()
+
+    def reset_stats(self):
+        """Clear run statistics (next media); the breaker state is kept"""
+        with self._lock:
+            self.trips = 0
+            self.refused = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Run statistics for the analysis summary"""
+        return {
+            'state': self.state,
+            'trips': self.trips,
+            'refused': self.refused
+        }
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 10.0) -> float:
+    """Full-jitter exponential backoff before retry number `attempt` (0-based)"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
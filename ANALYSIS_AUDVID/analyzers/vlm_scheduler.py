@@ -0,0 +1,272 @@
+"""
+VLM Scheduler Module
+
+Priority queue in front of DeepAnalyzer's async submissions. Only as many
+requests as the VLM can serve are handed to the client at once; the rest
+wait here, ordered so that safety-critical and clearest-margin
+confirmations go first. An optional per-episode time budget resolves
+whatever is still queued when it runs out.
+
+Budget fallback policy (`vlm_budget_fallback`):
+    'clip'   - queued items keep their CLIP verdict (confirmed)
+    'reject' - queued items are dropped (not confirmed), except
+               safety-critical categories, which always keep 'clip'
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy pillow")
+
+import yaml
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from trigger_categories import TRIGGER_CATEGORIES
+
+
+logger = logging.getLogger(__name__)
+
+
+BUDGET_FALLBACKS = ('clip', 'reject')
+
+# Category declaration order, used as the final tie-break
+_CATEGORY_ORDER = {name: k for k, name in enumerate(TRIGGER_CATEGORIES)}
+
+
+def priority_key(categories: List[str], margin: float) -> Tuple[int, float, int]:
+    """
+    Sort key of a confirmation (lower runs first).
+
+    Args:
+        categories: Categories the request asks about
+        margin: Best CLIP score minus threshold among those categories
+
+    Returns:
+        (0 if any category is safety-critical else 1, -margin, category order)
+    """
+    safety = any(
+        TRIGGER_CATEGORIES[name].safety_critical
+        for name in categories if name in TRIGGER_CATEGORIES
+    )
+    order = min((_CATEGORY_ORDER.get(name, len(_CATEGORY_ORDER)) for name in categories), default=0)
+    return (0 if safety else 1, -float(margin), order)
+
+
+@dataclass(order=True)
+class _Job:
+    key: Tuple[int, float, int]
+    seq: int
+    submit: Callable[[], Future] = field(compare=False)
+    fallback: Callable[[], Any] = field(compare=False)
+    future: Future = field(compare=False)
+
+
+class VLMScheduler:
+    """
+    Priority- and deadline-aware dispatcher for one analysis episode.
+
+    At most `vlm_concurrency` requests are in flight; finished requests
+    pull the next highest-priority job from the queue.
+    """
+
+    def __init__(self, deep_analyzer, config_path: str = "config.yaml"):
+        """
+        Initialize the scheduler and start the episode budget clock.
+
+        Args:
+            deep_analyzer: DeepAnalyzer that performs the requests
+            config_path: Path to configuration YAML
+        """
+        self.deep_analyzer = deep_analyzer
+        self.config = self._load_config(config_path)
+
+        analysis_config = self.config.get('analysis', {})
+        self.max_in_flight = max(1, deep_analyzer.concurrency)
+        self.time_budget = analysis_config.get('vlm_time_budget', 0)
+        self.budget_fallback = analysis_config.get('vlm_budget_fallback', 'clip')
+
+        if self.budget_fallback not in BUDGET_FALLBACKS:
+            logger.warning(f"Unknown vlm_budget_fallback '{self.budget_fallback}', using 'clip'")
+            self.budget_fallback = 'clip'
+
+        self._queue: List[_Job] = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._pumping = threading.local()
+        self.expired = False
+
+        # Run statistics (server requests counted by the analyzer: cache and reuse hits never reach it)
+        self.dispatched = 0
+        self.fallbacks = 0
+        self.started = time.time()
+        self._requests_at_start = deep_analyzer.server_requests
+
+        self._timer: Optional[threading.Timer] = None
+        if self.time_budget and self.time_budget > 0:
+            self._timer = threading.Timer(self.time_budget, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from YAML file"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+
+    def budget_result(self, trigger_category: str) -> Dict[str, Any]:
+        """Result dict for a confirmation skipped because the budget ran out"""
+        category = TRIGGER_CATEGORIES.get(trigger_category)
+        safety = category is not None and category.safety_critical
+        return {
+            'confirmed': self.budget_fallback == 'clip' or safety,
+            'confidence': 0.0,
+            'raw_response': 'VLM time budget exhausted',
+            'elapsed_seconds': 0.0,
+            'category': trigger_category
+        }
+
+    def submit_multiple(
+        self,
+        image: Union[str, Path, Image.Image, np.ndarray],
+        trigger_categories: List[str],
+        margin: float,
+        embedding: Optional[np.ndarray] = None
+    ) -> Future:
+        """
+        Queue a multi-category confirmation of one frame.
+
+        Returns:
+            Future resolving to {category: result dict}
+        """
+        categories = list(trigger_categories)
+        return self._push(
+            priority_key(categories, margin),
+            lambda: self.deep_analyzer.submit_multiple(image, categories, embedding),
+            lambda: {name: self.budget_result(name) for name in categories}
+        )
+
+    def submit_frames(
+        self,
+        images: List[Union[str, Path, Image.Image, np.ndarray]],
+        trigger_category: str,
+        margin: float,
+        embeddings: Optional[np.ndarray] = None
+    ) -> Future:
+        """
+        Queue a multi-frame confirmation of one category.
+
+        Returns:
+            Future resolving to a list of result dicts, one per frame
+        """
+        return self._push(
+            priority_key([trigger_category], margin),
+            lambda: self.deep_analyzer.submit_frames(images, trigger_category, embeddings),
+            lambda: [self.budget_result(trigger_category) for _ in images]
+        )
+
+    def _push(self, key: Tuple[int, float, int], submit: Callable[[], Future], fallback: Callable[[], Any]) -> Future:
+        job = _Job(key, next(self._seq), submit, fallback, Future())
+        with self._lock:
+            expired = self.expired
+            if not expired:
+                heapq.heappush(self._queue, job)
+        if expired:
+            self._resolve_fallback(job)
+        else:
+            self._pump()
+        return job.future
+
+    def _pump(self):
+        """
+        Hand queued jobs to the client while there is free capacity.
+
+        Submissions answered without a request (cache or reuse hits) come
+        back as completed futures whose callbacks run right here; they
+        free their slot and this loop carries on instead of recursing.
+        """
+        if getattr(self._pumping, 'active', False):
+            return
+        self._pumping.active = True
+        try:
+            while True:
+                with self._lock:
+                    if self._in_flight >= self.max_in_flight or not self._queue:
+                        return
+                    job = heapq.heappop(self._queue)
+                    self._in_flight += 1
+                    self.dispatched += 1
+
+                try:
+                    inner = job.submit()
+                except Exception as e:
+                    with self._lock:
+                        self._in_flight -= 1
+                    job.future.set_exception(e)
+                    continue
+                inner.add_done_callback(lambda done, job=job: self._finished(job, done))
+        finally:
+            self._pumping.active = False
+
+    def _finished(self, job: _Job, inner: Future):
+        with self._lock:
+            self._in_flight -= 1
+
+        error = inner.exception()
+        if error is not None:
+            job.future.set_exception(error)
+        else:
+            job.future.set_result(inner.result())
+        self._pump()
+
+    def _resolve_fallback(self, job: _Job):
+        with self._lock:
+            self.fallbacks += 1
+        job.future.set_result(job.fallback())
+
+    def _expire(self):
+        """Budget exhausted: resolve everything still queued by policy"""
+        with self._lock:
+            self.expired = True
+            jobs, self._queue = self._queue, []
+
+        if jobs:
+            logger.warning(
+                f"VLM time budget ({self.time_budget}s) exhausted; "
+                f"{len(jobs)} queued confirmations use the '{self.budget_fallback}' fallback"
+            )
+        for job in sorted(jobs):
+            self._resolve_fallback(job)
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def close(self):
+        """Stop the budget clock"""
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def summary(self) -> Dict[str, Any]:
+        """Run statistics for the analysis summary"""
+        return {
+            'dispatched': self.dispatched,
+            'requests': self.deep_analyzer.server_requests - self._requests_at_start,
+            'fallbacks': self.fallbacks,
+            'expired': self.expired,
+            'elapsed': time.time() - self.started
+        }
@@ -0,0 +1,178 @@
+"""
+YOLO Detector Module (object detection)
+
+Runs batched YOLOv8 inference for categories with DetectionType.YOLO
+that declare `yolo_class_ids` (or get them from config overrides for
+custom weights). Object-type triggers are decided by the detector
+directly instead of by CLIP semantic similarity.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Union
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy pillow")
+
+import yaml
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from trigger_categories import get_yolo_class_ids
+
+
+logger = logging.getLogger(__name__)
+
+
+class YoloDetector:
+    """
+    Batched YOLO detector for object-type trigger categories.
+
+    Inactive (and the model is never loaded) when no category has class
+    IDs - e.g. stock COCO weights have no spider class.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        """
+        Initialize the detector.
+
+        Args:
+            config_path: Path to configuration YAML
+        """
+        self.config = self._load_config(config_path)
+
+        analysis_config = self.config.get('analysis', {})
+        self.weights = analysis_config.get('yolo_weights', 'yolov8n.pt')
+        self.use_onnx = analysis_config.get('yolo_onnx', False)
+        self.image_size = analysis_config.get('yolo_image_size', 640)
+        self.device = analysis_config.get('yolo_device', 'cpu')
+        self.default_confidence = analysis_config.get('yolo_confidence', 0.50)
+        self.category_thresholds = self.config.get('trigger_thresholds', {})
+
+        # Category -> class IDs (only categories the detector can decide)
+        self.category_class_ids: Dict[str, List[int]] = get_yolo_class_ids(self.config)
+        self.categories: List[str] = list(self.category_class_ids.keys())
+        self.class_ids: List[int] = sorted({c for ids in self.category_class_ids.values() for c in ids})
+
+        self.model = None
+        if self.active:
+            self._load_model()
+            logger.info(f"YoloDetector ready: {self.categories} (classes {self.class_ids})")
+        else:
+            logger.info("YoloDetector inactive: no category declares yolo_class_ids")
+
+        self.confidence_vector = np.array(
+            [self.get_threshold(name) for name in self.categories], dtype=np.float32
+        )
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from YAML file"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            logger.warning(f"Config not found at {config_path}, using defaults")
+            return {}
+
+    @property
+    def active(self) -> bool:
+        return bool(self.categories)
+
+    def _load_model(self):
+        """Load YOLO weights, exporting to ONNX first if requested"""
+        try:
+            from ultralytics import YOLO
+        except ImportError as e:
+            raise ImportError(f"Missing dependency: {e}. Run: pip install ultralytics")
+
+        model = YOLO(self.weights)
+
+        if self.use_onnx:
+            onnx_path = Path(self.weights).with_suffix('.onnx')
+            if not onnx_path.exists():
+                logger.info(f"Exporting {self.weights} to ONNX...")
+                onnx_path = Path(model.export(format='onnx', imgsz=self.image_size, dynamic=True))
+            model = YOLO(str(onnx_path), task='detect')
+
+        self.model = model
+
+    def get_threshold(self, category_name: str) -> float:
+        """Detection confidence required for a category"""
+        if category_name in self.category_thresholds:
+            return self.category_thresholds[category_name]
+        return self.default_confidence
+
+    def detect_batch(self, images: List[Union[str, Path, Image.Image, np.ndarray]]) -> np.ndarray:
+        """
+        Run one batched inference pass.
+
+        Args:
+            images: Frames (paths, PIL Images or arrays)
+
+        Returns:
+            (frames, categories) array of max detection confidence per category
+        """
+        scores = np.zeros((len(images), len(self.categories)), dtype=np.float32)
+        if not self.active or not images:
+            return scores
+
+        results = self.model.predict(
+            [str(img) if isinstance(img, Path) else img for img in images],
+            imgsz=self.image_size,
+            conf=float(self.confidence_vector.min()),
+            classes=self.class_ids,
+            device=self.device,
+            batch=len(images),
+            verbose=False
+        )
+
+        for frame_idx, result in enumerate(results):
+            if result.boxes is None or len(result.boxes) == 0:
+                continue
+            classes = result.boxes.cls.cpu().numpy().astype(int)
+            confidences = result.boxes.conf.cpu().numpy()
+            for c, name in enumerate(self.categories):
+                hits = np.isin(classes, self.category_class_ids[name])
+                if hits.any():
+                    scores[frame_idx, c] = confidences[hits].max()
+
+        return scores
+
+    def detected_mask(self, scores: np.ndarray) -> np.ndarray:
+        """Boolean (frames, categories) mask of confident detections"""
+        return scores >= self.confidence_vector[None, :]
+
+    def detect(self, image: Union[str, Path, Image.Image, np.ndarray]) -> Dict[str, float]:
+        """Detect on a single image, returning {category: confidence}"""
+        scores = self.detect_batch([image])[0]
+        return dict(zip(self.categories, scores.tolist()))
+
+
+def main():
+    """CLI entry point for testing"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Test YOLO object detector")
+    parser.add_argument('image', help='Path to image to analyze')
+    parser.add_argument('--config', default='config.yaml', help='Config file')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    detector = YoloDetector(config_path=args.config)
+    if not detector.active:
+        print("No YOLO categories configured (set yolo_class_ids / analysis.yolo_class_ids)")
+        return
+
+    print("\n🎯 Detection Results:")
+    print("-" * 40)
+    for category, score in detector.detect(args.image).items():
+        threshold = detector.get_threshold(category)
+        status = "⚠️ " if score >= threshold else "  "
+        print(f"{status}{category}: {score:.3f} (threshold: {threshold})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Mock Ollama Server
+
+Local stand-in for the parts of the Ollama API the analyzers use
+(`/api/tags`, `/api/generate` with and without streaming), so VLM
+performance work can be tested without a GPU or model weights.
+
+Latency, error rate, hangs and answers are configurable:
+    latency:  'fixed:1.0', 'uniform:0.5,2.0' or 'lognormal:1.0,0.5'
+              (median seconds, sigma), plus --per-image seconds per image
+    errors:   fraction of requests answered with HTTP 500
+    hangs:    fraction of requests that never answer (timeout testing)
+    answers:  probability that a question is answered "yes"
+    loading:  --load-time seconds paid when the model is not resident;
+              residency follows each request's keep_alive like Ollama
+
+Usage:
+    python benchmarks/mock_ollama.py --port 11435 --latency lognormal:0.8,0.4
+    python benchmarks/mock_ollama.py --error-rate 0.05 --hang-rate 0.01 --yes-rate 0.2
+"""
+
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+import argparse
+import logging
+
+from aiohttp import web
+
+
+logger = logging.getLogger(__name__)
+
+
+# Keys of the JSON answers DeepAnalyzer asks for
+_MULTI_KEY = re.compile(r'^- "([^"]+)":', re.MULTILINE)
+_FRAMES_KEYS = re.compile(r'with keys (.*?) and values')
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a zero-argument sampler (seconds)"""
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(',') if v]
+    if kind == 'fixed':
+        return lambda: values[0]
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        median, sigma = values
+        return lambda: random.lognormvariate(0.0, sigma) * median
+    raise ValueError(f"Unknown latency spec: {spec}")
+
+
+def parse_keep_alive(value) -> float:
+    """Ollama keep_alive ('30m', '10s', '1h', seconds; negative = forever) to seconds"""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        units = {'s': 1, 'm': 60, 'h': 3600}
+        value = str(value).strip()
+        seconds = float(value[:-1]) * units[value[-1]] if value[-1] in units else float(value)
+    return float('inf') if seconds < 0 else seconds
+
+
+class MockOllama:
+    """
+    aiohttp application imitating an Ollama server.
+
+    Counters (requests, errors, hangs, cancelled streams) are kept for
+    the load-test report.
+    """
+
+    def __init__(
+        self,
+        model: str = 'moondream',
+        latency: str = 'lognormal:0.8,0.4',
+        per_image: float = 0.0,
+        error_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        yes_rate: float = 0.3,
+        tokens: int = 12,
+        load_time: float = 0.0
+    ):
+        """
+        Args:
+            model: Model name reported by /api/tags
+            latency: Generation latency spec (see module docstring)
+            per_image: Extra seconds per attached image
+            error_rate: Fraction of generate calls failing with HTTP 500
+            hang_rate: Fraction of generate calls that never answer
+            yes_rate: Probability each question is answered "yes"
+            tokens: Tokens in a free-text answer (streaming granularity)
+            load_time: Seconds to load the model when it is not resident
+        """
+        self.model = model
+        self.sample_latency = parse_latency(latency)
+        self.per_image = per_image
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.yes_rate = yes_rate
+        self.tokens = max(2, tokens)
+        self.load_time = load_time
+        self.loaded_until = 0.0
+
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+        self.cancelled = 0
+        self.loads = 0
+
+        self.app = web.Application(client_max_size=64 * 1024 ** 2)
+        self.app.router.add_get('/api/tags', self.tags)
+        self.app.router.add_post('/api/generate', self.generate)
+
+        self._runner: Optional[web.AppRunner] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def tags(self, request: web.Request) -> web.Response:
+        return web.json_response({'models': [{'name': f'{self.model}:latest'}]})
+
+    def _answer(self, payload: Dict) -> str:
+        """Canned answer in the shape the prompt asks for"""
+        prompt = payload.get('prompt', '')
+        if payload.get('format') == 'json':
+            keys: List[str] = _MULTI_KEY.findall(prompt)
+            frames = _FRAMES_KEYS.search(prompt)
+            if not keys and frames:
+                keys = re.findall(r'"([^"]+)"', frames.group(1))
+            return json.dumps({key: 'yes' if random.random() < self.yes_rate else 'no' for key in keys})
+
+        verdict = 'Yes' if random.random() < self.yes_rate else 'No'
+        filler = ' '.join(['the image shows a scene'] * self.tokens).split()[:self.tokens - 1]
+        return ' '.join([f'{verdict},'] + filler) + '.'
+
+    def _load_model(self, keep_alive) -> float:
+        """Seconds of model load this request pays; extends residency"""
+        now = time.time()
+        load = 0.0
+        if now >= self.loaded_until:
+            load = self.load_time
+            self.loads += 1
+        self.loaded_until = now + load + parse_keep_alive(keep_alive)
+        return load
+
+    async def generate(self, request: web.Request) -> web.StreamResponse:
+        payload = await request.json()
+        self.requests += 1
+        load = self._load_model(payload.get('keep_alive', '5m'))
+
+        # Load-only request (no prompt, no images), as sent for preloading
+        if not payload.get('prompt') and not payload.get('images'):
+            await asyncio.sleep(load)
+            return web.json_response({
+                'model': self.model, 'response': '', 'done': True, 'load_duration': int(load * 1e9)
+            })
+
+        roll = random.random()
+        if roll < self.hang_rate:
+            self.hangs += 1
+            await asyncio.sleep(3600)
+        if roll < self.hang_rate + self.error_rate:
+            self.errors += 1
+            return web.json_response({'error': 'mock failure'}, status=500)
+
+        latency = self.sample_latency() + self.per_image * len(payload.get('images', []))
+        answer = self._answer(payload)
+
+        if not payload.get('stream', True):
+            await asyncio.sleep(load + latency)
+            return web.json_response({
+                'model': self.model, 'response': answer, 'done': True, 'load_duration': int(load * 1e9)
+            })
+
+        # Streaming: model load delays the first token, latency is spread over the tokens
+        response = web.StreamResponse(headers={'Content-Type': 'application/x-ndjson'})
+        await response.prepare(request)
+        await asyncio.sleep(load)
+        pieces = answer.split(' ')
+        start = time.time()
+        try:
+            for n, piece in enumerate(pieces):
+                await asyncio.sleep(latency / len(pieces))
+                token = piece if n == 0 else ' ' + piece
+                await response.write((json.dumps({'response': token, 'done': False}) + '\n').encode())
+            await response.write((json.dumps({
+                'response': '', 'done': True, 'total_duration': int((time.time() - start) * 1e9),
+                'load_duration': int(load * 1e9)
+            }) + '\n').encode())
+        except ConnectionResetError:
+            # Client stopped reading (early stop): expected, nothing to log
+            self.cancelled += 1
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return response
+
+    def start_in_thread(self, host: str = '127.0.0.1', port: int = 11435) -> str:
+        """
+        Serve from a background thread.
+
+        Returns:
+            Generate URL to put in `analysis.ollama_url`
+        """
+        ready = threading.Event()
+
+        def serve():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._runner = web.AppRunner(self.app)
+            self._loop.run_until_complete(self._runner.setup())
+            self._loop.run_until_complete(web.TCPSite(self._runner, host, port).start())
+            ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=serve, name='mock-ollama', daemon=True).start()
+        ready.wait(timeout=10)
+        return f'http://{host}:{port}/api/generate'
+
+    def stop(self):
+        """Stop a server started with start_in_thread()"""
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result(timeout=5)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'hangs': self.hangs,
+            'cancelled': self.cancelled,
+            'loads': self.loads
+        }
+
+
+def add_mock_arguments(parser: argparse.ArgumentParser):
+    """CLI options shared with the load-test harness"""
+    parser.add_argument('--model', default='moondream', help='Model name to report')
+    parser.add_argument('--latency', default='lognormal:0.8,0.4', help='fixed:S | uniform:A,B | lognormal:MEDIAN,SIGMA')
+    parser.add_argument('--per-image', type=float, default=0.0, help='Extra seconds per image')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 answers')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='Fraction of requests that never answer')
+    parser.add_argument('--yes-rate', type=float, default=0.3, help='Probability of a "yes" answer')
+    parser.add_argument('--load-time', type=float, default=0.0, help='Seconds to load a non-resident model')
+
+
+def mock_from_args(args: argparse.Namespace) -> MockOllama:
+    return MockOllama(
+        model=args.model,
+        latency=args.latency,
+        per_image=args.per_image,
+        error_rate=args.error_rate,
+        hang_rate=args.hang_rate,
+        yes_rate=args.yes_rate,
+        load_time=args.load_time
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock Ollama server for VLM testing")
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address')
+    parser.add_argument('--port', type=int, default=11435, help='Port (real Ollama uses 11434)')
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    mock = mock_from_args(args)
+    print(f"🧪 Mock Ollama on http://{args.host}:{args.port} (model {args.model}, latency {args.latency})")
+    print(f"Set analysis.ollama_url to http://{args.host}:{args.port}/api/generate")
+    web.run_app(mock.app, host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()
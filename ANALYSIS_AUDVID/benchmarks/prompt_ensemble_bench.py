@@ -0,0 +1,96 @@
+"""
+Prompt Ensemble Benchmark
+
+Compares max-over-prompts CLIP scoring against category-centroid and
+per-category-prototype scoring on a folder of captured frames:
+- scoring time per frame (similarity matmul + category reduction)
+- score agreement (correlation, mean offset) per category
+- decision agreement at the configured thresholds
+
+Usage:
+    python benchmarks/prompt_ensemble_bench.py --input ./raw_screenshots
+"""
+
+import sys
+import time
+from pathlib import Path
+import argparse
+
+import numpy as np
+import torch
+from sentence_transformers import util
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from analyzers.fast_filter import FastFilter
+from analyzers.prompt_ensemble import build_category_prototypes
+
+
+def time_scoring(ff: FastFilter, img_embeddings: torch.Tensor, rows: torch.Tensor,
+                 row_ids: list, repeat: int) -> tuple:
+    """Return (scores, seconds per frame) for one set of text rows"""
+    index = torch.tensor(row_ids, dtype=torch.long, device=rows.device)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scores = ff._category_scores(util.cos_sim(img_embeddings, rows), index)
+    elapsed = time.perf_counter() - start
+
+    return scores, elapsed / (repeat * len(img_embeddings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prompt ensembling")
+    parser.add_argument('--input', type=Path, default=Path('./raw_screenshots'), help='Frame directory')
+    parser.add_argument('--config', default='config.yaml', help='Config file')
+    parser.add_argument('--limit', type=int, default=512, help='Max frames to use')
+    parser.add_argument('--repeat', type=int, default=20, help='Timing repetitions')
+    parser.add_argument('--prototypes', type=int, default=2, help='Prototypes per category')
+    args = parser.parse_args()
+
+    frames = sorted(list(args.input.glob("*.jpg")) + list(args.input.glob("*.png")))[:args.limit]
+    if not frames:
+        print(f"No frames found in {args.input}")
+        return
+
+    ff = FastFilter(config_path=args.config)
+
+    start = time.perf_counter()
+    img_embeddings = ff.encode_images([str(f) for f in frames])
+    encode_per_frame = (time.perf_counter() - start) / len(frames)
+
+    base_scores, base_time = time_scoring(
+        ff, img_embeddings, ff.prompt_embeddings, ff.prompt_category_ids, args.repeat
+    )
+    thresholds = np.array([ff.configured_threshold(c) for c in ff.categories], dtype=np.float32)
+    base_mask = base_scores >= thresholds
+
+    print(f"\n📊 Prompt Ensemble Benchmark ({len(frames)} frames, device={ff.device})")
+    print("-" * 70)
+    print(f"Image encoding:          {encode_per_frame * 1000:8.3f} ms/frame (shared by all modes)")
+    print(f"max-over-prompts ({len(ff.prompt_category_ids):3d} rows): {base_time * 1e6:8.2f} µs/frame")
+
+    for mode in ('centroid', 'prototypes'):
+        rows, row_ids = build_category_prototypes(
+            ff.prompt_embeddings, ff.prompt_category_ids, mode, args.prototypes
+        )
+        scores, mode_time = time_scoring(ff, img_embeddings, rows, row_ids, args.repeat)
+
+        # Per-category offset that best aligns ensemble scores with max-over-prompts
+        offsets = np.median(base_scores - scores, axis=0)
+        mask = scores >= (thresholds - offsets)
+
+        print(f"\n{mode} ({len(row_ids):3d} rows): {mode_time * 1e6:8.2f} µs/frame "
+              f"({base_time / max(mode_time, 1e-12):.1f}x faster scoring)")
+        print(f"  {'Category':<28}{'corr':>7}{'offset':>9}{'agree':>8}{'recall':>8}")
+        for c, name in enumerate(ff.categories):
+            corr = np.corrcoef(base_scores[:, c], scores[:, c])[0, 1] if len(frames) > 1 else 1.0
+            agree = (mask[:, c] == base_mask[:, c]).mean()
+            positives = base_mask[:, c].sum()
+            recall = (mask[:, c] & base_mask[:, c]).sum() / positives if positives else float('nan')
+            print(f"  {name:<28}{corr:7.3f}{offsets[c]:9.3f}{agree:8.1%}{recall:8.1%}")
+
+        print(f"  Suggested prompt_ensemble_offset: {float(np.median(offsets)):.3f}")
+
+
+if __name__ == "__main__":
+    main()
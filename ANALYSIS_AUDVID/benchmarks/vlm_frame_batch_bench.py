@@ -0,0 +1,93 @@
+"""
+VLM Multi-Frame Batching Benchmark
+
+Measures, per batch size and packing mode, how long the VLM takes per
+frame and how often its verdicts agree with one-frame-per-request
+answers (or with ground-truth labels), so batching can be enabled per
+model only where it pays off.
+
+Usage:
+    python benchmarks/vlm_frame_batch_bench.py --input ./raw_screenshots --category Violence
+    python benchmarks/vlm_frame_batch_bench.py --input ./frames --labels labels.csv --sizes 1 2 4 8
+"""
+
+import sys
+import time
+from pathlib import Path
+import argparse
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from analyzers.deep_analyzer import DeepAnalyzer
+
+
+def run(analyzer: DeepAnalyzer, frames: list, category: str, batch_size: int) -> tuple:
+    """Return (verdicts, seconds per frame, fallbacks) for one configuration"""
+    analyzer.frame_batch_fallbacks = 0
+    verdicts = []
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        chunk = frames[i:i + batch_size]
+        if batch_size == 1:
+            results = [analyzer.analyze_trigger(chunk[0], category)]
+        else:
+            results = analyzer.analyze_frames_batch(chunk, category)
+        verdicts.extend(r['confirmed'] for r in results)
+    elapsed = time.perf_counter() - start
+
+    return verdicts, elapsed / len(frames), analyzer.frame_batch_fallbacks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-frame VLM requests")
+    parser.add_argument('--input', type=Path, default=Path('./raw_screenshots'), help='Frame directory')
+    parser.add_argument('--category', default='Violence', help='Trigger category to ask about')
+    parser.add_argument('--labels', type=Path, help='CSV with filename + category column as ground truth')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4], help='Batch sizes to test')
+    parser.add_argument('--modes', nargs='+', default=['images', 'contact_sheet'], help='Packing modes')
+    parser.add_argument('--limit', type=int, default=32, help='Max frames to use')
+    parser.add_argument('--config', default='config.yaml', help='Config file')
+    args = parser.parse_args()
+
+    frames = sorted(list(args.input.glob("*.jpg")) + list(args.input.glob("*.png")))[:args.limit]
+    if not frames:
+        print(f"No frames found in {args.input}")
+        return
+
+    analyzer = DeepAnalyzer(config_path=args.config)
+    if not analyzer.is_ollama_available():
+        print("❌ Ollama is not running. Start it with: ollama serve")
+        return
+    analyzer.cache = None
+
+    # Reference verdicts: ground truth if given, else one frame per request
+    reference, reference_time, _ = run(analyzer, frames, args.category, 1)
+    reference_name = 'single-frame answers'
+    if args.labels:
+        labels = pd.read_csv(args.labels).set_index('filename')[args.category]
+        reference = [bool(labels.get(f.name, False)) for f in frames]
+        reference_name = f'labels in {args.labels.name}'
+
+    print(f"\n📊 Multi-Frame VLM Benchmark: {analyzer.model_name}, {args.category}, {len(frames)} frames")
+    print(f"Reference: {reference_name}")
+    print("-" * 70)
+    print(f"{'mode':<15}{'batch':>6}{'s/frame':>10}{'speedup':>9}{'agree':>8}{'recall':>8}{'fallbacks':>11}")
+    print(f"{'single':<15}{1:>6}{reference_time:>10.2f}{1.0:>8.1f}x")
+
+    positives = sum(reference)
+    for mode in args.modes:
+        analyzer.frame_batch_mode = mode
+        for size in args.sizes:
+            if size == 1:
+                continue
+            verdicts, per_frame, fallbacks = run(analyzer, frames, args.category, size)
+            agree = sum(v == r for v, r in zip(verdicts, reference)) / len(frames)
+            recall = sum(v and r for v, r in zip(verdicts, reference)) / positives if positives else float('nan')
+            print(f"{mode:<15}{size:>6}{per_frame:>10.2f}{reference_time / max(per_frame, 1e-9):>8.1f}x"
+                  f"{agree:>8.1%}{recall:>8.1%}{fallbacks:>11}")
+
+
+if __name__ == "__main__":
+    main()
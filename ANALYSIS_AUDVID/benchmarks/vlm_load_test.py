@@ -0,0 +1,137 @@
+"""
+VLM Load Test
+
+Drives the real DeepAnalyzer (async client, scheduler-facing submit API,
+timeouts, retries, circuit breaker) against the bundled mock Ollama
+server, or any running server, and reports throughput, tail latency and
+timeout/failure behavior at several concurrency levels.
+
+Usage:
+    python benchmarks/vlm_load_test.py --requests 200 --concurrency 1 2 4 8
+    python benchmarks/vlm_load_test.py --latency lognormal:1.5,0.6 --hang-rate 0.02 --timeout 5
+    python benchmarks/vlm_load_test.py --url http://localhost:11434/api/generate --requests 50
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+import argparse
+
+import numpy as np
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+from analyzers.deep_analyzer import DeepAnalyzer
+from mock_ollama import add_mock_arguments, mock_from_args
+
+
+def make_config(base_config: str, url: str, timeout: float) -> str:
+    """Config copy pointing at the test server with caching/reuse off"""
+    try:
+        with open(base_config, 'r') as f:
+            config = yaml.safe_load(f) or {}
+    except FileNotFoundError:
+        config = {}
+
+    analysis = config.setdefault('analysis', {})
+    analysis['ollama_url'] = url
+    analysis['vlm_timeout'] = timeout
+    analysis['vlm_cache'] = False
+    analysis['vlm_reuse_distance'] = 0
+
+    handle = tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False)
+    yaml.safe_dump(config, handle)
+    handle.close()
+    return handle.name
+
+
+def run_level(config_path: str, concurrency: int, images: list, categories: list) -> dict:
+    """Submit every image once at one concurrency level"""
+    analyzer = DeepAnalyzer(config_path=config_path)
+    analyzer.concurrency = concurrency
+
+    latencies = []
+    outcomes = {'ok': 0, 'timeout': 0, 'error': 0, 'circuit_open': 0}
+
+    start = time.perf_counter()
+    futures = []
+    for image in images:
+        submitted = time.perf_counter()
+        future = analyzer.submit_multiple(image, categories)
+        future.add_done_callback(lambda done, t=submitted: latencies.append(time.perf_counter() - t))
+        futures.append(future)
+
+    for future in futures:
+        for result in future.result().values():
+            raw = result['raw_response']
+            if raw == 'TIMEOUT':
+                outcomes['timeout'] += 1
+            elif raw == 'CIRCUIT OPEN':
+                outcomes['circuit_open'] += 1
+            elif raw.startswith('ERROR'):
+                outcomes['error'] += 1
+            else:
+                outcomes['ok'] += 1
+    wall = time.perf_counter() - start
+
+    analyzer.close()
+    lat = np.array(latencies)
+    return {
+        'throughput': len(images) / wall,
+        'p50': np.percentile(lat, 50),
+        'p95': np.percentile(lat, 95),
+        'p99': np.percentile(lat, 99),
+        'retries': analyzer.retried,
+        'trips': analyzer.breaker.trips,
+        **outcomes
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test DeepAnalyzer against a (mock) Ollama server")
+    parser.add_argument('--url', help='Use this server instead of starting the mock')
+    parser.add_argument('--port', type=int, default=11435, help='Mock server port')
+    parser.add_argument('--requests', type=int, default=100, help='Frames submitted per level')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 2, 4, 8], help='Levels to test')
+    parser.add_argument('--categories', nargs='+', default=['Violence'], help='Categories asked per frame')
+    parser.add_argument('--timeout', type=float, default=30, help='vlm_timeout for the run')
+    parser.add_argument('--config', default='config.yaml', help='Base config file')
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    mock = None
+    url = args.url
+    if url is None:
+        mock = mock_from_args(args)
+        url = mock.start_in_thread(port=args.port)
+
+    config_path = make_config(args.config, url, args.timeout)
+
+    # Distinct frames so nothing is deduplicated along the way
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 255, (224, 224, 3), dtype=np.uint8) for _ in range(args.requests)]
+
+    print(f"\n📊 VLM Load Test: {url}, {args.requests} frames x {args.categories}")
+    if mock is not None:
+        print(f"Mock: latency {args.latency}, errors {args.error_rate:.0%}, hangs {args.hang_rate:.0%}")
+    print("-" * 92)
+    print(f"{'conc':>5}{'frames/s':>10}{'p50':>9}{'p95':>9}{'p99':>9}"
+          f"{'ok':>6}{'timeout':>9}{'error':>7}{'open':>6}{'retries':>9}{'trips':>7}")
+
+    try:
+        for concurrency in args.concurrency:
+            r = run_level(config_path, concurrency, images, args.categories)
+            print(f"{concurrency:>5}{r['throughput']:>10.2f}{r['p50']:>8.2f}s{r['p95']:>8.2f}s{r['p99']:>8.2f}s"
+                  f"{r['ok']:>6}{r['timeout']:>9}{r['error']:>7}{r['circuit_open']:>6}"
+                  f"{r['retries']:>9}{r['trips']:>7}")
+    finally:
+        Path(config_path).unlink(missing_ok=True)
+        if mock is not None:
+            print(f"Mock server: {mock.stats()}")
+            mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+VLM Streaming Benchmark
+
+Measures per-call latency of single-category confirmations with the full
+generation (stream off) versus streamed answers cut off at the first
+clear YES/NO (stream on), and checks that both give the same verdicts.
+The verdict cache is disabled so every call reaches the model.
+
+Usage:
+    python benchmarks/vlm_stream_bench.py --input ./raw_screenshots --category Violence
+    python benchmarks/vlm_stream_bench.py --input ./frames --repeats 3 --limit 50
+"""
+
+import sys
+import time
+from pathlib import Path
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from analyzers.deep_analyzer import DeepAnalyzer
+
+
+def run(analyzer: DeepAnalyzer, frames: list, category: str, stream: bool, repeats: int) -> tuple:
+    """Return (verdicts of the last repeat, per-call latencies) for one mode"""
+    analyzer.stream = stream
+    latencies = []
+    verdicts = []
+
+    for _ in range(repeats):
+        verdicts = []
+        for frame in frames:
+            start = time.perf_counter()
+            result = analyzer.analyze_trigger(frame, category)
+            latencies.append(time.perf_counter() - start)
+            verdicts.append(result['confirmed'])
+
+    return verdicts, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streamed early-stop VLM answers")
+    parser.add_argument('--input', type=Path, default=Path('./raw_screenshots'), help='Frame directory')
+    parser.add_argument('--category', default='Violence', help='Trigger category to ask about')
+    parser.add_argument('--limit', type=int, default=20, help='Max frames to use')
+    parser.add_argument('--repeats', type=int, default=2, help='Passes over the frames per mode')
+    parser.add_argument('--config', default='config.yaml', help='Config file')
+    args = parser.parse_args()
+
+    frames = sorted(list(args.input.glob("*.jpg")) + list(args.input.glob("*.png")))[:args.limit]
+    if not frames:
+        print(f"No frames found in {args.input}")
+        return
+
+    analyzer = DeepAnalyzer(config_path=args.config)
+    if not analyzer.is_ollama_available():
+        print("❌ Ollama is not running. Start it with: ollama serve")
+        return
+    analyzer.cache = None
+
+    # Warm the model so neither mode pays the cold load
+    analyzer.analyze_trigger(frames[0], args.category)
+
+    full_verdicts, full = run(analyzer, frames, args.category, stream=False, repeats=args.repeats)
+    analyzer.early_stops = 0
+    stream_verdicts, streamed = run(analyzer, frames, args.category, stream=True, repeats=args.repeats)
+
+    calls = len(streamed)
+    agree = sum(a == b for a, b in zip(full_verdicts, stream_verdicts)) / len(frames)
+
+    print(f"\n📊 Streaming Benchmark: {analyzer.model_name}, {args.category}, {calls} calls per mode")
+    print("-" * 60)
+    print(f"{'mode':<12}{'mean':>10}{'p50':>10}{'p95':>10}")
+    for name, lat in (('full', full), ('streamed', streamed)):
+        print(f"{name:<12}{lat.mean():>9.3f}s{np.percentile(lat, 50):>9.3f}s{np.percentile(lat, 95):>9.3f}s")
+    print("-" * 60)
+    print(f"Saved per call: {full.mean() - streamed.mean():.3f}s ({1 - streamed.mean() / full.mean():.1%})")
+    print(f"Early stops: {analyzer.early_stops}/{calls}")
+    print(f"Verdict agreement: {agree:.1%}")
+
+
+if __name__ == "__main__":
+    main()
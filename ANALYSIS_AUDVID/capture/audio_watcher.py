@@ -8,6 +8,7 @@ Platform-specific:
 - Linux: Uses PulseAudio monitor
 """
 
+import io
 import os
 import sys
 import time
@@ -25,6 +26,9 @@ except ImportError:
 
 import yaml
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from capture_manifest import CaptureManifestWriter
+
 
 logger = logging.getLogger(__name__)
 
@@ -158,20 +162,24 @@ class AudioWatcher:
         timestamp_str = f"{hours:02d}{minutes:02d}{seconds:02d}"
         return f"{self.media_name}_{timestamp_str}.wav"
     
-    def _save_wav_async(self, frames: list, filepath: Path, p: pyaudio.PyAudio, 
-                        device_rate: int):
-        """Save audio frames to WAV file in background thread"""
+    def _save_wav_async(self, frames: list, filename: str, timestamp: float, p: pyaudio.PyAudio,
+                        device_rate: int, manifest: CaptureManifestWriter) -> threading.Thread:
+        """Save audio frames to WAV file (and its manifest entry) in background thread"""
         def save():
             try:
-                with wave.open(str(filepath), 'wb') as wf:
+                buffer = io.BytesIO()
+                with wave.open(buffer, 'wb') as wf:
                     wf.setnchannels(self.channels)
                     wf.setsampwidth(p.get_sample_size(self.sample_format))
                     wf.setframerate(device_rate)
                     wf.writeframes(b''.join(frames))
+                manifest.save(filename, timestamp, buffer.getvalue())
             except Exception as e:
-                logger.error(f"Failed to save {filepath}: {e}")
+                logger.error(f"Failed to save {filename}: {e}")
         
-        threading.Thread(target=save, daemon=True).start()
+        thread = threading.Thread(target=save, daemon=True)
+        thread.start()
+        return thread
     
     def run(self, start_time: Optional[float] = None):
         """
@@ -228,6 +236,8 @@ class AudioWatcher:
             
             self.is_running = True
             self._stop_event.clear()
+            manifest = CaptureManifestWriter(self.output_folder, self.media_name, 'audio')
+            savers = []
             
             saved_count = 0
             chunks_per_second = device_rate // self.frames_per_buffer
@@ -249,10 +259,10 @@ class AudioWatcher:
                         # Calculate timestamp relative to start
                         elapsed = time.time() - start_time
                         filename = self._generate_filename(elapsed)
-                        filepath = self.output_folder / filename
                         
                         # Save async
-                        self._save_wav_async(frames, filepath, p, device_rate)
+                        savers = [t for t in savers if t.is_alive()]
+                        savers.append(self._save_wav_async(frames, filename, elapsed, p, device_rate, manifest))
                         saved_count += 1
                         
                         # Progress
@@ -266,6 +276,11 @@ class AudioWatcher:
             stream.stop_stream()
             stream.close()
             
+            # Pending chunks still get their manifest entries
+            for thread in savers:
+                thread.join()
+            manifest.close()
+            
             print(f"\n\n🎤 Audio capture complete: {saved_count} chunks saved")
         
         except Exception as e:
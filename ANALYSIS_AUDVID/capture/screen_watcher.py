@@ -6,8 +6,10 @@ Features:
 - Scene change detection to skip redundant frames
 - Keyboard controls (S=Start, Q=Quit)
 - Timestamp-based filenames for synchronization
+- Capture manifest (exact timestamp, size, hash per saved frame) for analysis
 """
 
+import io
 import os
 import time
 import datetime
@@ -33,6 +35,9 @@ except ImportError:
     raise ImportError("Please install numpy pillow: pip install numpy pillow")
 
 import yaml
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from capture_manifest import CaptureManifestWriter
 
 
 logger = logging.getLogger(__name__)
@@ -156,6 +161,7 @@ class ScreenWatcher:
         start_time = time.time()
         saved_count = 0
         skipped_count = 0
+        manifest = CaptureManifestWriter(self.output_folder, self.media_name, 'screenshots')
         
         with mss.mss() as sct:
             monitor = sct.monitors[self.monitor_index]
@@ -185,11 +191,12 @@ class ScreenWatcher:
                         # Generate filename and save
                         elapsed = time.time() - start_time
                         filename = self._generate_filename(elapsed)
-                        filepath = self.output_folder / filename
                         
-                        # Convert and save as JPEG for smaller file size
+                        # Convert and save as JPEG for smaller file size (listed in the manifest once written)
                         img = Image.fromarray(frame)
-                        img.save(filepath, 'JPEG', quality=85)
+                        buffer = io.BytesIO()
+                        img.save(buffer, 'JPEG', quality=85)
+                        manifest.save(filename, elapsed, buffer.getvalue())
                         
                         saved_count += 1
                         self.last_frame = frame
@@ -209,6 +216,8 @@ class ScreenWatcher:
             
             except KeyboardInterrupt:
                 pass
+            finally:
+                manifest.close()
         
         print(f"\n{'='*60}")
         print(f"📊 CAPTURE COMPLETE")
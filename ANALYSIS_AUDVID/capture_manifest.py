@@ -0,0 +1,257 @@
+"""
+Capture Manifest
+
+Index of the files a capture session wrote, kept next to them as JSON
+Lines, so analysis neither scans the capture directory nor parses
+timestamps out of file names:
+
+    {"manifest": 1, "media_name": ..., "kind": "screenshots", "started_at": ...}
+    {"file": "ShowS01E01_000012_2.jpg", "timestamp": 12.504, "size": 183422, "hash": "9f2c..."}
+    ...
+
+An entry is appended only after its file is completely written, so the
+manifest never lists a partial file; a torn last line (capture killed
+mid-write) is ignored. Timestamps are exact capture offsets in seconds
+(file names only carry whole seconds). A file written twice keeps its
+latest entry. Listing checks only sizes (`verify`, a stat per file), so
+startup stays instant on large captures; the hash is checked against the
+bytes a reader loads anyway (`hash_of`, `content_hash`).
+
+Directories captured before manifests existed still work: readers fall
+back to `parse_filename_timestamp`.
+"""
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+CAPTURE_MANIFEST = 'capture_manifest.jsonl'
+MANIFEST_VERSION = 1
+
+
+def parse_filename_timestamp(filename: str) -> float:
+    """
+    Seconds from a capture file name (MediaName_HHMMSS_1.jpg, MediaName_HHMMSS.wav).
+    Returns 0.0 if the name has no HHMMSS part.
+    """
+    for part in Path(filename).stem.split('_'):
+        if len(part) == 6 and part.isdigit():
+            return int(part[:2]) * 3600 + int(part[2:4]) * 60 + int(part[4:6])
+    return 0.0
+
+
+def content_hash(data: bytes) -> str:
+    """Short content hash of a captured file (64-bit BLAKE2b, hex)"""
+    return hashlib.blake2b(data, digest_size=8).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """One captured file"""
+    file: str
+    timestamp: float
+    size: int
+    hash: str
+
+
+class CaptureManifestWriter:
+    """
+    Writes capture files and records each one in the manifest.
+
+    Thread-safe, so background savers (audio chunks) can share one writer.
+
+    Usage:
+        manifest = CaptureManifestWriter('./raw_screenshots', 'ShowS01E01', 'screenshots')
+        manifest.save('ShowS01E01_000012_2.jpg', 12.504, jpeg_bytes)
+        ...
+        manifest.close()
+    """
+
+    def __init__(self, directory: Path, media_name: str, kind: str):
+        """
+        Args:
+            directory: Capture output directory (the manifest is created, or replaced, there)
+            media_name: Media being captured
+            kind: What the directory holds ('screenshots', 'audio')
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / CAPTURE_MANIFEST
+        self.count = 0
+
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'w', encoding='utf-8')
+        header = {
+            'manifest': MANIFEST_VERSION,
+            'media_name': media_name,
+            'kind': kind,
+            'started_at': datetime.now().isoformat()
+        }
+        self._file.write(json.dumps(header) + '\n')
+        self._file.flush()
+
+    def save(self, filename: str, timestamp: float, data: bytes) -> Path:
+        """
+        Write one capture file, then its manifest entry.
+
+        Args:
+            filename: File name inside the capture directory
+            timestamp: Capture offset in seconds
+            data: Encoded file contents
+
+        Returns:
+            Path of the written file
+        """
+        filepath = self.directory / filename
+        filepath.write_bytes(data)
+
+        entry = {'file': filename, 'timestamp': round(timestamp, 3), 'size': len(data), 'hash': content_hash(data)}
+        with self._lock:
+            if self._file is not None:
+                self._file.write(json.dumps(entry) + '\n')
+                self._file.flush()
+                self.count += 1
+        return filepath
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class CaptureManifest:
+    """
+    Reads a capture directory's manifest; `refresh()` picks up entries
+    appended since the last read, so a running capture can be followed.
+
+    Usage:
+        manifest = CaptureManifest('./raw_screenshots')
+        if manifest.refresh():
+            files = manifest.entries(verify=True)   # timestamp order, intact files only
+        manifest.timestamp_of('ShowS01E01_000012_2.jpg')
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Args:
+            directory: Capture output directory
+        """
+        self.directory = Path(directory)
+        self.path = self.directory / CAPTURE_MANIFEST
+        self.header: Optional[Dict] = None
+
+        self._entries: Dict[str, ManifestEntry] = {}
+        self._offset = 0
+        self._invalid = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def refresh(self) -> int:
+        """
+        Read entries appended since the last call.
+
+        Returns:
+            Number of entries known (0 if there is no usable manifest)
+        """
+        if self._invalid or not self.path.exists():
+            return len(self._entries)
+
+        with open(self.path, 'rb') as f:
+            if self.header is not None and self._read_header(f) != self.header:
+                # Replaced by a new capture session
+                self.header = None
+                self._entries = {}
+                self._offset = 0
+            f.seek(self._offset)
+
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Still being written (or torn)
+                self._offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                if self.header is None:
+                    if record.get('manifest') != MANIFEST_VERSION:
+                        logger.warning(f"Unsupported capture manifest {self.path}, ignoring it")
+                        self._invalid = True
+                        return 0
+                    self.header = record
+                    continue
+
+                try:
+                    entry = ManifestEntry(
+                        file=record['file'],
+                        timestamp=float(record['timestamp']),
+                        size=int(record.get('size', 0)),
+                        hash=record.get('hash', '')
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+                self._entries[entry.file] = entry
+
+        return len(self._entries)
+
+    @staticmethod
+    def _read_header(f) -> Optional[Dict]:
+        """First record of the file (None while it is incomplete)"""
+        f.seek(0)
+        line = f.readline()
+        if not line.endswith(b'\n'):
+            return None
+        try:
+            return json.loads(line)
+        except ValueError:
+            return None
+
+    def entries(self, verify: bool = False) -> List[ManifestEntry]:
+        """
+        Latest entry per file, in timestamp order.
+
+        Args:
+            verify: Leave out files whose size does not match their entry (see `verify`)
+        """
+        entries = sorted(self._entries.values(), key=lambda entry: (entry.timestamp, entry.file))
+        if verify:
+            entries = [entry for entry in entries if self.verify(entry)]
+        return entries
+
+    def verify(self, entry: ManifestEntry) -> bool:
+        """
+        Whether the file on disk has the size its entry records (no read).
+        Missing and truncated files fail; the hash is checked on load.
+        """
+        try:
+            return (self.directory / entry.file).stat().st_size == entry.size
+        except OSError:
+            return False
+
+    def hash_of(self, filename: str) -> str:
+        """Recorded content hash of a file ('' if unlisted or unknown)"""
+        entry = self._entries.get(filename)
+        return entry.hash if entry is not None else ''
+
+    def get(self, filename: str) -> Optional[ManifestEntry]:
+        return self._entries.get(filename)
+
+    def timestamp_of(self, filename: str) -> float:
+        """
+        Capture timestamp of a file: its manifest entry, else parsed from the name.
+
+        Files handed out from the manifest (entries(), CaptureFollower) are
+        always listed; the name is only used for directories without one.
+        """
+        entry = self._entries.get(filename)
+        return entry.timestamp if entry is not None else parse_filename_timestamp(filename)
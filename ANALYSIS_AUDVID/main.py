@@ -9,19 +9,22 @@ CLI interface for the complete analysis pipeline:
 Usage:
     python main.py capture --media "ShowS01E01"
     python main.py analyze --input ./raw_screenshots
+    python main.py analyze --follow  # While capture is running
     python main.py format --output ./results
     python main.py full --media "ShowS01E01"  # All steps
+    python main.py batch --manifest season1.yaml  # Many media, models loaded once
 """
 
 import os
 import sys
+import csv
 import time
-import json
+import threading
 import logging
 from pathlib import Path
-from typing import Optional, Dict, List
-from datetime import datetime
-from dataclasses import dataclass, field, asdict
+from typing import Optional, Dict, List, Tuple
+from concurrent.futures import Future
+from collections import deque
 import argparse
 
 try:
@@ -38,11 +41,24 @@ except ImportError as e:
 import yaml
 
 # Import framework modules
-from trigger_categories import TRIGGER_CATEGORIES, DetectionType
+from trigger_categories import TRIGGER_CATEGORIES
+from capture_manifest import CaptureManifest
 from capture import ScreenWatcher, AudioWatcher, AUDIO_AVAILABLE
 from analyzers.fast_filter import FastFilter
 from analyzers.deep_analyzer import DeepAnalyzer
+from analyzers.pre_filter import PreFilter
+from analyzers.yolo_detector import YoloDetector
+from analyzers.vlm_scheduler import VLMScheduler
 from processing.results_merger import ResultsMerger
+from processing.shot_segmenter import ShotSegmenter
+from processing.frame_loader import FrameLoader
+from processing.run_sampler import RunSampler, SuspiciousRun
+from processing.pipeline import Pipeline, Stage
+from processing.results_journal import ResultsJournal
+from processing.results_writer import intermediate_path, open_results_writer
+from processing.detection_table import DetectionTable, pack_verdicts
+from processing.batch_manifest import BatchStatus, load_manifest
+from processing.capture_follower import CaptureFollower, mark_capture_complete
 
 # Audio analyzer also requires optional dependencies
 try:
@@ -59,29 +75,6 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class AnalysisState:
-    """Tracks analysis progress for resumable processing"""
-    media_name: str
-    started_at: str
-    last_processed_index: int = 0
-    total_files: int = 0
-    processed_files: List[str] = field(default_factory=list)
-    results: Dict = field(default_factory=dict)
-    
-    def save(self, path: Path):
-        """Save state to JSON file"""
-        with open(path, 'w') as f:
-            json.dump(asdict(self), f, indent=2)
-    
-    @classmethod
-    def load(cls, path: Path) -> 'AnalysisState':
-        """Load state from JSON file"""
-        with open(path, 'r') as f:
-            data = json.load(f)
-        return cls(**data)
-
-
 class TriggerAnalyzer:
     """
     Main orchestrator for the trigger analysis pipeline.
@@ -98,15 +91,28 @@ class TriggerAnalyzer:
         paths = self.config.get('paths', {})
         self.screenshot_dir = Path(paths.get('raw_screenshots', './raw_screenshots'))
         self.audio_dir = Path(paths.get('raw_audio', './raw_audio'))
-        self.intermediate_csv = Path(paths.get('intermediate_csv', './media_analysis_log.csv'))
+        self.intermediate_csv = intermediate_path(paths)  # .parquet with intermediate_format: parquet
         self.final_csv = Path(paths.get('final_csv', './final_database_upload.csv'))
-        self.state_file = Path(paths.get('state_file', './analysis_state.json'))
+        self.journal_file = Path(paths.get('journal_file', './analysis_journal.jsonl'))
+        self.audio_log = Path(paths.get('audio_log', './audio_analysis_log.csv'))
         
         # Lazy-load analyzers (initialized when needed)
         self._fast_filter: Optional[FastFilter] = None
         self._deep_analyzer: Optional[DeepAnalyzer] = None
         self._audio_analyzer: Optional[AudioAnalyzer] = None
         self._merger: Optional[ResultsMerger] = None
+        self._shot_segmenter: Optional[ShotSegmenter] = None
+        self._run_sampler: Optional[RunSampler] = None
+        self.vlm_scheduler: Optional[VLMScheduler] = None
+        self._pre_filter: Optional[PreFilter] = None
+        self._yolo_detector: Optional[YoloDetector] = None
+        
+        # Prefetching frame pipeline shared by all per-frame analyzers
+        analysis_config = self.config.get('analysis', {})
+        self.frame_loader = FrameLoader(
+            workers=analysis_config.get('loader_workers', 4),
+            prefetch_batches=analysis_config.get('prefetch_batches', 2)
+        )
     
     def _load_config(self, path: str) -> dict:
         """Load configuration from YAML"""
@@ -148,6 +154,36 @@ class TriggerAnalyzer:
             self._merger = ResultsMerger(self.config_path)
         return self._merger
     
+    @property
+    def pre_filter(self) -> PreFilter:
+        """Lazy-load stage-0 pre-filter"""
+        if self._pre_filter is None:
+            self._pre_filter = PreFilter(self.config_path)
+        return self._pre_filter
+    
+    @property
+    def yolo_detector(self) -> YoloDetector:
+        """Lazy-load YOLO object detector"""
+        if self._yolo_detector is None:
+            self._yolo_detector = YoloDetector(self.config_path)
+            if self._yolo_detector.active:
+                print(f"{Fore.CYAN}Loaded YOLO detector for {self._yolo_detector.categories}{Style.RESET_ALL}")
+        return self._yolo_detector
+    
+    @property
+    def shot_segmenter(self) -> ShotSegmenter:
+        """Lazy-load shot segmenter"""
+        if self._shot_segmenter is None:
+            self._shot_segmenter = ShotSegmenter(self.config_path)
+        return self._shot_segmenter
+    
+    @property
+    def run_sampler(self) -> RunSampler:
+        """Lazy-load suspicious-run sampler"""
+        if self._run_sampler is None:
+            self._run_sampler = RunSampler(self.config_path)
+        return self._run_sampler
+    
     def capture(self, media_name: Optional[str] = None, audio_enabled: bool = True):
         """
         Run capture mode: record screen + audio.
@@ -160,6 +196,11 @@ class TriggerAnalyzer:
         print(f"{Fore.GREEN}📹 CAPTURE MODE{Style.RESET_ALL}")
         print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}\n")
         
+        # Followers (analyze --follow) keep waiting until this session's marker is written
+        session = time.strftime('%Y%m%dT%H%M%S')
+        mark_capture_complete(self.screenshot_dir, complete=False)
+        mark_capture_complete(self.audio_dir, complete=False)
+        
         # Initialize watchers
         screen_watcher = ScreenWatcher(self.config_path)
         if media_name:
@@ -182,17 +223,31 @@ class TriggerAnalyzer:
             audio_watcher.stop()
             audio_thread.join(timeout=2)
         
+        mark_capture_complete(self.screenshot_dir, session=session)
+        mark_capture_complete(self.audio_dir, session=session)
+        
         print(f"\n{Fore.GREEN}✅ Capture complete!{Style.RESET_ALL}")
         print(f"Screenshots: {self.screenshot_dir}")
         print(f"Audio: {self.audio_dir}")
     
-    def analyze(self, input_dir: Optional[Path] = None, resume: bool = True):
+    def analyze(
+        self,
+        input_dir: Optional[Path] = None,
+        resume: bool = True,
+        follow: bool = False,
+        keep_model_loaded: bool = False
+    ) -> Optional[DetectionTable]:
         """
         Run analysis mode: process captured files through AI pipeline.
         
         Args:
             input_dir: Override screenshot directory
             resume: Resume from previous progress if available
+            follow: Analyze frames as capture writes them, until capture completes
+            keep_model_loaded: Leave the VLM pinned afterwards (more media follow)
+        
+        Returns:
+            Packed per-frame detections (None if there was nothing to analyze)
         """
         print(f"\n{Fore.BLUE}{'='*60}{Style.RESET_ALL}")
         print(f"{Fore.BLUE}🔍 ANALYSIS MODE{Style.RESET_ALL}")
@@ -200,132 +255,659 @@ class TriggerAnalyzer:
         
         input_dir = input_dir or self.screenshot_dir
         
-        # Get list of files to process
-        image_files = sorted(list(input_dir.glob("*.jpg")) + list(input_dir.glob("*.png")))
+        # Get list of files to process: the capture manifest when there is one (no directory
+        # scan, exact timestamps; files whose size no longer matches are skipped and the
+        # loader checks each frame's hash as it decodes it), else
+        # every image with its timestamp parsed from the name.
+        # In follow mode files are added as capture completes them.
+        manifest = CaptureManifest(input_dir)
+        if follow:
+            image_files = []
+        elif manifest.refresh():
+            entries = manifest.entries(verify=True)
+            if len(entries) < len(manifest):
+                print(f"{Fore.YELLOW}Skipping {len(manifest) - len(entries)} frames that do not match "
+                      f"the capture manifest{Style.RESET_ALL}")
+            image_files = [input_dir / entry.file for entry in entries]
+        else:
+            image_files = sorted(list(input_dir.glob("*.jpg")) + list(input_dir.glob("*.png")))
         
-        if not image_files:
+        if follow:
+            print(f"Following {input_dir} until capture completes...")
+        elif not image_files:
             print(f"{Fore.YELLOW}No images found in {input_dir}{Style.RESET_ALL}")
             return
+        else:
+            source = "capture manifest" if len(manifest) else "directory scan"
+            print(f"Found {len(image_files)} images to analyze ({source})")
         
-        print(f"Found {len(image_files)} images to analyze")
+        # Per-media state of the shared analyzers
+        self.run_sampler.reset()
+        self.pre_filter.reset()
+        self.deep_analyzer.reset()
         
-        # Check for resume state
-        state = None
-        start_index = 0
+        # Load the VLM in Ollama while shot segmentation and CLIP load here
+        use_vlm = self.deep_analyzer.is_ollama_available()
+        if use_vlm:
+            self.deep_analyzer.preload_async()
         
-        if resume and self.state_file.exists():
-            try:
-                state = AnalysisState.load(self.state_file)
-                if state.total_files == len(image_files):
-                    start_index = state.last_processed_index
-                    print(f"{Fore.CYAN}Resuming from file {start_index}/{len(image_files)}{Style.RESET_ALL}")
-            except Exception as e:
-                logger.warning(f"Could not resume: {e}")
-        
-        if state is None:
-            media_config = self.config.get('media', {})
-            state = AnalysisState(
-                media_name=media_config.get('name', 'UnknownMedia'),
-                started_at=datetime.now().isoformat(),
-                total_files=len(image_files)
-            )
+        timestamps = [manifest.timestamp_of(f.name) for f in image_files]
         
-        # Prepare results CSV
-        results_data = []
+        # Shot segmentation: only keyframes go through the cascade
+        shots = []
+        work_indices = list(range(len(image_files)))
+        if self.shot_segmenter.enabled and follow:
+            print(f"{Fore.YELLOW}Shot segmentation needs the complete capture - disabled while following{Style.RESET_ALL}")
+        elif self.shot_segmenter.enabled:
+            shots = self.shot_segmenter.segment(image_files, timestamps)
+            work_indices = [k for shot in shots for k in shot.keyframes]
+            print(f"Shot segmentation: {len(shots)} shots, {len(work_indices)} keyframes to analyze")
         
         # Category columns
         category_names = list(TRIGGER_CATEGORIES.keys())
         
+        # Results journal: frames settled by an interrupted run are restored, not re-analyzed
+        analysis_config = self.config.get('analysis', {})
+        media_config = self.config.get('media', {})
+        journal = ResultsJournal(self.journal_file, sync_every=analysis_config.get('journal_sync_batches', 10))
+        recovered = journal.open(media_config.get('name', 'UnknownMedia'), category_names, resume=resume)
+        
+        # Per-frame verdicts: frame index -> {category: detected}
+        detections: Dict[int, Dict[str, bool]] = {}
+        todo_indices = []
+        for frame_idx in work_indices:
+            verdicts = recovered.get(image_files[frame_idx].name)
+            if verdicts is None:
+                todo_indices.append(frame_idx)
+            else:
+                detections[frame_idx] = verdicts
+        
+        if detections:
+            print(f"{Fore.CYAN}Resuming: {len(detections)}/{len(work_indices)} frames restored "
+                  f"from {self.journal_file}{Style.RESET_ALL}")
+        
         # Analysis loop
         print(f"\n{Fore.CYAN}Starting cascade analysis...{Style.RESET_ALL}")
         
-        use_vlm = self.deep_analyzer.is_ollama_available()
         if not use_vlm:
             print(f"{Fore.YELLOW}⚠️ Ollama not available - skipping VLM confirmation{Style.RESET_ALL}")
         
-        analysis_config = self.config.get('analysis', {})
         batch_size = analysis_config.get('batch_size', 8)
         
+        # In-flight VLM confirmations: (frame indices, future of results)
+        vlm_async = analysis_config.get('vlm_async', True)
+        
+        # Async confirmations are ordered by priority within the episode's time budget
+        self.vlm_scheduler = VLMScheduler(self.deep_analyzer, self.config_path) if use_vlm and vlm_async else None
+        
+        # Multi-frame VLM batching: category -> queued (frame index, image, embedding, CLIP margin)
+        frame_batch_size = self.deep_analyzer.frame_batch_size
+        frame_batches: Dict[str, List[Tuple[int, object, Optional[np.ndarray], float]]] = {}
+        
+        # Run-level sampling: only a few frames per suspicious run go to the VLM
+        run_sampling = use_vlm and self.run_sampler.enabled
+        vlm_image_size = self.deep_analyzer.payloads.max_size
+        positions = {frame_idx: p for p, frame_idx in enumerate(work_indices)}
+        
+        # Frames still waiting on a queued frame batch or an open run: frame index -> outstanding count.
+        # Only settled frames are journaled.
+        unsettled: Dict[int, int] = {}
+        
+        def defer(frame_idx: int):
+            unsettled[frame_idx] = unsettled.get(frame_idx, 0) + 1
+        
+        def release(frame_indices: List[int]) -> List[int]:
+            """Drop one outstanding confirmation per frame; returns the frames now settled"""
+            settled = []
+            for frame_idx in frame_indices:
+                unsettled[frame_idx] -= 1
+                if unsettled[frame_idx] == 0:
+                    del unsettled[frame_idx]
+                    settled.append(frame_idx)
+            return settled
+        
+        # Intermediate log is streamed in frame order: a frame (or a whole shot)
+        # is written as soon as its keyframe verdicts are settled. Written frames
+        # are kept only as packed records (frame, timestamp, shot, category bits).
+        filenames = [f.name for f in image_files]
+        writer = open_results_writer(self.intermediate_csv, filenames, bool(shots), analysis_config)
+        table = DetectionTable(capacity=len(image_files))
+        settled_frames = set(detections)
+        emit_units = shots if shots else [[frame_idx] for frame_idx in work_indices]
+        emitted = 0
+        
+        def emit_ready():
+            """Write the leading frames/shots whose verdicts are final, then forget their dicts"""
+            nonlocal emitted
+            while emitted < len(emit_units):
+                unit = emit_units[emitted]
+                keyframes = unit.keyframes if shots else unit
+                if not all(k in settled_frames for k in keyframes):
+                    break
+                
+                # A shot is detected for a category if any of its keyframes is (OR of masks)
+                mask = 0
+                for k in keyframes:
+                    mask |= pack_verdicts(detections.pop(k))
+                settled_frames.difference_update(keyframes)
+                
+                frame_range = unit.frame_indices() if shots else unit
+                shot_id = unit.index if shots else -1
+                for frame_idx in frame_range:
+                    table.append(frame_idx, timestamps[frame_idx], mask, shot_id)
+                    writer.write(frame_idx, timestamps[frame_idx], mask, shot_id)
+                emitted += 1
+        
         # Progress bar
-        pbar = tqdm(total=len(image_files), initial=start_index, desc="Analyzing")
+        pbar = tqdm(total=len(work_indices), initial=len(detections), desc="Analyzing")
+        
+        work_files = [image_files[k] for k in todo_indices]
         
-        for i in range(start_index, len(image_files), batch_size):
-            batch_files = image_files[i:i + batch_size]
+        def register(paths: List[Path]) -> List[Path]:
+            """Add frames found while following; returns the ones still to analyze"""
+            todo = []
+            for path in paths:
+                frame_idx = len(image_files)
+                image_files.append(path)
+                filenames.append(path.name)
+                timestamps.append(manifest.timestamp_of(path.name))
+                positions[frame_idx] = len(work_indices)
+                work_indices.append(frame_idx)
+                verdicts = recovered.get(path.name)
+                if verdicts is None:
+                    todo_indices.append(frame_idx)
+                    todo.append(path)
+                else:
+                    detections[frame_idx] = verdicts
+                    settled_frames.add(frame_idx)
+                # Last, so the writer never sees a frame before its state exists
+                emit_units.append([frame_idx])
+            pbar.total = len(work_indices)
+            pbar.update(len(paths) - len(todo))
+            return todo
+        
+        def follow_batches():
+            """Decoded batches of frames as the capture completes them, in timestamp order"""
+            follower = CaptureFollower(
+                input_dir,
+                sort_key=manifest.timestamp_of,
+                poll_interval=analysis_config.get('follow_poll_interval', 1.0),
+                settle_seconds=analysis_config.get('follow_settle_seconds', 1.0),
+                idle_timeout=analysis_config.get('follow_idle_timeout', 0),
+                manifest=manifest
+            )
+            for paths in follower.follow(batch_size, max_wait=analysis_config.get('follow_max_wait', 2.0)):
+                offset = len(todo_indices)
+                todo = register(paths)
+                for i, batch_files, batch_images in self.frame_loader.batches(
+                    todo, batch_size, expected_hash=manifest.hash_of
+                ):
+                    yield offset + i, batch_files, batch_images
+            logger.info(f"Capture complete ({follower.mode}): {len(image_files)} frames followed")
+        
+        def score_stage(loaded: Tuple[int, List[Path], list]) -> Dict:
+            """Pre-filter, CLIP and YOLO for one batch"""
+            i, batch_files, batch_images = loaded
+            scored = {'i': i, 'images': batch_images, 'clip_rows': {}}
             
-            # Fast filter (CLIP)
-            batch_scores = self.fast_filter.analyze_batch([str(f) for f in batch_files])
+            # Unreadable frames are skipped like safe frames
+            readable = np.array([img is not None for img in batch_images], dtype=bool)
             
-            for j, (img_path, scores) in enumerate(zip(batch_files, batch_scores)):
-                # Parse timestamp from filename
-                timestamp_sec = self._parse_timestamp(img_path.name)
-                
-                # Initialize result row
-                row = {
-                    'filename': img_path.name,
-                    'timestamp_sec': timestamp_sec
-                }
+            # Stage 0: obviously safe frames skip CLIP entirely
+            safe_mask = ~readable
+            if self.pre_filter.enabled and readable.any():
+                safe_mask[readable] = self.pre_filter.safe_mask(
+                    [img for img in batch_images if img is not None]
+                )
+            clip_rows = {j: row for row, j in enumerate(np.flatnonzero(~safe_mask).tolist())}
+            clip_images = [batch_images[j] for j in clip_rows]
+            scored['clip_rows'] = clip_rows
+            
+            if clip_rows:
+                # Fast filter (CLIP): frames x categories scores + threshold mask
+                scored['score_matrix'] = self.fast_filter.score_batch(clip_images)
+                scored['suspicious_mask'] = self.fast_filter.suspicious_mask(scored['score_matrix'])
                 
-                # Check each category
-                is_suspicious, suspicious_cats = self.fast_filter.is_suspicious(scores)
+                # Object detection (YOLO) for categories with class IDs
+                if self.yolo_detector.active:
+                    scored['yolo_mask'] = self.yolo_detector.detected_mask(
+                        self.yolo_detector.detect_batch(clip_images)
+                    )
+            return scored
+        
+        def dispatch_stage(scored: Dict) -> Tuple[int, List[Tuple[List[int], Future]], List[SuspiciousRun], List[int]]:
+            """Per-frame verdicts and VLM submissions for one scored batch"""
+            i, batch_images, clip_rows = scored['i'], scored['images'], scored['clip_rows']
+            batch_indices = todo_indices[i:i + len(batch_images)]
+            pending: List[Tuple[List[int], Future]] = []
+            runs: List[SuspiciousRun] = []
+            released: List[int] = []
+            
+            for j, (frame_idx, image) in enumerate(zip(batch_indices, batch_images)):
+                verdicts = {cat_name: False for cat_name in category_names}
+                detections[frame_idx] = verdicts
+                run_scores: Dict[str, float] = {}
+                embedding = None
                 
-                for cat_name in category_names:
-                    row[cat_name] = False
+                if j in clip_rows:
+                    row = clip_rows[j]
+                    score_matrix = scored['score_matrix']
+                    
+                    # Detector verdicts are final for YOLO categories
+                    if self.yolo_detector.active:
+                        for c, cat_name in enumerate(self.yolo_detector.categories):
+                            verdicts[cat_name] = bool(scored['yolo_mask'][row, c])
                     
-                    if cat_name in suspicious_cats:
-                        # For non-VLM categories, CLIP is enough
-                        category = TRIGGER_CATEGORIES[cat_name]
-                        
-                        if use_vlm and category.detection_type != DetectionType.YOLO:
-                            # Deep confirmation with VLM
-                            vlm_result = self.deep_analyzer.analyze_trigger(
-                                img_path, cat_name
+                    suspicious_cats = score_matrix.suspicious_categories(scored['suspicious_mask'], row)
+                    
+                    # CLIP embedding lets near-duplicate frames reuse VLM verdicts
+                    embedding = score_matrix.embeddings[row] if score_matrix.embeddings is not None else None
+                    
+                    # How clearly each suspicious category cleared its threshold (VLM priority)
+                    frame_scores = score_matrix.row(row)
+                    margins = {
+                        cat_name: self.fast_filter.margin(cat_name, frame_scores[cat_name])
+                        for cat_name in suspicious_cats
+                    }
+                    
+                    if suspicious_cats and run_sampling:
+                        # Decided per run once the run closes
+                        run_scores = {cat_name: frame_scores[cat_name] for cat_name in suspicious_cats}
+                    elif suspicious_cats and use_vlm and frame_batch_size > 1:
+                        # Queue per category; several frames go out in one request
+                        for cat_name in suspicious_cats:
+                            frame_batches.setdefault(cat_name, []).append(
+                                (frame_idx, image, embedding, margins[cat_name])
                             )
-                            row[cat_name] = vlm_result['confirmed']
-                        else:
-                            # Trust CLIP for this category
-                            row[cat_name] = True
+                            defer(frame_idx)
+                            if len(frame_batches[cat_name]) >= frame_batch_size:
+                                items = frame_batches.pop(cat_name)
+                                pending.extend(self._dispatch_frame_batch(cat_name, items, detections, vlm_async))
+                                released.extend(release([item[0] for item in items]))
+                    elif suspicious_cats and use_vlm and vlm_async:
+                        # One VLM request for all categories, resolved while CLIP keeps going
+                        pending.append(([frame_idx], self.vlm_scheduler.submit_multiple(
+                            image, suspicious_cats, max(margins.values()), embedding
+                        )))
+                    elif suspicious_cats and use_vlm:
+                        # Deep confirmation with VLM
+                        vlm_results = self.deep_analyzer.analyze_multiple_triggers(
+                            image, suspicious_cats, embedding
+                        )
+                        for cat_name, vlm_result in vlm_results.items():
+                            verdicts[cat_name] = vlm_result['confirmed']
+                    else:
+                        # Trust CLIP for these categories
+                        for cat_name in suspicious_cats:
+                            verdicts[cat_name] = True
                 
-                results_data.append(row)
-                state.last_processed_index = i + j + 1
-                pbar.update(1)
+                if run_sampling:
+                    # Runs keep a VLM-sized copy of each frame until their samples are chosen
+                    run_image = None
+                    if run_scores:
+                        run_image = image.copy()
+                        run_image.thumbnail((vlm_image_size, vlm_image_size))
+                    for cat_name in run_scores:
+                        defer(frame_idx)
+                    for run in self.run_sampler.add(positions[frame_idx], frame_idx, run_scores, run_image, embedding):
+                        released.extend(release(run.frame_indices))
+                        runs.append(run)
+            
+            # Samples of the runs closed here; a frame sampled for several categories goes out once
+            if runs:
+                pending.extend(self._dispatch_runs(runs, detections, vlm_async))
             
-            # Save state periodically
-            if i % (batch_size * 10) == 0:
-                state.save(self.state_file)
+            # Frames of this batch that wait on nothing, then frames settled by this batch's requests
+            settled = [frame_idx for frame_idx in batch_indices if frame_idx not in unsettled]
+            settled.extend(frame_idx for frame_idx in released if frame_idx not in batch_indices)
+            return len(batch_images), pending, runs, settled
         
-        pbar.close()
+        def confirm_stage(dispatched: Tuple[int, List[Tuple[List[int], Future]], List[SuspiciousRun], List[int]]):
+            """Apply a batch's VLM confirmations and checkpoint the settled frames"""
+            count, pending, runs, settled = dispatched
+            self._collect_vlm_results(pending, detections, wait=True)
+            
+            # Spread sampled verdicts over the runs closed in this batch
+            if runs:
+                RunSampler.propagate(runs, detections)
+            
+            for frame_idx in settled:
+                journal.append(image_files[frame_idx].name, detections[frame_idx])
+            journal.checkpoint()
+            settled_frames.update(settled)
+            emit_ready()
+            pbar.update(count)
+        
+        # Decode -> score -> dispatch -> confirm, each stage at its own pace
+        pipeline = Pipeline(
+            follow_batches() if follow else self.frame_loader.batches(
+                work_files, batch_size, expected_hash=manifest.hash_of
+            ),
+            [
+                Stage(
+                    'score', score_stage,
+                    workers=analysis_config.get('pipeline_score_workers', 1),
+                    queue_size=analysis_config.get('pipeline_queue_size', 2)
+                ),
+                Stage('dispatch', dispatch_stage, queue_size=analysis_config.get('pipeline_queue_size', 2)),
+                Stage('confirm', confirm_stage, queue_size=analysis_config.get('pipeline_vlm_queue_size', 32))
+            ]
+        )
+        # Audio chunks are followed alongside the frames
+        audio_thread = None
+        if follow and analysis_config.get('follow_audio', True):
+            audio_thread = self._follow_audio(analysis_config)
         
-        # Save final results
-        results_df = pd.DataFrame(results_data)
-        results_df.to_csv(self.intermediate_csv, index=False)
+        try:
+            pipeline.run()
+            
+            pbar.close()
+            
+            if audio_thread is not None:
+                audio_thread.join()
+            
+            # Runs still open at the end of the input
+            pending_vlm: List[Tuple[List[int], Future]] = []
+            closed_runs: List[SuspiciousRun] = []
+            if run_sampling:
+                closed_runs = self.run_sampler.flush()
+                pending_vlm.extend(self._dispatch_runs(closed_runs, detections, vlm_async))
+            
+            # Partially filled multi-frame batches
+            for cat_name, items in frame_batches.items():
+                pending_vlm.extend(self._dispatch_frame_batch(cat_name, items, detections, vlm_async))
+            
+            if pending_vlm:
+                print(f"Waiting for {len(pending_vlm)} VLM confirmations...")
+                self._collect_vlm_results(pending_vlm, detections, wait=True)
+            if self.vlm_scheduler is not None:
+                self.vlm_scheduler.close()
+            self.deep_analyzer.close()
+            if use_vlm and not keep_model_loaded:
+                self.deep_analyzer.release_model()
+            
+            # Spread sampled verdicts over their suspicious runs
+            if closed_runs:
+                detections = RunSampler.propagate(closed_runs, detections)
+            
+            # Everything left is settled now
+            for frame_idx in sorted(unsettled):
+                journal.append(image_files[frame_idx].name, detections[frame_idx])
+            settled_frames.update(unsettled)
+            emit_ready()
+        finally:
+            # An aborted run still leaves a well-formed journal and log behind
+            journal.close()
+            writer.close()
         
         print(f"\n{Fore.GREEN}✅ Analysis complete!{Style.RESET_ALL}")
-        print(f"Raw results: {self.intermediate_csv}")
+        print(f"Raw results: {self.intermediate_csv} ({writer.rows} rows)")
         
         # Summary
         print(f"\n{Fore.CYAN}Detection Summary:{Style.RESET_ALL}")
+        counts = table.counts()
         for cat_name in category_names:
-            count = results_df[cat_name].sum()
+            count = counts[cat_name]
             if count > 0:
                 print(f"  {cat_name}: {count} detections")
         
-        # Cleanup state file
-        if self.state_file.exists():
-            self.state_file.unlink()
+        if use_vlm and self.deep_analyzer.cache is not None:
+            cache = self.deep_analyzer.cache.summary()
+            print(f"\n{Fore.CYAN}VLM Verdict Cache:{Style.RESET_ALL}")
+            print(f"  Hits: {cache['hits']}/{cache['hits'] + cache['misses']} ({cache['hit_rate']:.1%})")
+            print(f"  Time saved: {cache['time_saved']:.1f}s")
+        
+        if run_sampling:
+            runs = self.run_sampler.summary()
+            print(f"\n{Fore.CYAN}VLM Run Sampling:{Style.RESET_ALL}")
+            print(f"  Runs: {runs['runs']} covering {runs['frames']} suspicious frames")
+            print(f"  Frames confirmed: {runs['sampled']} ({runs['sample_rate']:.1%})")
+        
+        if self.vlm_scheduler is not None and self.vlm_scheduler.time_budget:
+            sched = self.vlm_scheduler.summary()
+            status = "exhausted" if sched['expired'] else "within budget"
+            print(f"\n{Fore.CYAN}VLM Time Budget ({self.vlm_scheduler.time_budget}s, {status}):{Style.RESET_ALL}")
+            print(f"  Confirmed by VLM: {sched['requests']} requests")
+            print(f"  Resolved by '{self.vlm_scheduler.budget_fallback}' fallback: {sched['fallbacks']}")
+        
+        if use_vlm:
+            lat = self.deep_analyzer.latency_summary()
+            print(f"\n{Fore.CYAN}VLM Latency:{Style.RESET_ALL}")
+            if lat['load_seconds'] is not None:
+                print(f"  Model preload: {lat['load_seconds']:.1f}s")
+            if lat['cold_starts']:
+                print(f"  Cold calls (model reloaded): {lat['cold_starts']}, mean {lat['cold_mean']:.2f}s")
+            if lat['steady_calls']:
+                print(f"  Steady-state calls: {lat['steady_calls']}, "
+                      f"mean {lat['steady_mean']:.2f}s, p95 {lat['steady_p95']:.2f}s")
+        
+        if use_vlm and (self.deep_analyzer.breaker.trips or self.deep_analyzer.retried):
+            health = self.deep_analyzer.breaker.summary()
+            print(f"\n{Fore.CYAN}VLM Backend Health:{Style.RESET_ALL}")
+            print(f"  Retries: {self.deep_analyzer.retried}")
+            print(f"  Circuit trips: {health['trips']} (now {health['state']})")
+            print(f"  Requests answered CLIP-only while open: {health['refused']}")
+        
+        if use_vlm and self.deep_analyzer.verdict_index is not None:
+            reuse = self.deep_analyzer.verdict_index.summary()
+            print(f"\n{Fore.CYAN}VLM Verdict Reuse:{Style.RESET_ALL}")
+            print(f"  Calls avoided: {reuse['reused']}/{reuse['lookups']} ({reuse['reuse_rate']:.1%})")
+        
+        print(f"\n{Fore.CYAN}Pipeline Utilization ({pipeline.wall:.1f}s wall):{Style.RESET_ALL}")
+        bottleneck = pipeline.bottleneck()
+        for stage_name, stats in pipeline.utilization().items():
+            marker = " ← bottleneck" if stage_name == bottleneck else ""
+            print(f"  {stage_name:<9} {stats['utilization']:>6.1%} busy, "
+                  f"{stats['starved']:.1f}s starved, {stats['blocked']:.1f}s blocked "
+                  f"({stats['items']} batches, {stats['workers']} worker(s)){marker}")
+        
+        if self.pre_filter.enabled:
+            pre = self.pre_filter.summary()
+            print(f"\n{Fore.CYAN}Stage-0 Pre-Filter ({pre['mode']}):{Style.RESET_ALL}")
+            print(f"  Early exits: {pre['frames_exited']}/{pre['frames_seen']} ({pre['exit_rate']:.1%})")
+            for cat_name, recall in pre['category_recall'].items():
+                print(f"  {cat_name}: {recall:.1%} calibrated recall")
+        
+        # Final CSV is written; the journal is no longer needed
+        journal.remove()
+        
+        return table
+    
+    def _follow_audio(self, analysis_config: dict) -> Optional[threading.Thread]:
+        """
+        Score audio chunks with CLAP as capture completes them, into the audio log.
+        
+        Returns:
+            The background thread (ends with the capture), None without CLAP
+        """
+        if AudioAnalyzer is None:
+            print(f"{Fore.YELLOW}CLAP dependencies missing - not following {self.audio_dir}{Style.RESET_ALL}")
+            return None
+        
+        analyzer = self.audio_analyzer
+        categories = list(dict.fromkeys(analyzer.score_categories))
+        manifest = CaptureManifest(self.audio_dir)
+        follower = CaptureFollower(
+            self.audio_dir,
+            patterns=('*.wav',),
+            sort_key=manifest.timestamp_of,
+            poll_interval=analysis_config.get('follow_poll_interval', 1.0),
+            settle_seconds=analysis_config.get('follow_settle_seconds', 1.0),
+            idle_timeout=analysis_config.get('follow_idle_timeout', 0),
+            manifest=manifest
+        )
+        print(f"Following {self.audio_dir} into {self.audio_log}...")
+        
+        def run():
+            chunks = 0
+            try:
+                with open(self.audio_log, 'w', newline='') as f:
+                    out = csv.writer(f)
+                    out.writerow(['timestamp_sec', 'filename'] + categories)
+                    for paths in follower.follow(batch_size=1, max_wait=0):
+                        for path in paths:
+                            scores = analyzer.analyze_chunk(path, manifest.hash_of(path.name))
+                            if scores is None:
+                                continue
+                            _, detected = analyzer.is_trigger_detected(scores)
+                            out.writerow(
+                                [manifest.timestamp_of(path.name), path.name] +
+                                [name in detected for name in categories]
+                            )
+                            chunks += 1
+                        f.flush()
+                logger.info(f"Audio capture complete ({follower.mode}): {chunks} chunks analyzed")
+            except Exception as e:
+                logger.error(f"Audio follow failed after {chunks} chunks: {e}")
+        
+        thread = threading.Thread(target=run, name='audio-follow', daemon=True)
+        thread.start()
+        return thread
     
-    def format(self, input_csv: Optional[Path] = None, output_csv: Optional[Path] = None):
+    def _dispatch_frame_batch(
+        self,
+        cat_name: str,
+        items: List[Tuple[int, object, Optional[np.ndarray], float]],
+        detections: Dict[int, Dict[str, bool]],
+        vlm_async: bool
+    ) -> List[Tuple[List[int], Future]]:
+        """
+        Confirm one category on several queued frames with one request.
+        
+        Returns:
+            Pending (frame indices, future) entries (empty when run synchronously)
+        """
+        frame_indices = [item[0] for item in items]
+        images = [item[1] for item in items]
+        embeddings = None
+        if all(item[2] is not None for item in items):
+            embeddings = np.stack([item[2] for item in items])
+        
+        if vlm_async:
+            margin = max(item[3] for item in items)
+            return [(frame_indices, self.vlm_scheduler.submit_frames(images, cat_name, margin, embeddings))]
+        
+        vlm_results = self.deep_analyzer.analyze_frames_batch(images, cat_name, embeddings)
+        for frame_idx, vlm_result in zip(frame_indices, vlm_results):
+            detections[frame_idx][cat_name] = vlm_result['confirmed']
+        return []
+    
+    def _dispatch_runs(
+        self,
+        runs: List[SuspiciousRun],
+        detections: Dict[int, Dict[str, bool]],
+        vlm_async: bool
+    ) -> List[Tuple[List[int], Future]]:
+        """
+        Confirm the sampled frames of closed suspicious runs.
+        
+        Samples use the image and CLIP embedding their run kept, so verdict
+        reuse and payload sharing apply. With frame batching on they go out
+        as multi-frame requests per category; otherwise a frame sampled by
+        runs of several categories is confirmed in one multi-category request.
+        
+        Returns:
+            Pending (frame indices, future) entries (empty when run synchronously)
+        """
+        frame_batch_size = self.deep_analyzer.frame_batch_size
+        if frame_batch_size > 1:
+            pending = []
+            for run in runs:
+                margin = self.fast_filter.margin(run.category, max(run.scores))
+                items = [
+                    (frame_idx, run.images[frame_idx], run.embeddings.get(frame_idx), margin)
+                    for frame_idx in run.samples if run.images.get(frame_idx) is not None
+                ]
+                for k in range(0, len(items), frame_batch_size):
+                    pending.extend(self._dispatch_frame_batch(
+                        run.category, items[k:k + frame_batch_size], detections, vlm_async
+                    ))
+            return pending
+        
+        # Frame index -> (image, embedding, categories, priority margin)
+        samples: Dict[int, Tuple[object, Optional[np.ndarray], List[str], float]] = {}
+        for run in runs:
+            margin = self.fast_filter.margin(run.category, max(run.scores))
+            for frame_idx in run.samples:
+                image = run.images.get(frame_idx)
+                if image is None:
+                    continue
+                _, embedding, categories, best = samples.get(
+                    frame_idx, (image, run.embeddings.get(frame_idx), [], margin)
+                )
+                samples[frame_idx] = (image, embedding, categories + [run.category], max(best, margin))
+        
+        if vlm_async:
+            return [
+                ([frame_idx], self.vlm_scheduler.submit_multiple(image, categories, margin, embedding))
+                for frame_idx, (image, embedding, categories, margin) in samples.items()
+            ]
+        
+        for frame_idx, (image, embedding, categories, _) in samples.items():
+            vlm_results = self.deep_analyzer.analyze_multiple_triggers(image, categories, embedding)
+            for cat_name, vlm_result in vlm_results.items():
+                detections[frame_idx][cat_name] = vlm_result['confirmed']
+        return []
+    
+    def _collect_vlm_results(
+        self,
+        pending: List[Tuple[List[int], Future]],
+        detections: Dict[int, Dict[str, bool]],
+        wait: bool
+    ) -> List[Tuple[List[int], Future]]:
+        """
+        Write finished VLM confirmations into the per-frame verdicts.
+        
+        A future resolves either to {category: result} for a single frame
+        or to a list of results (one per frame) for a multi-frame request.
+        
+        Args:
+            pending: In-flight (frame indices, future) entries
+            detections: Per-frame verdicts to update
+            wait: Block until every future has finished
+        
+        Returns:
+            Entries that are still in flight
+        """
+        still_pending = []
+        for frame_indices, future in pending:
+            if not (wait or future.done()):
+                still_pending.append((frame_indices, future))
+                continue
+            
+            results = future.result()
+            if isinstance(results, dict):
+                for cat_name, vlm_result in results.items():
+                    detections[frame_indices[0]][cat_name] = vlm_result['confirmed']
+            else:
+                for frame_idx, vlm_result in zip(frame_indices, results):
+                    detections[frame_idx][vlm_result['category']] = vlm_result['confirmed']
+        return still_pending
+    
+    def format(
+        self,
+        input_csv: Optional[Path] = None,
+        output_csv: Optional[Path] = None,
+        categories: Optional[List[str]] = None,
+        detections: Optional[DetectionTable] = None
+    ):
         """
         Run format mode: merge results into database CSV.
         
         Args:
-            input_csv: Override intermediate CSV path
+            input_csv: Override intermediate log path (CSV, Parquet or .npz)
             output_csv: Override output CSV path
+            categories: Only merge these categories
+            detections: Packed detections from analyze() (skips reading the log)
         """
         print(f"\n{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}")
         print(f"{Fore.MAGENTA}📊 FORMAT MODE{Style.RESET_ALL}")
         print(f"{Fore.MAGENTA}{'='*60}{Style.RESET_ALL}\n")
         
-        result = self.merger.process_csv(input_csv, output_csv)
+        if detections is not None:
+            result = self.merger.process_table(detections, output_csv, categories)
+        else:
+            result = self.merger.process_csv(input_csv, output_csv, categories)
         
         print(f"\n{Fore.GREEN}✅ Formatting complete!{Style.RESET_ALL}")
         print(f"Output: {output_csv or self.final_csv}")
@@ -361,10 +943,10 @@ class TriggerAnalyzer:
         input("Press Enter when ready to analyze...")
         
         # Step 2: Analyze
-        self.analyze()
+        detections = self.analyze()
         
         # Step 3: Format
-        self.format()
+        self.format(detections=detections)
         
         # Step 4: Cleanup (optional)
         if cleanup:
@@ -379,20 +961,100 @@ class TriggerAnalyzer:
         print(f"{Fore.GREEN}Output: {self.final_csv}{Style.RESET_ALL}")
         print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}\n")
     
-    def _parse_timestamp(self, filename: str) -> float:
-        """Parse timestamp from filename"""
+    def batch(self, manifest: Path, output_dir: Optional[Path] = None, resume: bool = True):
+        """
+        Run batch mode: analyze and format every media of a manifest.
+        
+        All media go through the same loaded models. Each media gets its own
+        output directory (intermediate log, final CSV, resume journal); a
+        failing media is recorded and the batch moves on. Rerunning the same
+        manifest skips finished media and resumes an interrupted one.
+        
+        Args:
+            manifest: Batch manifest (.yaml or .csv, see processing/batch_manifest.py)
+            output_dir: Per-media and combined outputs (defaults to paths.batch_output)
+            resume: Skip finished media and resume interrupted ones
+        """
+        print(f"\n{Fore.WHITE}{'='*60}{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}📦 BATCH MODE: {manifest}{Style.RESET_ALL}")
+        print(f"{Fore.WHITE}{'='*60}{Style.RESET_ALL}\n")
+        
+        jobs = load_manifest(manifest)
+        output_dir = Path(output_dir or self.config.get('paths', {}).get('batch_output', './batch_results'))
+        output_dir.mkdir(parents=True, exist_ok=True)
+        status = BatchStatus(output_dir / 'batch_status.jsonl')
+        
+        # Work queue of media still to process
+        queue = deque(job for job in jobs if not (resume and status.is_done(job)))
+        skipped = len(jobs) - len(queue)
+        print(f"{len(jobs)} media in manifest, {len(queue)} to process"
+              + (f" ({skipped} already done)" if skipped else ""))
+        
+        # Per-media paths and metadata are swapped in for each job
+        saved_paths = (self.intermediate_csv, self.journal_file)
+        saved_media = dict(self.config.get('media') or {})
+        failed: List[str] = []
+        position = 0
+        
         try:
-            parts = filename.split('_')
-            for part in parts:
-                part_clean = part.replace('.jpg', '').replace('.png', '')
-                if len(part_clean) == 6 and part_clean.isdigit():
-                    hours = int(part_clean[:2])
-                    minutes = int(part_clean[2:4])
-                    seconds = int(part_clean[4:6])
-                    return hours * 3600 + minutes * 60 + seconds
-        except Exception:
-            pass
-        return 0.0
+            while queue:
+                job = queue.popleft()
+                position += 1
+                media_dir = output_dir / job.slug
+                media_dir.mkdir(exist_ok=True)
+                final_csv = media_dir / self.final_csv.name
+                
+                print(f"\n{Fore.WHITE}▶ [{position}/{len(jobs) - skipped}] {job.name}{Style.RESET_ALL}")
+                
+                self.config['media'] = {**saved_media, 'name': job.name, 'imdb_id': job.imdb_id}
+                self.intermediate_csv = media_dir / saved_paths[0].name
+                self.journal_file = media_dir / saved_paths[1].name
+                self.merger.media_name = job.name
+                self.merger.imdb_id = job.imdb_id
+                
+                try:
+                    if not job.input.is_dir():
+                        raise FileNotFoundError(f"Input directory not found: {job.input}")
+                    detections = self.analyze(input_dir=job.input, resume=resume, keep_model_loaded=True)
+                    if detections is None:
+                        raise ValueError(f"No images found in {job.input}")
+                    self.merger.process_table(detections, final_csv)
+                    status.record(job, 'done', output=final_csv)
+                except Exception as e:
+                    logger.error(f"Batch media {job.name} failed: {e}")
+                    print(f"{Fore.RED}❌ {job.name} failed: {e}{Style.RESET_ALL}")
+                    status.record(job, 'failed', error=str(e))
+                    failed.append(job.name)
+                    
+                    # Leave the shared models usable for the next media
+                    if self.vlm_scheduler is not None:
+                        self.vlm_scheduler.close()
+                        self.vlm_scheduler = None
+                    if self._deep_analyzer is not None:
+                        self._deep_analyzer.close()
+        finally:
+            # Models stayed loaded across media; hand the VLM back once the batch is over
+            if self._deep_analyzer is not None:
+                self._deep_analyzer.release_model()
+            self.intermediate_csv, self.journal_file = saved_paths
+            self.config['media'] = saved_media
+            self.merger.media_name = saved_media.get('name', 'UnknownMedia')
+            self.merger.imdb_id = saved_media.get('imdb_id', '')
+        
+        # Combined final CSV over every finished media, in manifest order
+        outputs = [path for path in status.outputs(jobs) if path.exists()]
+        combined_csv = output_dir / self.final_csv.name
+        if outputs:
+            combined = pd.concat([pd.read_csv(path) for path in outputs], ignore_index=True)
+            combined.to_csv(combined_csv, index=False)
+        
+        print(f"\n{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}✅ BATCH COMPLETE: {len(outputs)}/{len(jobs)} media done{Style.RESET_ALL}")
+        if outputs:
+            print(f"{Fore.GREEN}Combined output: {combined_csv}{Style.RESET_ALL}")
+        print(f"{Fore.GREEN}{'='*60}{Style.RESET_ALL}")
+        if failed:
+            print(f"{Fore.RED}Failed ({len(failed)}): {', '.join(failed)} - rerun to retry{Style.RESET_ALL}")
 
 
 def main():
@@ -406,6 +1068,7 @@ Examples:
   python main.py analyze --input ./raw_screenshots
   python main.py format --output ./results/triggers.csv
   python main.py full --media "MovieName"
+  python main.py batch --manifest season1.yaml --output ./results/season1
         """
     )
     
@@ -421,11 +1084,13 @@ Examples:
     analyze_parser = subparsers.add_parser('analyze', help='Process captured files')
     analyze_parser.add_argument('--input', type=Path, help='Input directory')
     analyze_parser.add_argument('--no-resume', action='store_true', help='Start fresh')
+    analyze_parser.add_argument('--follow', action='store_true', help='Analyze while capture is still running')
     analyze_parser.add_argument('--config', default='config.yaml', help='Config file')
     
     # Format command
     format_parser = subparsers.add_parser('format', help='Merge results to database CSV')
-    format_parser.add_argument('--input', type=Path, help='Input CSV')
+    format_parser.add_argument('--input', type=Path, help='Input CSV or Parquet log')
+    format_parser.add_argument('--categories', nargs='+', help='Only merge these categories')
     format_parser.add_argument('--output', type=Path, help='Output CSV')
     format_parser.add_argument('--config', default='config.yaml', help='Config file')
     
@@ -436,6 +1101,13 @@ Examples:
     full_parser.add_argument('--no-cleanup', action='store_true', help='Keep raw files')
     full_parser.add_argument('--config', default='config.yaml', help='Config file')
     
+    # Batch command
+    batch_parser = subparsers.add_parser('batch', help='Analyze + format many media with models loaded once')
+    batch_parser.add_argument('--manifest', type=Path, required=True, help='Manifest (.yaml or .csv: name, imdb_id, input)')
+    batch_parser.add_argument('--output', type=Path, help='Output directory')
+    batch_parser.add_argument('--no-resume', action='store_true', help='Reprocess finished media')
+    batch_parser.add_argument('--config', default='config.yaml', help='Config file')
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -454,13 +1126,15 @@ Examples:
     elif args.command == 'analyze':
         analyzer.analyze(
             input_dir=args.input,
-            resume=not args.no_resume
+            resume=not args.no_resume,
+            follow=args.follow
         )
     
     elif args.command == 'format':
         analyzer.format(
             input_csv=args.input,
-            output_csv=args.output
+            output_csv=args.output,
+            categories=args.categories
         )
     
     elif args.command == 'full':
@@ -469,6 +1143,13 @@ Examples:
             audio_enabled=not args.no_audio,
             cleanup=not args.no_cleanup
         )
+    
+    elif args.command == 'batch':
+        analyzer.batch(
+            manifest=args.manifest,
+            output_dir=args.output,
+            resume=not args.no_resume
+        )
 
 
 if __name__ == "__main__":
@@ -5,5 +5,17 @@ Modules for post-processing analysis results.
 """
 
 from .results_merger import ResultsMerger
+from .shot_segmenter import ShotSegmenter, Shot
+from .frame_loader import FrameLoader
+from .run_sampler import RunSampler, SuspiciousRun
+from .pipeline import Pipeline, Stage
+from .results_journal import ResultsJournal
+from .results_writer import ResultsWriter, ParquetResultsWriter, DetectionTableWriter, PARQUET_AVAILABLE
+from .detection_table import DetectionTable, pack_verdicts, unpack_mask
+from .batch_manifest import BatchJob, BatchStatus, load_manifest
+from .capture_follower import CaptureFollower, mark_capture_complete
 
-__all__ = ['ResultsMerger']
+__all__ = ['ResultsMerger', 'ShotSegmenter', 'Shot', 'FrameLoader', 'RunSampler', 'SuspiciousRun', 'Pipeline', 'Stage',
+           'ResultsJournal', 'ResultsWriter', 'ParquetResultsWriter', 'DetectionTableWriter',
+           'PARQUET_AVAILABLE', 'DetectionTable', 'pack_verdicts', 'unpack_mask',
+           'BatchJob', 'BatchStatus', 'load_manifest', 'CaptureFollower', 'mark_capture_complete']
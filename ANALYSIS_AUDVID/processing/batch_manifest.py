@@ -0,0 +1,139 @@
+"""
+Batch Manifest Module
+
+Describes a multi-media batch job (one entry per episode/film) and keeps
+an append-only status log next to its outputs, so a rerun of the same
+manifest skips media that already finished and retries the ones that
+failed.
+
+Manifest (YAML):
+    media:
+      - name: ShowS01E01
+        imdb_id: tt0000001
+        input: ./captures/ShowS01E01
+      - name: ShowS01E02
+        ...
+
+or CSV with the columns name, imdb_id, input.
+"""
+
+import csv
+import json
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+import yaml
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchJob:
+    """One media to analyze"""
+    name: str
+    input: Path
+    imdb_id: str = ''
+
+    @property
+    def slug(self) -> str:
+        """File-system safe name for the per-media output directory"""
+        return re.sub(r'[^\w.-]+', '_', self.name)
+
+
+def load_manifest(path: Path) -> List[BatchJob]:
+    """
+    Read a batch manifest (.yaml/.yml or .csv).
+
+    Relative input paths are resolved against the manifest's directory.
+
+    Raises:
+        ValueError: If an entry lacks a name or input, or names repeat
+    """
+    path = Path(path)
+    if path.suffix == '.csv':
+        with open(path, 'r', newline='') as f:
+            entries = list(csv.DictReader(f))
+    else:
+        with open(path, 'r') as f:
+            data = yaml.safe_load(f) or {}
+        entries = data.get('media', []) if isinstance(data, dict) else data
+
+    jobs = []
+    seen = set()
+    for n, entry in enumerate(entries, 1):
+        name = str(entry.get('name') or '').strip()
+        source = str(entry.get('input') or '').strip()
+        if not name or not source:
+            raise ValueError(f"Manifest entry {n} needs 'name' and 'input'")
+        if name in seen:
+            raise ValueError(f"Manifest lists '{name}' twice")
+        seen.add(name)
+
+        input_dir = Path(source)
+        if not input_dir.is_absolute():
+            input_dir = path.parent / input_dir
+        jobs.append(BatchJob(name=name, input=input_dir, imdb_id=str(entry.get('imdb_id') or '')))
+
+    return jobs
+
+
+class BatchStatus:
+    """
+    Append-only JSON Lines log of finished and failed media.
+
+    The latest line per media wins, so a media that failed and later
+    succeeded counts as done.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: Status file (created on first record)
+        """
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+
+        if self.path.exists():
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        self.entries[entry['name']] = entry
+                    except (ValueError, KeyError):
+                        continue  # Torn line from an interrupted run
+
+    def is_done(self, job: BatchJob) -> bool:
+        return self.entries.get(job.name, {}).get('status') == 'done'
+
+    def record(self, job: BatchJob, status: str, output: Optional[Path] = None, error: Optional[str] = None):
+        """
+        Append the outcome of one media.
+
+        Args:
+            job: The media
+            status: 'done' or 'failed'
+            output: Final CSV of the media (done)
+            error: Failure message (failed)
+        """
+        entry = {
+            'name': job.name,
+            'status': status,
+            'output': str(output) if output else None,
+            'error': error,
+            'finished_at': datetime.now().isoformat()
+        }
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        self.entries[job.name] = entry
+
+    def outputs(self, jobs: List[BatchJob]) -> List[Path]:
+        """Final CSVs of the finished media, in manifest order"""
+        return [
+            Path(self.entries[job.name]['output'])
+            for job in jobs if self.is_done(job) and self.entries[job.name].get('output')
+        ]
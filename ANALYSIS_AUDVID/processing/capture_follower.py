@@ -0,0 +1,338 @@
+"""
+Capture Follower Module
+
+Hands out capture files as soon as the capture process has finished
+writing them, so analysis can run while capture is still going.
+
+Captures that write a manifest (see capture_manifest.py) are followed by
+tailing it: an entry is only appended once its file is complete, and a
+file is handed out only if it still has the entry's size (the loader
+checks the hash when it reads the file).
+Directories without a manifest are watched instead: on Linux with inotify
+(IN_CLOSE_WRITE / IN_MOVED_TO, through libc, no extra dependency);
+elsewhere, or if inotify cannot be set up, the directory is polled and a
+file counts as complete once it has not been modified for `settle_seconds`.
+
+Following ends when the capture writes its completion marker (see
+`mark_capture_complete`), or after `idle_timeout` seconds without new
+files, and every remaining file has been handed out. Only a marker written
+after the follower started counts, so one left behind by an earlier
+capture does not end a follower started before the next capture; that
+capture's manifest and files are not handed out either, and a manifest
+replaced by the next capture is read again from its start.
+"""
+
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set
+import logging
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from capture_manifest import CaptureManifest
+
+
+logger = logging.getLogger(__name__)
+
+
+CAPTURE_COMPLETE_MARKER = '.capture_complete'
+
+
+def mark_capture_complete(directory: Path, complete: bool = True, session: str = ''):
+    """
+    Create (capture finished) or remove (capture starting) the completion marker.
+
+    Args:
+        directory: Capture output directory
+        complete: Write (True) or remove (False) the marker
+        session: Capture session id recorded in the marker
+    """
+    marker = Path(directory) / CAPTURE_COMPLETE_MARKER
+    if complete:
+        marker.write_text(json.dumps({'session': session, 'completed_at': time.time()}))
+    else:
+        marker.unlink(missing_ok=True)
+
+
+def capture_completed_at(directory: Path) -> Optional[float]:
+    """When the capture in `directory` completed (None if it has not)"""
+    marker = Path(directory) / CAPTURE_COMPLETE_MARKER
+    try:
+        text = marker.read_text()
+        mtime = marker.stat().st_mtime
+    except OSError:
+        return None
+    try:
+        return float(json.loads(text)['completed_at'])
+    except (ValueError, KeyError, TypeError):
+        return mtime  # Marker created by hand
+
+
+class _Inotify:
+    """Minimal libc inotify watch for completed files in one directory"""
+
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    _EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+    def __init__(self, directory: Path):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, str(directory).encode(), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+        if wd < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> List[str]:
+        """Names of files completed since the last call (waits up to `timeout`)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        names = []
+        offset = 0
+        while offset + self._EVENT.size <= len(data):
+            _, _, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', errors='replace')
+            offset += length
+            if name:
+                names.append(name)
+        return names
+
+    def close(self):
+        os.close(self.fd)
+
+
+class CaptureFollower:
+    """
+    Yields batches of newly completed capture files in timestamp order.
+
+    Usage:
+        manifest = CaptureManifest('./raw_screenshots')
+        follower = CaptureFollower('./raw_screenshots', sort_key=manifest.timestamp_of, manifest=manifest)
+        for paths in follower.follow(batch_size=8):
+            ...
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        patterns: Sequence[str] = ('*.jpg', '*.png'),
+        sort_key: Optional[Callable[[str], float]] = None,
+        poll_interval: float = 1.0,
+        settle_seconds: float = 1.0,
+        idle_timeout: float = 0.0,
+        use_inotify: bool = True,
+        manifest: Optional[CaptureManifest] = None
+    ):
+        """
+        Args:
+            directory: Capture output directory
+            patterns: Glob patterns of files to follow
+            sort_key: Timestamp of a file name (ties broken by name)
+            poll_interval: Seconds between checks
+            settle_seconds: Polling: unmodified this long = complete
+            idle_timeout: Stop after this many seconds without new files (0 = wait for the marker)
+            use_inotify: Try inotify before falling back to polling
+            manifest: Tail this capture manifest when the directory has one, or has
+                no capture files yet (the capture about to start writes one)
+        """
+        self.directory = Path(directory)
+        self.patterns = list(patterns)
+        self.sort_key = sort_key
+        self.poll_interval = poll_interval
+        self.settle_seconds = settle_seconds
+        self.idle_timeout = idle_timeout
+        self.use_inotify = use_inotify
+        self.manifest = manifest
+
+        self.mode = 'polling'
+        self._seen: Set[str] = set()
+        self._recheck: List[Path] = []
+        self._started = 0.0
+        self._not_before = 0.0                      # Earlier capture's completion: older files are its leftovers
+        self._stale_session: Optional[Dict] = None  # Its manifest header
+        self._session: Optional[Dict] = None        # Header of the manifest being tailed
+
+    def _matches(self, name: str) -> bool:
+        path = Path(name)
+        return any(path.match(pattern) for pattern in self.patterns)
+
+    def _order(self, paths: List[Path]) -> List[Path]:
+        if self.sort_key is None:
+            return sorted(paths)
+        return sorted(paths, key=lambda p: (self.sort_key(p.name), p.name))
+
+    def _scan(self, settled_only: bool) -> List[Path]:
+        """Unseen matching files of this capture (only those not modified for settle_seconds if settled_only)"""
+        found = [
+            path for pattern in self.patterns for path in self.directory.glob(pattern)
+            if path.name not in self._seen and self._fresh(path)
+        ]
+        return self._settled(found) if settled_only else found
+
+    def _fresh(self, path: Path) -> bool:
+        """Written after the earlier capture completed"""
+        try:
+            return path.stat().st_mtime > self._not_before
+        except FileNotFoundError:
+            return False
+
+    def _settled(self, paths: List[Path]) -> List[Path]:
+        """Paths not modified for settle_seconds"""
+        now = time.time()
+        settled = []
+        for path in paths:
+            try:
+                if now - path.stat().st_mtime >= self.settle_seconds:
+                    settled.append(path)
+            except FileNotFoundError:
+                continue
+        return settled
+
+    def _take(self, paths: List[Path]) -> List[Path]:
+        taken = []
+        for path in paths:
+            if path.name not in self._seen:
+                self._seen.add(path.name)
+                taken.append(path)
+        return taken
+
+    def capture_complete(self) -> bool:
+        """Whether a capture completed since following started (older markers are stale)"""
+        completed_at = capture_completed_at(self.directory)
+        return completed_at is not None and completed_at >= self._started
+
+    def follow(self, batch_size: int = 8, max_wait: float = 2.0) -> Iterator[List[Path]]:
+        """
+        Yield completed files until the capture is over.
+
+        Args:
+            batch_size: Yield as soon as this many files are waiting
+            max_wait: Yield a partial batch once its oldest file waited this long
+
+        Yields:
+            Lists of paths in timestamp order
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._started = time.time()
+        self._not_before = capture_completed_at(self.directory) or 0.0
+        if self._not_before:
+            logger.info(
+                f"Ignoring the completion marker and files of an earlier capture in {self.directory}; "
+                f"waiting for the next capture to finish"
+            )
+
+        watcher = None
+        if self.manifest is not None and (self.manifest.path.exists() or not self._scan(settled_only=False)):
+            self.mode = 'manifest'
+            self.manifest.refresh()
+            self._stale_session = self.manifest.header if self._not_before else None
+        else:
+            if self.use_inotify:
+                try:
+                    watcher = _Inotify(self.directory)
+                except (OSError, AttributeError) as e:
+                    logger.info(f"inotify unavailable ({e}), polling {self.directory}")
+            self.mode = 'inotify' if watcher is not None else 'polling'
+
+        try:
+            waiting = self._order(self._initial(watcher))
+            waiting_since = time.time()
+            last_new = time.time()
+
+            while True:
+                done = self.capture_complete() or (
+                    self.idle_timeout > 0 and time.time() - last_new > self.idle_timeout
+                )
+                if done:
+                    waiting = self._order(waiting + self._remaining())
+                    for k in range(0, len(waiting), batch_size):
+                        yield waiting[k:k + batch_size]
+                    return
+
+                new = self._poll(watcher)
+                if new:
+                    if not waiting:
+                        waiting_since = time.time()
+                    waiting = self._order(waiting + new)
+                    last_new = time.time()
+
+                while len(waiting) >= batch_size:
+                    yield waiting[:batch_size]
+                    waiting = waiting[batch_size:]
+                    waiting_since = time.time()
+
+                if waiting and time.time() - waiting_since >= max_wait:
+                    yield waiting
+                    waiting = []
+        finally:
+            if watcher is not None:
+                watcher.close()
+
+    def _initial(self, watcher: Optional[_Inotify]) -> List[Path]:
+        """Complete files already there when following starts"""
+        if self.mode == 'manifest':
+            return self._listed(final=False)
+
+        # inotify only reports files completed from now on; ones still
+        # being written at startup are re-checked until they settle
+        initial = self._take(self._scan(settled_only=True))
+        self._recheck = self._scan(settled_only=False) if watcher is not None else []
+        return initial
+
+    def _poll(self, watcher: Optional[_Inotify]) -> List[Path]:
+        """Files completed since the last call (waits up to poll_interval)"""
+        if watcher is not None:
+            names = [n for n in watcher.read(self.poll_interval) if self._matches(n)]
+            settled = self._settled(self._recheck)
+            self._recheck = [p for p in self._recheck if p not in settled and p.name not in self._seen]
+            return self._take(settled + [self.directory / n for n in names])
+
+        time.sleep(self.poll_interval)
+        if self.mode == 'manifest':
+            return self._listed(final=False)
+        return self._take(self._scan(settled_only=True))
+
+    def _remaining(self) -> List[Path]:
+        """Capture is over: everything left is complete"""
+        if self.mode == 'manifest':
+            return self._listed(final=True)
+        return self._take(self._scan(settled_only=False))
+
+    def _listed(self, final: bool) -> List[Path]:
+        """
+        Newly listed manifest files with their entry's size. A mismatch
+        (file rewritten since) is retried until the capture is over, then skipped.
+        """
+        self.manifest.refresh()
+        header = self.manifest.header
+        if header is None or (self._stale_session is not None and header == self._stale_session):
+            return []  # No manifest yet, or still the earlier capture's
+        if header != self._session:
+            # A new capture replaced the manifest and may reuse file names
+            self._session = header
+            self._seen.clear()
+
+        intact = []
+        for entry in self.manifest.entries():
+            if entry.file in self._seen or not self._matches(entry.file):
+                continue
+            if self.manifest.verify(entry):
+                intact.append(self.directory / entry.file)
+            elif final:
+                logger.warning(f"Skipping {entry.file}: does not match its capture manifest entry")
+        return self._take(intact)
@@ -0,0 +1,181 @@
+"""
+Detection Table Module
+
+Compact per-frame detections. Each frame is one record of a NumPy
+structured array: frame index, float32 timestamp, shot id and the
+category verdicts bit-packed into one unsigned mask (bit k = k-th
+category of TRIGGER_CATEGORIES). That is 14 bytes per frame instead of a
+dict of Python bools plus strings, and per-category counts or positive
+timestamps are single vectorized operations on the mask column.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy")
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from trigger_categories import TRIGGER_CATEGORIES
+
+
+logger = logging.getLogger(__name__)
+
+
+# Bit k of a mask is CATEGORY_NAMES[k]
+CATEGORY_NAMES: List[str] = list(TRIGGER_CATEGORIES.keys())
+CATEGORY_BITS: Dict[str, int] = {name: k for k, name in enumerate(CATEGORY_NAMES)}
+
+if len(CATEGORY_NAMES) > 32:
+    raise ValueError(f"{len(CATEGORY_NAMES)} trigger categories do not fit a 32-bit detection mask")
+MASK_DTYPE = np.uint16 if len(CATEGORY_NAMES) <= 16 else np.uint32
+
+DETECTION_DTYPE = np.dtype([
+    ('frame', np.uint32),       # Index into the analyzed file list
+    ('timestamp', np.float32),  # Seconds
+    ('shot', np.int32),         # Shot id, -1 without shot segmentation
+    ('mask', MASK_DTYPE)        # Category bits
+])
+
+
+def pack_verdicts(verdicts: Dict[str, bool]) -> int:
+    """{category: detected} to a category bitmask"""
+    mask = 0
+    for cat_name, detected in verdicts.items():
+        if detected and cat_name in CATEGORY_BITS:
+            mask |= 1 << CATEGORY_BITS[cat_name]
+    return mask
+
+
+def unpack_mask(mask: int) -> Dict[str, bool]:
+    """Category bitmask to {category: detected}"""
+    return {name: bool(mask >> k & 1) for k, name in enumerate(CATEGORY_NAMES)}
+
+
+def mask_bits(masks: np.ndarray) -> np.ndarray:
+    """Masks to a frames x categories boolean matrix (columns in CATEGORY_NAMES order)"""
+    shifts = np.arange(len(CATEGORY_NAMES), dtype=masks.dtype)
+    return (masks[:, None] >> shifts & 1).astype(bool)
+
+
+class DetectionTable:
+    """
+    Growable structured array of detection records.
+
+    Usage:
+        table = DetectionTable()
+        table.append(frame_idx, timestamp, pack_verdicts(verdicts), shot_id)
+        table.counts()                 # {category: frames detected}
+        table.positives('Violence')    # records with the Violence bit set
+        table.save('./media_analysis_log.npz', filenames)
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Initial number of records (doubles as needed)
+        """
+        self._data = np.zeros(max(1, capacity), dtype=DETECTION_DTYPE)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def records(self) -> np.ndarray:
+        """The filled part of the table (a view)"""
+        return self._data[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        return self.records.nbytes
+
+    def append(self, frame: int, timestamp: float, mask: int, shot: int = -1):
+        """Add one frame's record"""
+        if self._size == len(self._data):
+            grown = np.zeros(len(self._data) * 2, dtype=DETECTION_DTYPE)
+            grown[:self._size] = self._data
+            self._data = grown
+        self._data[self._size] = (frame, timestamp, shot, mask)
+        self._size += 1
+
+    def extend(self, records: np.ndarray):
+        """Add several records (DETECTION_DTYPE array)"""
+        needed = self._size + len(records)
+        if needed > len(self._data):
+            grown = np.zeros(max(needed, len(self._data) * 2), dtype=DETECTION_DTYPE)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:needed] = records
+        self._size = needed
+
+    def clear(self):
+        """Drop all records, keeping the allocation"""
+        self._size = 0
+
+    def category_mask(self, category: str) -> np.ndarray:
+        """Boolean array: frames where `category` was detected"""
+        bit = MASK_DTYPE(1 << CATEGORY_BITS[category])
+        return (self.records['mask'] & bit) != 0
+
+    def counts(self) -> Dict[str, int]:
+        """Detected frames per category"""
+        if not self._size:
+            return {name: 0 for name in CATEGORY_NAMES}
+        totals = mask_bits(self.records['mask']).sum(axis=0)
+        return {name: int(total) for name, total in zip(CATEGORY_NAMES, totals)}
+
+    def positives(self, category: str) -> np.ndarray:
+        """Records where `category` was detected"""
+        return self.records[self.category_mask(category)]
+
+    def save(self, path: Path, filenames: Optional[Sequence[str]] = None):
+        """
+        Write the table as .npz with its category order (and file names).
+
+        Args:
+            path: Output file
+            filenames: Analyzed file names, indexed by the `frame` field
+        """
+        arrays = {
+            'detections': self.records,
+            'categories': np.array(CATEGORY_NAMES)
+        }
+        if filenames is not None:
+            arrays['filenames'] = np.array(list(filenames))
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple['DetectionTable', Optional[np.ndarray]]:
+        """
+        Read a table written by save().
+
+        Masks written with a different category order are remapped to
+        the current TRIGGER_CATEGORIES order; unknown categories are dropped.
+
+        Returns:
+            (table, filenames or None)
+        """
+        with np.load(path, allow_pickle=False) as data:
+            records = data['detections']
+            saved_names = [str(name) for name in data['categories']]
+            filenames = data['filenames'] if 'filenames' in data.files else None
+
+        table = cls(capacity=len(records))
+        table.extend(records.astype(DETECTION_DTYPE))
+
+        if saved_names != CATEGORY_NAMES:
+            logger.info(f"Remapping detection bits of {path} to the current category order")
+            old = records['mask'].astype(np.uint32)
+            remapped = np.zeros(len(records), dtype=MASK_DTYPE)
+            for k, name in enumerate(saved_names):
+                if name in CATEGORY_BITS:
+                    remapped |= ((old >> k & 1) << CATEGORY_BITS[name]).astype(MASK_DTYPE)
+            table._data['mask'][:len(records)] = remapped
+
+        return table, filenames
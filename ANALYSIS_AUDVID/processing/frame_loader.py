@@ -0,0 +1,103 @@
+"""
+Frame Loader Module
+
+Prefetching frame pipeline shared by every per-frame analyzer. Upcoming
+batches are decoded in a thread pool while the current batch is being
+scored, and each frame is decoded once for all stages (pre-filter, CLIP,
+YOLO, VLM payloads). Frames listed in a capture manifest are checked
+against its content hash on the bytes read for decoding.
+"""
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install pillow")
+
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent))
+from capture_manifest import content_hash
+
+
+logger = logging.getLogger(__name__)
+
+
+def load_frame(path: Path, expected_hash: str = '') -> Optional[Image.Image]:
+    """Decode one frame to RGB (None if unreadable or not matching `expected_hash`)"""
+    try:
+        data = Path(path).read_bytes()
+        if expected_hash and content_hash(data) != expected_hash:
+            logger.warning(f"Skipping frame {path}: does not match its capture manifest entry")
+            return None
+        with Image.open(BytesIO(data)) as img:
+            return img.convert('RGB')
+    except Exception as e:
+        logger.warning(f"Could not read frame {path}: {e}")
+        return None
+
+
+class FrameLoader:
+    """
+    Decodes frame batches ahead of the consumer.
+
+    Usage:
+        loader = FrameLoader(workers=4, prefetch_batches=2)
+        for offset, paths, images in loader.batches(files, batch_size=8):
+            ...
+    """
+
+    def __init__(self, workers: int = 4, prefetch_batches: int = 2):
+        """
+        Args:
+            workers: Decoder threads (PIL and hashlib release the GIL)
+            prefetch_batches: Batches decoded ahead of the current one
+        """
+        self.workers = max(1, workers)
+        self.prefetch_batches = max(1, prefetch_batches)
+
+    def batches(
+        self,
+        paths: Sequence[Path],
+        batch_size: int,
+        start: int = 0,
+        expected_hash: Optional[Callable[[str], str]] = None
+    ) -> Iterator[Tuple[int, List[Path], List[Optional[Image.Image]]]]:
+        """
+        Yield (offset, batch paths, decoded images) in order.
+
+        Args:
+            paths: Frame files in processing order
+            batch_size: Frames per batch
+            start: Offset of the first batch (for resume)
+            expected_hash: Manifest hash of a file name ('' = unchecked), e.g. CaptureManifest.hash_of
+        """
+        offsets = iter(range(start, len(paths), batch_size))
+        pending: deque = deque()
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='frame-loader') as pool:
+
+            def submit_next() -> bool:
+                offset = next(offsets, None)
+                if offset is None:
+                    return False
+                batch_paths = list(paths[offset:offset + batch_size])
+                hashes = [expected_hash(p.name) if expected_hash else '' for p in batch_paths]
+                pending.append((
+                    offset, batch_paths, [pool.submit(load_frame, p, h) for p, h in zip(batch_paths, hashes)]
+                ))
+                return True
+
+            for _ in range(self.prefetch_batches + 1):
+                if not submit_next():
+                    break
+
+            while pending:
+                offset, batch_paths, futures = pending.popleft()
+                submit_next()
+                yield offset, batch_paths, [f.result() for f in futures]
@@ -0,0 +1,236 @@
+"""
+Pipeline Module
+
+Staged executor: a source feeds a chain of stages connected by bounded
+queues. Every stage runs in its own worker thread(s) at its own pace; a
+full downstream queue blocks the producer (backpressure) instead of
+letting work pile up. Output order is preserved even for multi-worker
+stages. Per-stage busy/starved/blocked time is recorded so the slowest
+stage is obvious.
+"""
+
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+_END = object()     # End of stream marker
+_DROP = object()    # Stage result that is not passed on
+
+
+class _Aborted(Exception):
+    """Another stage failed; unwind this worker"""
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline step.
+
+    `fn(item)` returns the item for the next stage, or None to drop it.
+    """
+    name: str
+    fn: Callable[[Any], Any]
+    workers: int = 1
+    queue_size: int = 2
+
+    # Statistics (seconds, summed over workers)
+    busy: float = field(default=0.0, init=False)
+    starved: float = field(default=0.0, init=False)
+    blocked: float = field(default=0.0, init=False)
+    items: int = field(default=0, init=False)
+
+
+class Pipeline:
+    """
+    Runs a source iterable through stages with bounded queues.
+
+    Usage:
+        pipeline = Pipeline(batches, [Stage('score', score), Stage('confirm', confirm)])
+        pipeline.run()
+        print(pipeline.report())
+    """
+
+    def __init__(self, source: Iterable, stages: List[Stage], source_name: str = 'load'):
+        """
+        Args:
+            source: Items to process (time spent producing them is the source stage's busy time)
+            stages: Stages in order
+            source_name: Name of the source in the utilization report
+        """
+        self.source = source
+        self.source_stage = Stage(source_name, fn=lambda item: item)
+        self.stages = stages
+
+        self._queues = [queue.Queue(maxsize=max(1, stage.queue_size)) for stage in stages]
+        self._abort = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._stats_lock = threading.Lock()
+        self.wall = 0.0
+
+    def _put(self, q: queue.Queue, entry, stage: Stage):
+        """Blocking put that gives up when the pipeline aborts"""
+        start = time.perf_counter()
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            try:
+                q.put(entry, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+        with self._stats_lock:
+            stage.blocked += time.perf_counter() - start
+
+    def _get(self, q: queue.Queue, stage: Stage):
+        start = time.perf_counter()
+        while True:
+            if self._abort.is_set():
+                raise _Aborted()
+            try:
+                entry = q.get(timeout=0.1)
+                break
+            except queue.Empty:
+                continue
+        with self._stats_lock:
+            stage.starved += time.perf_counter() - start
+        return entry
+
+    def _fail(self, error: BaseException):
+        if self._error is None:
+            self._error = error
+        self._abort.set()
+
+    def _feed(self):
+        """Source thread: pull items and hand them to the first stage"""
+        stage = self.source_stage
+        out = self._queues[0] if self._queues else None
+        iterator = iter(self.source)
+        seq = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                with self._stats_lock:
+                    stage.busy += time.perf_counter() - start
+                    stage.items += 1
+                if out is not None:
+                    self._put(out, (seq, item), stage)
+                seq += 1
+            if out is not None:
+                self._put(out, (seq, _END), stage)
+        except _Aborted:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _run_stage(self, index: int):
+        """Start the workers of one stage; returns their threads"""
+        stage = self.stages[index]
+        q_in = self._queues[index]
+        q_out = self._queues[index + 1] if index + 1 < len(self.stages) else None
+
+        # Reorder buffer so multi-worker stages keep input order
+        pending: Dict[int, Any] = {}
+        state = {'next': 0, 'alive': stage.workers}
+        emit_lock = threading.Lock()
+
+        def emit(seq: int, result):
+            with emit_lock:
+                pending[seq] = result
+                while state['next'] in pending:
+                    out = pending.pop(state['next'])
+                    if q_out is not None and out is not _DROP:
+                        self._put(q_out, (state['next'], out), stage)
+                    state['next'] += 1
+
+        def work():
+            try:
+                while True:
+                    seq, item = self._get(q_in, stage)
+                    if item is _END:
+                        # Let sibling workers see the end marker too
+                        self._put(q_in, (seq, item), stage)
+                        break
+
+                    start = time.perf_counter()
+                    result = stage.fn(item)
+                    with self._stats_lock:
+                        stage.busy += time.perf_counter() - start
+                        stage.items += 1
+                    emit(seq, _DROP if result is None else result)
+
+                with emit_lock:
+                    state['alive'] -= 1
+                    last = state['alive'] == 0
+                if last and q_out is not None:
+                    self._put(q_out, (seq, _END), stage)
+            except _Aborted:
+                pass
+            except BaseException as e:
+                logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                self._fail(e)
+
+        threads = [
+            threading.Thread(target=work, name=f'pipeline-{stage.name}-{w}', daemon=True)
+            for w in range(max(1, stage.workers))
+        ]
+        state['alive'] = len(threads)
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def run(self):
+        """
+        Process the whole source; blocks until every stage has drained.
+
+        Raises:
+            The first exception raised by the source or any stage
+        """
+        start = time.perf_counter()
+        threads = [threading.Thread(target=self._feed, name='pipeline-source', daemon=True)]
+        threads[0].start()
+        for index in range(len(self.stages)):
+            threads.extend(self._run_stage(index))
+
+        for thread in threads:
+            thread.join()
+        self.wall = time.perf_counter() - start
+
+        if self._error is not None:
+            raise self._error
+
+    def utilization(self) -> Dict[str, Dict[str, float]]:
+        """
+        Per-stage statistics.
+
+        Returns:
+            {stage: {'items', 'workers', 'busy', 'utilization', 'starved', 'blocked'}}
+            where utilization = busy / (wall * workers)
+        """
+        report = {}
+        for stage in [self.source_stage] + self.stages:
+            workers = max(1, stage.workers)
+            report[stage.name] = {
+                'items': stage.items,
+                'workers': workers,
+                'busy': stage.busy,
+                'utilization': stage.busy / max(1e-9, self.wall * workers),
+                'starved': stage.starved / workers,
+                'blocked': stage.blocked / workers
+            }
+        return report
+
+    def bottleneck(self) -> Optional[str]:
+        """Name of the stage with the highest utilization"""
+        report = self.utilization()
+        return max(report, key=lambda name: report[name]['utilization']) if report else None
@@ -0,0 +1,185 @@
+"""
+Results Journal Module
+
+Crash-safe, append-only record of per-frame verdicts keyed by filename.
+Each analyzed frame becomes one JSON line; lines are written at every
+checkpoint and fsynced every `sync_every` checkpoints, so the cost of a
+checkpoint depends only on the frames settled since the last one. A run
+that crashes loses at most the lines written since the last fsync; a
+torn final line is cut off when the journal is reopened.
+
+Resume reads the journal once (O(rows)), restores every recorded verdict
+and skips exactly the files it contains.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+JOURNAL_VERSION = 1
+
+
+class ResultsJournal:
+    """
+    Append-only per-frame verdict log.
+
+    File layout (JSON Lines):
+        {"journal": 1, "media_name": ..., "started_at": ..., "categories": [...]}
+        {"file": "frame_000001.jpg", "detected": ["Violence"]}
+        ...
+
+    Usage:
+        journal = ResultsJournal('./analysis_journal.jsonl', sync_every=10)
+        recovered = journal.open('ShowS01E01', categories, resume=True)
+        journal.append('frame_000001.jpg', {'Violence': True, ...})
+        journal.checkpoint()
+        ...
+        journal.close()
+    """
+
+    def __init__(self, path: Path, sync_every: int = 10):
+        """
+        Args:
+            path: Journal file
+            sync_every: Checkpoints between fsyncs (1 = every checkpoint)
+        """
+        self.path = Path(path)
+        self.sync_every = max(1, sync_every)
+
+        self.media_name: Optional[str] = None
+        self.started_at: Optional[str] = None
+        self.categories: List[str] = []
+
+        self._file = None
+        self._buffer: List[str] = []
+        self._checkpoints = 0
+
+        # Run statistics
+        self.recovered = 0
+        self.written = 0
+
+    def open(self, media_name: str, categories: List[str], resume: bool = True) -> Dict[str, Dict[str, bool]]:
+        """
+        Open the journal for appending, recovering earlier verdicts.
+
+        A journal written for another media or category set is discarded.
+
+        Args:
+            media_name: Media being analyzed
+            categories: Category columns, in output order
+            resume: Keep existing entries (False starts a fresh journal)
+
+        Returns:
+            filename -> {category: detected} for every recovered frame
+        """
+        self.media_name = media_name
+        self.categories = list(categories)
+
+        recovered: Dict[str, Dict[str, bool]] = {}
+        if resume and self.path.exists():
+            try:
+                recovered = self._recover()
+            except Exception as e:
+                logger.warning(f"Could not read journal {self.path}: {e}")
+                recovered = {}
+                self.started_at = None
+
+        if self.started_at is None:
+            # Fresh journal: header only
+            self.started_at = datetime.now().isoformat()
+            header = {
+                'journal': JOURNAL_VERSION,
+                'media_name': media_name,
+                'started_at': self.started_at,
+                'categories': self.categories
+            }
+            with open(self.path, 'wb') as f:
+                f.write((json.dumps(header) + '\n').encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.recovered = len(recovered)
+        self._file = open(self.path, 'ab')
+        return recovered
+
+    def _recover(self) -> Dict[str, Dict[str, bool]]:
+        """Replay the journal; truncates a torn tail so appends stay well-formed"""
+        recovered: Dict[str, Dict[str, bool]] = {}
+        valid_end = 0
+
+        with open(self.path, 'rb') as f:
+            header_line = f.readline()
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                header = {}
+            if (not header_line.endswith(b'\n')
+                    or header.get('journal') != JOURNAL_VERSION
+                    or header.get('media_name') != self.media_name
+                    or header.get('categories') != self.categories):
+                logger.info(f"Journal {self.path} belongs to another run, starting fresh")
+                return {}
+            valid_end = f.tell()
+
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                    detected = set(entry['detected'])
+                    recovered[entry['file']] = {cat: cat in detected for cat in self.categories}
+                except (ValueError, KeyError, TypeError):
+                    break
+                valid_end += len(line)
+
+        if valid_end < self.path.stat().st_size:
+            logger.warning(f"Journal {self.path} has a torn tail, truncating to {valid_end} bytes")
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_end)
+
+        self.started_at = header.get('started_at')
+        return recovered
+
+    def append(self, filename: str, verdicts: Dict[str, bool]):
+        """Buffer one frame's verdicts until the next checkpoint"""
+        detected = [cat for cat in self.categories if verdicts.get(cat, False)]
+        self._buffer.append(json.dumps({'file': filename, 'detected': detected}) + '\n')
+
+    def checkpoint(self, sync: bool = False):
+        """
+        Write buffered entries; fsync every `sync_every` checkpoints.
+
+        Args:
+            sync: Force an fsync now
+        """
+        if self._file is None:
+            return
+        if self._buffer:
+            self._file.write(''.join(self._buffer).encode('utf-8'))
+            self.written += len(self._buffer)
+            self._buffer = []
+        self._file.flush()
+
+        self._checkpoints += 1
+        if sync or self._checkpoints % self.sync_every == 0:
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        """Write and fsync everything, then close the file"""
+        if self._file is None:
+            return
+        self.checkpoint(sync=True)
+        self._file.close()
+        self._file = None
+
+    def remove(self):
+        """Close and delete the journal (analysis finished)"""
+        self.close()
+        self.path.unlink(missing_ok=True)
@@ -21,6 +21,9 @@ import yaml
 import sys
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from trigger_categories import TRIGGER_CATEGORIES
+from capture_manifest import CaptureManifest
+from processing.results_writer import intermediate_path, is_parquet, is_detection_table, pq
+from processing.detection_table import DetectionTable
 
 
 logger = logging.getLogger(__name__)
@@ -56,8 +59,9 @@ class ResultsMerger:
         
         # Paths
         paths_config = self.config.get('paths', {})
-        self.input_csv = Path(paths_config.get('intermediate_csv', './media_analysis_log.csv'))
+        self.input_csv = intermediate_path(paths_config)
         self.output_csv = Path(paths_config.get('final_csv', './final_database_upload.csv'))
+        self.screenshot_dir = Path(paths_config.get('raw_screenshots', './raw_screenshots'))
         
         logger.info(f"ResultsMerger: padding={self.padding_seconds}s, min_gap={self.min_gap_seconds}s")
     
@@ -108,20 +112,41 @@ class ResultsMerger:
         if not timestamps:
             return []
         
+        return self.merge_spans([(ts, ts) for ts in timestamps], padding, min_gap)
+    
+    def merge_spans(
+        self,
+        spans: List[Tuple[float, float]],
+        padding: Optional[float] = None,
+        min_gap: Optional[float] = None
+    ) -> List[Tuple[float, float]]:
+        """
+        Merge (start, end) detection spans into padded intervals.
+        
+        Used directly for shot-level detections, where each positive shot
+        contributes its whole span rather than individual frame timestamps.
+        
+        Args:
+            spans: List of (start, end) seconds
+            padding: Seconds to add before/after each span
+            min_gap: Minimum gap between intervals (merge if closer)
+        
+        Returns:
+            List of (start, end) tuples in seconds
+        """
+        if not spans:
+            return []
+        
         padding = padding if padding is not None else self.padding_seconds
         min_gap = min_gap if min_gap is not None else self.min_gap_seconds
         
         # Create initial intervals with padding
         intervals = []
-        for ts in sorted(set(timestamps)):
-            start = max(0, ts - padding)
-            end = ts + padding
+        for span_start, span_end in sorted(set(spans)):
+            start = max(0, span_start - padding)
+            end = span_end + padding
             intervals.append((start, end))
         
-        # Merge overlapping/close intervals
-        if not intervals:
-            return []
-        
         merged = [intervals[0]]
         
         for current_start, current_end in intervals[1:]:
@@ -153,44 +178,156 @@ class ResultsMerger:
         
         return ";".join(formatted)
     
+    def read_results(self, input_path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Load a raw analysis log (CSV or Parquet, by suffix).
+        
+        Args:
+            input_path: Intermediate log
+            columns: Only load these columns (all if None; missing ones are skipped)
+        """
+        if is_detection_table(input_path):
+            df = self.table_to_frame(*DetectionTable.load(input_path))
+            return df if columns is None else df[[col for col in columns if col in df.columns]]
+        
+        if is_parquet(input_path):
+            if columns is not None:
+                available = set(pq.read_schema(input_path).names)
+                columns = [col for col in columns if col in available]
+            return pd.read_parquet(input_path, columns=columns)
+        
+        if columns is None:
+            return pd.read_csv(input_path)
+        wanted = set(columns)
+        return pd.read_csv(input_path, usecols=lambda col: col in wanted)
+    
+    @staticmethod
+    def table_to_frame(table: DetectionTable, filenames: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Unpack a detection table into the boolean log layout"""
+        records = table.records
+        df = pd.DataFrame({'timestamp_sec': records['timestamp'].astype(np.float64)})
+        if filenames is not None:
+            df.insert(0, 'filename', filenames[records['frame']])
+        if (records['shot'] >= 0).any():
+            df['shot_id'] = records['shot']
+        for cat_name in TRIGGER_CATEGORIES:
+            df[cat_name] = table.category_mask(cat_name)
+        return df
+    
+    @staticmethod
+    def _table_positives(table: DetectionTable, categories: List[str]) -> Dict[str, pd.DataFrame]:
+        """Positive rows straight from the category bitmasks"""
+        with_shots = bool(len(table)) and bool((table.records['shot'] >= 0).any())
+        positives = {}
+        for cat_name in categories:
+            records = table.positives(cat_name)
+            positive = pd.DataFrame({'timestamp_sec': records['timestamp'].astype(np.float64)})
+            if with_shots:
+                positive['shot_id'] = records['shot']
+            positives[cat_name] = positive
+        return positives
+    
+    def _load_positives(self, input_path: Path, categories: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        Positive rows of each requested category present in the log.
+        
+        Parquet logs are filtered in the reader (row groups whose
+        statistics show no detection are skipped) and only the key
+        columns are decoded; CSV logs load the requested columns once.
+        
+        Returns:
+            category -> DataFrame with timestamp_sec (and shot_id if present)
+        """
+        if is_detection_table(input_path):
+            table, _ = DetectionTable.load(input_path)
+            return self._table_positives(table, categories)
+        
+        if is_parquet(input_path):
+            available = set(pq.read_schema(input_path).names)
+            if 'timestamp_sec' not in available:
+                raise ValueError("Parquet log must have a 'timestamp_sec' column")
+            key_columns = ['timestamp_sec'] + (['shot_id'] if 'shot_id' in available else [])
+            return {
+                cat_name: pq.read_table(
+                    input_path, columns=key_columns, filters=[(cat_name, '==', True)]
+                ).to_pandas()
+                for cat_name in categories if cat_name in available
+            }
+        
+        df = self.read_results(input_path, ['filename', 'timestamp_sec', 'shot_id'] + categories)
+        
+        # Expected columns: timestamp_sec, and one boolean column per category
+        if 'timestamp_sec' not in df.columns:
+            # Look the frames up in the capture manifest (file names as fallback)
+            if 'filename' in df.columns:
+                manifest = CaptureManifest(self.screenshot_dir)
+                manifest.refresh()
+                df['timestamp_sec'] = df['filename'].apply(manifest.timestamp_of)
+            else:
+                raise ValueError("CSV must have 'timestamp_sec' or 'filename' column")
+        
+        key_columns = ['timestamp_sec'] + (['shot_id'] if 'shot_id' in df.columns else [])
+        return {
+            cat_name: df.loc[df[cat_name] == True, key_columns]
+            for cat_name in categories if cat_name in df.columns
+        }
+    
     def process_csv(
         self,
         input_path: Optional[Path] = None,
-        output_path: Optional[Path] = None
+        output_path: Optional[Path] = None,
+        categories: Optional[List[str]] = None
     ) -> pd.DataFrame:
         """
-        Process the raw boolean CSV into database format.
+        Process the raw boolean log (CSV, Parquet or packed .npz) into database format.
         
         Args:
-            input_path: Path to raw CSV (defaults to config)
-            output_path: Path to save result (defaults to config)
+            input_path: Path to raw log (defaults to config)
+            output_path: Path to save result (defaults to config; .parquet writes Parquet)
+            categories: Only merge these categories (default: all)
         
         Returns:
             DataFrame with merged timestamps
         """
-        input_path = input_path or self.input_csv
-        output_path = output_path or self.output_csv
+        input_path = Path(input_path or self.input_csv)
         
-        # Load raw CSV
+        # Load positive detections of the requested categories
         logger.info(f"Loading raw analysis from {input_path}")
-        df = pd.read_csv(input_path)
+        positives = self._load_positives(input_path, self._categories(categories))
+        return self._merge_positives(positives, output_path)
+    
+    def process_table(
+        self,
+        table: DetectionTable,
+        output_path: Optional[Path] = None,
+        categories: Optional[List[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Process packed detections (as returned by analyze) into database format.
         
-        # Expected columns: timestamp_sec, and one boolean column per category
-        if 'timestamp_sec' not in df.columns:
-            # Try to parse filename for timestamp
-            if 'filename' in df.columns:
-                df['timestamp_sec'] = df['filename'].apply(self._parse_filename_timestamp)
-            else:
-                raise ValueError("CSV must have 'timestamp_sec' or 'filename' column")
+        Args:
+            table: Per-frame detection records
+            output_path: Path to save result (defaults to config)
+            categories: Only merge these categories (default: all)
         
-        # Get all trigger category columns
-        category_columns = []
-        for cat_name, cat_info in TRIGGER_CATEGORIES.items():
-            col_name = cat_name  # Or the short name used in the raw CSV
-            if col_name in df.columns:
-                category_columns.append(col_name)
+        Returns:
+            DataFrame with merged timestamps
+        """
+        return self._merge_positives(self._table_positives(table, self._categories(categories)), output_path)
+    
+    @staticmethod
+    def _categories(categories: Optional[List[str]]) -> List[str]:
+        """Requested categories in TRIGGER_CATEGORIES order"""
+        return [
+            cat_name for cat_name in TRIGGER_CATEGORIES
+            if categories is None or cat_name in categories
+        ]
+    
+    def _merge_positives(self, positives: Dict[str, pd.DataFrame], output_path: Optional[Path]) -> pd.DataFrame:
+        """Turn positive rows per category into the final database row and save it"""
+        output_path = Path(output_path or self.output_csv)
         
-        logger.info(f"Processing {len(category_columns)} trigger categories")
+        logger.info(f"Processing {len(positives)} trigger categories")
         
         # Build the final row
         result = {
@@ -198,15 +335,20 @@ class ResultsMerger:
             'IMDb_ID': self.imdb_id
         }
         
-        for col_name in category_columns:
+        for col_name, positive in positives.items():
             # Get category info for column naming
             category = TRIGGER_CATEGORIES.get(col_name)
             output_col = category.column_name if category else f"{col_name}_timestamps"
             
-            # Find all positive detections
-            positive_mask = df[col_name] == True
-            if positive_mask.any():
-                timestamps = df.loc[positive_mask, 'timestamp_sec'].tolist()
+            if len(positive) and 'shot_id' in positive.columns:
+                # Shot-segmented log: each positive shot is one span
+                spans = positive.groupby('shot_id')['timestamp_sec'].agg(['min', 'max'])
+                intervals = self.merge_spans(list(zip(spans['min'], spans['max'])))
+                result[output_col] = self.intervals_to_string(intervals)
+                
+                logger.info(f"  {col_name}: {len(spans)} shots → {len(intervals)} intervals")
+            elif len(positive):
+                timestamps = positive['timestamp_sec'].tolist()
                 intervals = self.merge_intervals(timestamps)
                 result[output_col] = self.intervals_to_string(intervals)
                 
@@ -217,32 +359,17 @@ class ResultsMerger:
         # Create output DataFrame
         output_df = pd.DataFrame([result])
         
-        # Save to CSV
+        # Save to CSV (or Parquet)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        output_df.to_csv(output_path, index=False)
+        if is_parquet(output_path):
+            output_df.to_parquet(output_path, index=False)
+        else:
+            output_df.to_csv(output_path, index=False)
         
         logger.info(f"Saved merged results to {output_path}")
         
         return output_df
     
-    def _parse_filename_timestamp(self, filename: str) -> float:
-        """
-        Parse timestamp from filename format: MediaName_HHMMSS_1.jpg
-        Returns seconds.
-        """
-        try:
-            parts = filename.split('_')
-            # Find the HHMMSS part (6 digits)
-            for part in parts:
-                if len(part) == 6 and part.isdigit():
-                    hours = int(part[:2])
-                    minutes = int(part[2:4])
-                    seconds = int(part[4:6])
-                    return hours * 3600 + minutes * 60 + seconds
-        except Exception:
-            pass
-        return 0.0
-    
     def merge_multiple_analyses(
         self,
         visual_csv: Path,
@@ -259,10 +386,10 @@ class ResultsMerger:
             Combined DataFrame
         """
         # Load visual results
-        visual_df = pd.read_csv(visual_csv)
+        visual_df = self.read_results(visual_csv)
         
         if audio_csv and audio_csv.exists():
-            audio_df = pd.read_csv(audio_csv)
+            audio_df = self.read_results(audio_csv)
             
             # For fusion categories (like Spitting/Vomiting), OR the results
             for cat_name, category in TRIGGER_CATEGORIES.items():
@@ -288,8 +415,9 @@ def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Merge analysis results")
-    parser.add_argument('--input', help='Input CSV path')
+    parser.add_argument('--input', help='Input CSV or Parquet path')
     parser.add_argument('--output', help='Output CSV path')
+    parser.add_argument('--categories', nargs='+', help='Only merge these categories')
     parser.add_argument('--config', default='config.yaml', help='Config file')
     args = parser.parse_args()
     
@@ -300,7 +428,7 @@ def main():
     input_path = Path(args.input) if args.input else None
     output_path = Path(args.output) if args.output else None
     
-    result = merger.process_csv(input_path, output_path)
+    result = merger.process_csv(input_path, output_path, args.categories)
     
     print("\n📊 Merged Results:")
     print("-" * 60)
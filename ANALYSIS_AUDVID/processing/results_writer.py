@@ -0,0 +1,246 @@
+"""
+Results Writer Module
+
+Streams the intermediate analysis log to disk while analysis runs. Frames
+are buffered as packed detection records (see detection_table) in chunks
+of `chunk_rows` and appended (header first), so memory stays bounded by
+one chunk however long the media is, and tools can tail the file for
+partial results.
+
+The log is CSV by default. `paths.intermediate_format` selects another
+format:
+    parquet: typed bool/float columns, compressed, one row group per
+             chunk with min/max statistics so readers can skip row groups
+             without a given detection (requires pyarrow)
+    npz:     the packed detection table itself (14 bytes per frame)
+Parquet and npz files are only readable once closed, so use CSV when
+tailing partial results.
+"""
+
+import csv
+from pathlib import Path
+from typing import Dict, Sequence
+import logging
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy")
+
+from .detection_table import CATEGORY_NAMES, DetectionTable, mask_bits
+
+# Parquet output is optional
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+    PARQUET_AVAILABLE = False
+
+
+logger = logging.getLogger(__name__)
+
+
+INTERMEDIATE_FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'npz': '.npz'}
+
+
+def intermediate_path(paths_config: Dict) -> Path:
+    """
+    Path of the intermediate log; the suffix follows `intermediate_format`.
+
+    Falls back to CSV (with a warning) when Parquet is requested but
+    pyarrow is not installed.
+    """
+    path = Path(paths_config.get('intermediate_csv', './media_analysis_log.csv'))
+    fmt = paths_config.get('intermediate_format', 'csv')
+
+    if fmt not in INTERMEDIATE_FORMATS:
+        logger.warning(f"Unknown intermediate_format '{fmt}', using 'csv'")
+        fmt = 'csv'
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        logger.warning("intermediate_format 'parquet' needs pyarrow (pip install pyarrow), using 'csv'")
+        fmt = 'csv'
+
+    return path.with_suffix(INTERMEDIATE_FORMATS[fmt])
+
+
+def is_parquet(path: Path) -> bool:
+    return Path(path).suffix == '.parquet'
+
+
+def is_detection_table(path: Path) -> bool:
+    return Path(path).suffix == '.npz'
+
+
+class ResultsWriter:
+    """
+    Chunked, append-only CSV writer for per-frame detections.
+
+    Columns: filename, timestamp_sec, shot_id (with shots), then one
+    boolean column per category in TRIGGER_CATEGORIES order.
+
+    Usage:
+        writer = ResultsWriter('./media_analysis_log.csv', filenames, with_shots=True)
+        writer.write(frame_idx, timestamp, mask, shot_id)
+        ...
+        writer.close()
+    """
+
+    def __init__(self, path: Path, filenames: Sequence[str], with_shots: bool = False, chunk_rows: int = 256):
+        """
+        Args:
+            path: Output file (truncated; the header is written immediately)
+            filenames: Analyzed file names, indexed by frame index
+            with_shots: Write a shot_id column
+            chunk_rows: Frames buffered between writes
+        """
+        self.path = Path(path)
+        self.filenames = filenames
+        self.with_shots = with_shots
+        self.columns = ['filename', 'timestamp_sec'] + (['shot_id'] if with_shots else []) + CATEGORY_NAMES
+        self.chunk_rows = max(1, chunk_rows)
+
+        self.rows = 0
+
+        self._chunk = DetectionTable(capacity=self.chunk_rows)
+        self._closed = False
+        self._open()
+
+    def _open(self):
+        self._file = open(self.path, 'w', newline='')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        self._writer.writerow(self.columns)
+        self._file.flush()
+
+    def _write_chunk(self, records: np.ndarray, bits: np.ndarray):
+        names = [self.filenames[frame] for frame in records['frame'].tolist()]
+        leading = [names, records['timestamp'].astype(str).tolist()]
+        if self.with_shots:
+            leading.append(records['shot'].tolist())
+        self._writer.writerows(
+            list(row) + flags for *row, flags in zip(*leading, bits.tolist())
+        )
+        self._file.flush()
+
+    def _close(self):
+        self._file.close()
+
+    def write(self, frame: int, timestamp: float, mask: int, shot: int = -1):
+        """Queue one frame; a full chunk is written out"""
+        self._chunk.append(frame, timestamp, mask, shot)
+        self.rows += 1
+        if len(self._chunk) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        """Write buffered frames and make them visible to readers"""
+        if self._closed or not len(self._chunk):
+            return
+        records = self._chunk.records
+        self._write_chunk(records, mask_bits(records['mask']))
+        self._chunk.clear()
+
+    def close(self):
+        """Write the last partial chunk and close the file"""
+        if self._closed:
+            return
+        self.flush()
+        self._close()
+        self._closed = True
+
+
+class ParquetResultsWriter(ResultsWriter):
+    """
+    Same interface, Parquet output: every chunk becomes one row group.
+
+    Columns are typed: filename string, timestamp_sec float32, shot_id
+    int32, categories bool.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        filenames: Sequence[str],
+        with_shots: bool = False,
+        chunk_rows: int = 4096,
+        compression: str = 'zstd'
+    ):
+        """
+        Args:
+            path: Output file
+            filenames: Analyzed file names, indexed by frame index
+            with_shots: Write a shot_id column
+            chunk_rows: Frames per row group
+            compression: Parquet codec ('zstd', 'snappy', 'gzip', 'none')
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError("Missing dependency: pyarrow. Run: pip install pyarrow")
+        self.compression = compression
+        super().__init__(path, filenames, with_shots, chunk_rows)
+
+    def _open(self):
+        fields = [('filename', pa.string()), ('timestamp_sec', pa.float32())]
+        if self.with_shots:
+            fields.append(('shot_id', pa.int32()))
+        fields.extend((name, pa.bool_()) for name in CATEGORY_NAMES)
+        self.schema = pa.schema(fields)
+        self._writer = pq.ParquetWriter(
+            str(self.path), self.schema, compression=self.compression, write_statistics=True
+        )
+
+    def _write_chunk(self, records: np.ndarray, bits: np.ndarray):
+        columns = {
+            'filename': [self.filenames[frame] for frame in records['frame'].tolist()],
+            'timestamp_sec': records['timestamp']
+        }
+        if self.with_shots:
+            columns['shot_id'] = records['shot']
+        for k, name in enumerate(CATEGORY_NAMES):
+            columns[name] = bits[:, k]
+        table = pa.Table.from_pydict(columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=len(records))
+
+    def _close(self):
+        self._writer.close()
+
+
+class DetectionTableWriter(ResultsWriter):
+    """Same interface, writes the packed detection table (.npz) on close"""
+
+    def _open(self):
+        self.table = DetectionTable(capacity=self.chunk_rows)
+
+    def _write_chunk(self, records: np.ndarray, bits: np.ndarray):
+        self.table.extend(records)
+
+    def _close(self):
+        self.table.save(self.path, self.filenames)
+
+
+def open_results_writer(
+    path: Path,
+    filenames: Sequence[str],
+    with_shots: bool = False,
+    analysis_config: Dict = None
+) -> ResultsWriter:
+    """
+    Writer for the intermediate log, chosen by the file suffix.
+
+    Args:
+        path: From intermediate_path()
+        filenames: Analyzed file names, indexed by frame index
+        with_shots: Write shot ids
+        analysis_config: `analysis` config section (chunk sizes, compression)
+    """
+    analysis_config = analysis_config or {}
+    if is_parquet(path):
+        return ParquetResultsWriter(
+            path, filenames, with_shots,
+            chunk_rows=analysis_config.get('parquet_row_group_rows', 4096),
+            compression=analysis_config.get('parquet_compression', 'zstd')
+        )
+    if is_detection_table(path):
+        return DetectionTableWriter(path, filenames, with_shots, chunk_rows=analysis_config.get('results_chunk_rows', 256))
+    return ResultsWriter(path, filenames, with_shots, chunk_rows=analysis_config.get('results_chunk_rows', 256))
@@ -0,0 +1,221 @@
+"""
+Run Sampler Module
+
+Groups consecutive suspicious frames into runs per category. Only a few
+representative frames of each run are confirmed by the VLM and the run
+verdict is spread over every frame of the run, so confirmation cost
+scales with the number of runs rather than the number of frames.
+
+Runs keep each frame's in-memory image and CLIP embedding until their
+samples are chosen, so samples are confirmed without re-reading frames
+from disk and near-duplicate verdict reuse still applies.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import logging
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy")
+
+import yaml
+
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_MODES = ('spread', 'top_score')
+
+
+@dataclass
+class SuspiciousRun:
+    """Consecutive suspicious frames of one category"""
+    category: str
+    frame_indices: List[int] = field(default_factory=list)
+    positions: List[int] = field(default_factory=list)     # Positions in the analyzed frame list
+    scores: List[float] = field(default_factory=list)
+    samples: List[int] = field(default_factory=list)       # Frame indices sent to the VLM
+    images: Dict[int, Any] = field(default_factory=dict)   # Frame index -> image (samples only once closed)
+    embeddings: Dict[int, Optional[np.ndarray]] = field(default_factory=dict)  # Frame index -> CLIP embedding
+
+    def __len__(self) -> int:
+        return len(self.frame_indices)
+
+    @property
+    def last_position(self) -> int:
+        return self.positions[-1]
+
+
+class RunSampler:
+    """
+    Streaming run builder.
+
+    Frames are fed in analysis order with their suspicious categories;
+    runs are closed (and their samples chosen) when a category has not
+    been suspicious for more than `max_gap` consecutive frames or the
+    run reaches `max_frames`.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        """
+        Initialize the run sampler.
+
+        Args:
+            config_path: Path to configuration YAML
+        """
+        self.config = self._load_config(config_path)
+
+        analysis_config = self.config.get('analysis', {})
+        self.enabled = analysis_config.get('vlm_run_sampling', False)
+        self.samples_per_run = max(1, analysis_config.get('vlm_run_samples', 3))
+        self.sample_mode = analysis_config.get('vlm_run_sample_mode', 'spread')
+        self.max_gap = max(0, analysis_config.get('vlm_run_max_gap', 2))
+        self.max_frames = analysis_config.get('vlm_run_max_frames', 120)
+
+        if self.sample_mode not in SAMPLE_MODES:
+            logger.warning(f"Unknown vlm_run_sample_mode '{self.sample_mode}', using 'spread'")
+            self.sample_mode = 'spread'
+
+        self._open: Dict[str, SuspiciousRun] = {}
+
+        # Run statistics
+        self.runs_closed = 0
+        self.frames_in_runs = 0
+        self.frames_sampled = 0
+
+    def reset(self):
+        """Drop open runs and run statistics (next media: frame indices start over)"""
+        self._open = {}
+        self.runs_closed = 0
+        self.frames_in_runs = 0
+        self.frames_sampled = 0
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from YAML file"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+
+    def pick_samples(self, run: SuspiciousRun) -> List[int]:
+        """
+        Choose the frames of a run to confirm.
+
+        'spread' takes evenly spaced frames including the first and last;
+        'top_score' takes the highest CLIP scores.
+
+        Returns:
+            Frame indices in run order
+        """
+        n = len(run)
+        if n <= self.samples_per_run:
+            return list(run.frame_indices)
+
+        if self.sample_mode == 'top_score':
+            picks = np.argsort(np.asarray(run.scores))[::-1][:self.samples_per_run]
+        else:
+            picks = np.linspace(0, n - 1, self.samples_per_run).round().astype(int)
+
+        return [run.frame_indices[k] for k in sorted(set(picks.tolist()))]
+
+    def _ended(self, run: SuspiciousRun, position: int) -> bool:
+        """More than max_gap non-suspicious frames since the run's last frame"""
+        return position - run.last_position - 1 > self.max_gap
+
+    def _close(self, category: str) -> SuspiciousRun:
+        run = self._open.pop(category)
+        run.samples = self.pick_samples(run)
+
+        # Only the samples' images and embeddings are still needed
+        run.images = {k: run.images[k] for k in run.samples if k in run.images}
+        run.embeddings = {k: run.embeddings[k] for k in run.samples if k in run.embeddings}
+
+        self.runs_closed += 1
+        self.frames_in_runs += len(run)
+        self.frames_sampled += len(run.samples)
+        return run
+
+    def add(
+        self,
+        position: int,
+        frame_idx: int,
+        category_scores: Dict[str, float],
+        image: Any = None,
+        embedding: Optional[np.ndarray] = None
+    ) -> List[SuspiciousRun]:
+        """
+        Feed one analyzed frame.
+
+        Args:
+            position: Index of the frame in the analyzed list (gap checks)
+            frame_idx: Frame index stored in the run
+            category_scores: {category: CLIP score} of suspicious categories
+            image: Frame image kept for confirming it if it becomes a sample
+            embedding: CLIP embedding of the frame (verdict reuse)
+
+        Returns:
+            Runs closed by this frame, with samples chosen
+        """
+        closed = []
+
+        # Categories that went quiet for too long end their run
+        for category in list(self._open):
+            if category not in category_scores and self._ended(self._open[category], position):
+                closed.append(self._close(category))
+
+        for category, score in category_scores.items():
+            run = self._open.get(category)
+            if run is not None and self._ended(run, position):
+                closed.append(self._close(category))
+                run = None
+            if run is None:
+                run = self._open[category] = SuspiciousRun(category)
+
+            run.frame_indices.append(frame_idx)
+            run.positions.append(position)
+            run.scores.append(float(score))
+            if image is not None:
+                run.images[frame_idx] = image
+                run.embeddings[frame_idx] = embedding
+
+            if self.max_frames and len(run) >= self.max_frames:
+                closed.append(self._close(category))
+
+        return closed
+
+    def flush(self) -> List[SuspiciousRun]:
+        """Close every open run (end of input)"""
+        return [self._close(category) for category in list(self._open)]
+
+    @staticmethod
+    def propagate(runs: List[SuspiciousRun], detections: Dict[int, Dict[str, bool]]) -> Dict[int, Dict[str, bool]]:
+        """
+        Spread each run's verdict over all of its frames.
+
+        A run is confirmed if any sampled frame was confirmed (recall
+        first: a missed trigger costs more than a false warning).
+
+        Args:
+            runs: Closed runs
+            detections: frame index -> {category: detected}, samples filled in
+
+        Returns:
+            The updated detections
+        """
+        for run in runs:
+            confirmed = any(detections.get(k, {}).get(run.category, False) for k in run.samples)
+            for frame_idx in run.frame_indices:
+                detections.setdefault(frame_idx, {})[run.category] = confirmed
+        return detections
+
+    def summary(self) -> Dict[str, float]:
+        """Run statistics for the analysis summary"""
+        return {
+            'runs': self.runs_closed,
+            'frames': self.frames_in_runs,
+            'sampled': self.frames_sampled,
+            'sample_rate': self.frames_sampled / max(1, self.frames_in_runs)
+        }
@@ -0,0 +1,202 @@
+"""
+Shot Segmenter Module
+
+Groups captured frames into shots using color-histogram and edge-map
+differences computed over the whole frame set at once. Only a few
+keyframes per shot are analyzed; their verdicts are propagated to the
+full shot span.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Union
+import logging
+
+try:
+    import numpy as np
+    from PIL import Image
+except ImportError as e:
+    raise ImportError(f"Missing dependency: {e}. Run: pip install numpy pillow")
+
+import yaml
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Shot:
+    """A run of visually continuous frames"""
+    index: int
+    start: int                  # First frame index (inclusive)
+    end: int                    # Last frame index (inclusive)
+    start_sec: float
+    end_sec: float
+    keyframes: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return self.end - self.start + 1
+
+    def frame_indices(self) -> range:
+        """All frame indices covered by this shot"""
+        return range(self.start, self.end + 1)
+
+
+class ShotSegmenter:
+    """
+    Histogram/edge based shot boundary detector.
+
+    Frames are reduced to small thumbnails, stacked into one array and
+    compared pairwise (frame i vs i+1) in a single vectorized pass.
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        """
+        Initialize the shot segmenter.
+
+        Args:
+            config_path: Path to configuration YAML
+        """
+        self.config = self._load_config(config_path)
+
+        analysis_config = self.config.get('analysis', {})
+        self.enabled = analysis_config.get('shot_segmentation', False)
+        self.hist_threshold = analysis_config.get('shot_threshold', 0.35)
+        self.edge_threshold = analysis_config.get('shot_edge_threshold', 0.60)
+        self.keyframes_per_shot = max(1, analysis_config.get('keyframes_per_shot', 2))
+        self.max_shot_seconds = analysis_config.get('max_shot_seconds', 20)
+
+        self.thumbnail_size = (32, 32)
+        self.bins = 8  # Per channel -> 512-bin joint RGB histogram
+
+    def _load_config(self, config_path: str) -> dict:
+        """Load configuration from YAML file"""
+        try:
+            with open(config_path, 'r') as f:
+                return yaml.safe_load(f) or {}
+        except FileNotFoundError:
+            return {}
+
+    def _load_thumbnails(self, image_paths: Sequence[Union[str, Path]]) -> np.ndarray:
+        """Decode every frame to a small RGB thumbnail, stacked as (N, H, W, 3)"""
+        w, h = self.thumbnail_size
+        thumbs = np.zeros((len(image_paths), h, w, 3), dtype=np.uint8)
+
+        for i, path in enumerate(image_paths):
+            try:
+                with Image.open(path) as img:
+                    # JPEG draft mode decodes at reduced scale (much faster)
+                    img.draft('RGB', (w * 4, h * 4))
+                    thumbs[i] = np.asarray(
+                        img.convert('RGB').resize(self.thumbnail_size, Image.Resampling.BILINEAR)
+                    )
+            except Exception as e:
+                logger.warning(f"Could not read {path} for shot detection: {e}")
+
+        return thumbs
+
+    def _histogram_distances(self, thumbs: np.ndarray) -> np.ndarray:
+        """
+        Joint RGB histogram distance between consecutive frames.
+
+        Returns:
+            (N-1,) array of half-L1 distances in [0, 1]
+        """
+        n = len(thumbs)
+        bins = self.bins
+        shift = 8 - int(np.log2(bins))
+
+        q = (thumbs >> shift).astype(np.int64)
+        joint = (q[..., 0] * bins + q[..., 1]) * bins + q[..., 2]
+        joint = joint.reshape(n, -1)
+
+        # One bincount for the whole stack: offset each frame into its own bin range
+        offsets = (np.arange(n, dtype=np.int64) * bins ** 3)[:, None]
+        hist = np.bincount((joint + offsets).ravel(), minlength=n * bins ** 3)
+        hist = hist.reshape(n, bins ** 3).astype(np.float32) / joint.shape[1]
+
+        return 0.5 * np.abs(np.diff(hist, axis=0)).sum(axis=1)
+
+    def _edge_distances(self, thumbs: np.ndarray) -> np.ndarray:
+        """
+        Edge change ratio between consecutive frames.
+
+        Returns:
+            (N-1,) array in [0, 1]; 1 means no edge pixels in common
+        """
+        gray = thumbs.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+        gx = np.abs(np.diff(gray, axis=2))[:, :-1, :]
+        gy = np.abs(np.diff(gray, axis=1))[:, :, :-1]
+        edges = (gx + gy) > 32.0
+
+        both = (edges[1:] & edges[:-1]).reshape(len(edges) - 1, -1).sum(axis=1)
+        either = (edges[1:] | edges[:-1]).reshape(len(edges) - 1, -1).sum(axis=1)
+
+        return np.where(either > 0, 1.0 - both / np.maximum(either, 1), 0.0)
+
+    def _pick_keyframes(self, start: int, end: int) -> List[int]:
+        """Evenly spaced keyframes, always including the first and last frame"""
+        k = min(self.keyframes_per_shot, end - start + 1)
+        if k == 1:
+            return [(start + end) // 2]
+        return sorted(set(np.linspace(start, end, k).round().astype(int).tolist()))
+
+    def segment(
+        self,
+        image_paths: Sequence[Union[str, Path]],
+        timestamps: Optional[Sequence[float]] = None
+    ) -> List[Shot]:
+        """
+        Split an ordered frame list into shots.
+
+        Args:
+            image_paths: Frame files in playback order
+            timestamps: Seconds per frame (defaults to frame index)
+
+        Returns:
+            List of Shot objects covering every frame exactly once
+        """
+        n = len(image_paths)
+        if n == 0:
+            return []
+
+        times = np.asarray(timestamps if timestamps is not None else range(n), dtype=np.float64)
+
+        if n == 1:
+            return [Shot(0, 0, 0, float(times[0]), float(times[0]), [0])]
+
+        thumbs = self._load_thumbnails(image_paths)
+        hist_dist = self._histogram_distances(thumbs)
+        edge_dist = self._edge_distances(thumbs)
+
+        is_cut = (hist_dist > self.hist_threshold) | (edge_dist > self.edge_threshold)
+        boundaries = np.flatnonzero(is_cut) + 1
+
+        starts = np.concatenate(([0], boundaries))
+        ends = np.concatenate((boundaries - 1, [n - 1]))
+
+        shots: List[Shot] = []
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            # Split overly long shots so propagation never spans too much time
+            seg_start = start
+            for idx in range(start, end + 1):
+                if times[idx] - times[seg_start] > self.max_shot_seconds:
+                    shots.append(self._make_shot(len(shots), seg_start, idx - 1, times))
+                    seg_start = idx
+            shots.append(self._make_shot(len(shots), seg_start, end, times))
+
+        logger.info(
+            f"Shot segmentation: {n} frames → {len(shots)} shots "
+            f"({sum(len(s.keyframes) for s in shots)} keyframes)"
+        )
+        return shots
+
+    def _make_shot(self, index: int, start: int, end: int, times: np.ndarray) -> Shot:
+        return Shot(
+            index=index,
+            start=start,
+            end=end,
+            start_sec=float(times[start]),
+            end_sec=float(times[end]),
+            keyframes=self._pick_keyframes(start, end)
+        )
@@ -0,0 +1,107 @@
+"""CaptureFollower end-of-capture handling and manifest tailing (no inotify)"""
+
+import threading
+import time
+from pathlib import Path
+
+from capture_manifest import CaptureManifest, CaptureManifestWriter
+from processing.capture_follower import CaptureFollower, mark_capture_complete
+
+
+def follow_in_thread(directory: Path, manifest: CaptureManifest = None):
+    """Start a polling follower; returns (thread, list collecting yielded names)"""
+    collected = []
+    follower = CaptureFollower(
+        directory, poll_interval=0.05, settle_seconds=0.05, use_inotify=False,
+        sort_key=manifest.timestamp_of if manifest is not None else None, manifest=manifest
+    )
+
+    def run():
+        for paths in follower.follow(batch_size=4, max_wait=0.1):
+            collected.extend(path.name for path in paths)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, collected
+
+
+def test_stale_marker_does_not_end_follower_started_before_capture(tmp_path):
+    # Marker left behind by an earlier capture
+    mark_capture_complete(tmp_path, session='earlier')
+    time.sleep(0.05)
+
+    thread, collected = follow_in_thread(tmp_path)
+    time.sleep(0.3)
+    assert thread.is_alive()
+
+    # The next capture starts after the follower, writes frames and completes
+    mark_capture_complete(tmp_path, complete=False)
+    for n in range(6):
+        (tmp_path / f'Show_00000{n}_1.jpg').write_bytes(b'frame')
+    time.sleep(0.2)
+    mark_capture_complete(tmp_path, session='next')
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert sorted(collected) == [f'Show_00000{n}_1.jpg' for n in range(6)]
+
+
+def test_marker_written_while_following_ends_follower(tmp_path):
+    (tmp_path / 'Show_000000_1.jpg').write_bytes(b'frame')
+    thread, collected = follow_in_thread(tmp_path)
+    time.sleep(0.2)
+
+    mark_capture_complete(tmp_path, session='current')
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert collected == ['Show_000000_1.jpg']
+
+
+def test_manifest_follower_hands_out_listed_intact_frames_in_timestamp_order(tmp_path):
+    manifest = CaptureManifest(tmp_path)
+    thread, collected = follow_in_thread(tmp_path, manifest)
+
+    writer = CaptureManifestWriter(tmp_path, 'Show', 'screenshots')
+    writer.save('Show_000001_2.jpg', 1.75, b'second')
+    writer.save('Show_000001_1.jpg', 1.25, b'first')
+    writer.save('Show_000002_1.jpg', 2.5, b'third')
+    # Unlisted file (never handed out) and a listed one truncated after its entry
+    (tmp_path / 'Show_000003_1.jpg').write_bytes(b'stray')
+    (tmp_path / 'Show_000002_1.jpg').write_bytes(b'th')
+    writer.close()
+    time.sleep(0.2)
+    mark_capture_complete(tmp_path, session='current')
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert collected == ['Show_000001_1.jpg', 'Show_000001_2.jpg']
+    assert manifest.timestamp_of('Show_000001_2.jpg') == 1.75
+
+
+def test_manifest_follower_skips_earlier_capture_and_rereads_replaced_manifest(tmp_path):
+    # Earlier, completed capture: manifest, frames and marker left behind
+    earlier = CaptureManifestWriter(tmp_path, 'Show', 'screenshots')
+    earlier.save('Show_000001_1.jpg', 1.0, b'old')
+    earlier.save('Show_000009_1.jpg', 9.0, b'old')
+    earlier.close()
+    mark_capture_complete(tmp_path, session='earlier')
+    time.sleep(0.05)
+
+    manifest = CaptureManifest(tmp_path)
+    thread, collected = follow_in_thread(tmp_path, manifest)
+    time.sleep(0.3)
+    assert collected == []
+
+    # The next capture replaces the manifest and reuses a file name
+    mark_capture_complete(tmp_path, complete=False)
+    writer = CaptureManifestWriter(tmp_path, 'Show', 'screenshots')
+    writer.save('Show_000001_1.jpg', 1.5, b'new frame')
+    writer.save('Show_000002_1.jpg', 2.5, b'new frame')
+    writer.close()
+    time.sleep(0.2)
+    mark_capture_complete(tmp_path, session='next')
+
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert collected == ['Show_000001_1.jpg', 'Show_000002_1.jpg']
@@ -0,0 +1,68 @@
+"""FastFilter threshold resolution (no CLIP model is loaded)"""
+
+from pathlib import Path
+
+import pytest
+import yaml
+
+pytest.importorskip('sentence_transformers')
+
+from analyzers.fast_filter import FastFilter
+from trigger_categories import get_yolo_class_ids
+
+
+def make_filter(config: dict) -> FastFilter:
+    """FastFilter with only the threshold settings of `config` set up"""
+    fast_filter = FastFilter.__new__(FastFilter)
+    analysis_config = config.get('analysis', {})
+    fast_filter.default_threshold = analysis_config.get('clip_threshold', 0.25)
+    fast_filter.yolo_confidence = analysis_config.get('yolo_confidence', 0.50)
+    fast_filter.category_thresholds = config.get('trigger_thresholds', {})
+    fast_filter.yolo_class_ids = get_yolo_class_ids(config)
+    fast_filter.ensemble_mode = analysis_config.get('prompt_ensemble', 'off')
+    fast_filter.ensemble_offset = analysis_config.get('prompt_ensemble_offset', 0.0)
+    return fast_filter
+
+
+def shipped_config() -> dict:
+    with open(Path(__file__).parent.parent / 'config.yaml', 'r') as f:
+        return yaml.safe_load(f)
+
+
+def test_spiders_on_clip_fallback_keeps_configured_threshold():
+    config = shipped_config()
+    fast_filter = make_filter(config)
+
+    assert 'Spiders' not in fast_filter.yolo_class_ids
+    assert fast_filter.get_threshold('Spiders') == pytest.approx(0.50)
+
+
+def test_yolo_served_category_uses_detection_confidence():
+    config = shipped_config()
+    config['analysis']['yolo_class_ids'] = {'Spiders': [0]}
+    config['analysis']['yolo_confidence'] = 0.40
+    del config['trigger_thresholds']['Spiders']
+    fast_filter = make_filter(config)
+
+    assert fast_filter.get_threshold('Spiders') == pytest.approx(0.40)
+
+
+def test_ensemble_offset_applies_to_dict_api_on_clip_scores():
+    config = shipped_config()
+    config['analysis']['prompt_ensemble'] = 'centroid'
+    config['analysis']['prompt_ensemble_offset'] = 0.05
+    fast_filter = make_filter(config)
+
+    assert fast_filter.configured_threshold('Spiders') == pytest.approx(0.50)
+    assert fast_filter.get_threshold('Spiders') == pytest.approx(0.45)
+    assert fast_filter.is_suspicious({'Spiders': 0.47}) == (True, ['Spiders'])
+
+
+def test_ensemble_offset_leaves_yolo_confidence_alone():
+    config = shipped_config()
+    config['analysis']['prompt_ensemble'] = 'centroid'
+    config['analysis']['prompt_ensemble_offset'] = 0.05
+    config['analysis']['yolo_class_ids'] = {'Spiders': [0]}
+    fast_filter = make_filter(config)
+
+    assert fast_filter.get_threshold('Spiders') == pytest.approx(0.50)
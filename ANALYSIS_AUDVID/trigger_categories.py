@@ -44,6 +44,9 @@ class TriggerCategory:
     # Whether this is safety-critical (lower threshold, OR logic for fusion)
     safety_critical: bool = False
     
+    # Whether VLM verdicts may be reused for near-duplicate frames
+    verdict_reuse: bool = True
+    
     # VLM confirmation prompt template
     vlm_prompt_template: str = "Does this image contain {trigger}? Answer YES or NO."
 
@@ -97,6 +100,7 @@ TRIGGER_CATEGORIES: Dict[str, TriggerCategory] = {
         ],
         default_threshold=0.20,  # Lower threshold for safety-critical
         safety_critical=True,
+        verdict_reuse=False,  # Always ask the VLM
         vlm_prompt_template="Does this image depict self-harm or suicidal behavior? Answer YES or NO."
     ),
     
@@ -113,6 +117,7 @@ TRIGGER_CATEGORIES: Dict[str, TriggerCategory] = {
         ],
         default_threshold=0.18,  # Lowest threshold for most critical
         safety_critical=True,
+        verdict_reuse=False,  # Always ask the VLM
         vlm_prompt_template="Does this image depict sexual assault or non-consensual contact? Answer YES or NO."
     ),
     
@@ -236,6 +241,23 @@ def get_category_by_column(column_name: str) -> Optional[TriggerCategory]:
     return None
 
 
+def get_yolo_class_ids(config: Optional[dict] = None) -> Dict[str, List[int]]:
+    """
+    Get YOLO class IDs per category, with config overrides applied.
+    
+    `analysis.yolo_class_ids` in config.yaml maps category names to class
+    IDs of custom weights (e.g. a spider-trained model). Categories with
+    no class IDs are omitted and fall back to CLIP.
+    """
+    overrides = ((config or {}).get('analysis', {}) or {}).get('yolo_class_ids', {}) or {}
+    class_ids = {}
+    for name, category in TRIGGER_CATEGORIES.items():
+        ids = overrides.get(name, category.yolo_class_ids)
+        if ids:
+            class_ids[name] = list(ids)
+    return class_ids
+
+
 # Quick access to safety-critical categories (for OR logic in fusion)
 SAFETY_CRITICAL_CATEGORIES = [
     name for name, cat in TRIGGER_CATEGORIES.items() 